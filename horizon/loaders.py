@@ -14,16 +14,23 @@
 Wrapper for loading templates from "templates" directories in panel modules.
 """
 
+import hashlib
 import os
 
 from django.conf import settings
 from django.template.base import TemplateDoesNotExist  # noqa
+from django.template import loader as template_loader
 from django.template.loader import BaseLoader  # noqa
+from django.template.loaders import cached
 from django.utils._os import safe_join  # noqa
+from django.utils.encoding import force_bytes
 
 # Set up a cache of the panel directories to search.
 panel_template_dirs = {}
 
+# The files of the template directories compiled by precompile_templates.
+TEMPLATE_EXTENSIONS = ('.html', '.csv', '.txt')
+
 
 class TemplateLoader(BaseLoader):
     is_usable = True
@@ -54,4 +61,160 @@ class TemplateLoader(BaseLoader):
         raise TemplateDoesNotExist(template_name)
 
 
+class CachedLoader(cached.Loader):
+    """Caches the templates found by the given loaders, compiled.
+
+    Like Django's cached loader, a template is read and compiled once per
+    process rather than on every lookup, which matters for the templates
+    rendered for each row of a table. Panel templates are cached under the
+    template directory of the panel registered for them, so registering
+    another panel under the same name doesn't serve stale templates. Missing
+    templates are remembered as well.
+
+    When ``HORIZON_TEMPLATE_AUTO_RELOAD`` is on (it defaults to ``DEBUG``),
+    a template is compiled again once its file is modified, and missing
+    templates are looked up again every time.
+
+    Use it by wrapping the other loaders in ``TEMPLATE_LOADERS``::
+
+        TEMPLATE_LOADERS = (
+            ('horizon.loaders.CachedLoader', (
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+                'horizon.loaders.TemplateLoader',
+            )),
+        )
+    """
+
+    @property
+    def auto_reload(self):
+        return getattr(settings, 'HORIZON_TEMPLATE_AUTO_RELOAD',
+                       settings.DEBUG)
+
+    def cache_key(self, template_name, template_dirs=None):
+        key = [template_name]
+        bits = template_name.split('/', 2)
+        if len(bits) == 3:
+            panel_dir = panel_template_dirs.get(os.path.join(*bits[:2]))
+            if panel_dir:
+                key.append(panel_dir)
+        if template_dirs:
+            # If template directories were specified, use a hash to
+            # differentiate.
+            key.append(hashlib.sha1(
+                force_bytes('|'.join(template_dirs))).hexdigest())
+        return '-'.join(key)
+
+    def find_template(self, name, dirs=None):
+        """Returns ``(source or template, origin, path)``, where ``path`` is
+        the display name (usually the file name) of the template given by
+        the loader which found it.
+        """
+        for loader in self.loaders:
+            try:
+                # Loaders only report where the template came from along
+                # with its source, which we need to check its mtime.
+                try:
+                    source, display_name = loader.load_template_source(
+                        name, dirs)
+                except NotImplementedError:
+                    source, display_name = loader(name, dirs)
+            except TemplateDoesNotExist:
+                continue
+            origin = template_loader.make_origin(
+                display_name, loader.load_template_source, name, dirs)
+            return source, origin, display_name
+        raise TemplateDoesNotExist(name)
+
+    def _mtime(self, path):
+        try:
+            return os.path.getmtime(path)
+        except (OSError, TypeError):
+            return None
+
+    def load_template(self, template_name, template_dirs=None):
+        key = self.cache_key(template_name, template_dirs)
+        auto_reload = self.auto_reload
+        entry = self.template_cache.get(key)
+        if entry is not None and auto_reload:
+            template, path, mtime = entry
+            if template is None or self._mtime(path) != mtime:
+                entry = None
+        if entry is None:
+            try:
+                template, origin, path = self.find_template(template_name,
+                                                            template_dirs)
+            except TemplateDoesNotExist:
+                if not auto_reload:
+                    self.template_cache[key] = (None, None, None)
+                raise
+            if not hasattr(template, 'render'):
+                try:
+                    template = template_loader.get_template_from_string(
+                        template, origin, template_name)
+                except TemplateDoesNotExist:
+                    # If compiling the template we found raises
+                    # TemplateDoesNotExist, back off to returning the source
+                    # and display name for the template we were asked to
+                    # load. This allows for correct identification (later)
+                    # of the actual template that does not exist.
+                    return template, origin
+            entry = (template, path, self._mtime(path) if auto_reload
+                     else None)
+            self.template_cache[key] = entry
+        template = entry[0]
+        if template is None:
+            raise TemplateDoesNotExist(template_name)
+        return template, None
+
+
+def panel_template_names():
+    """Returns the names of the templates of the registered panels."""
+    names = []
+    for key, template_dir in sorted(panel_template_dirs.items()):
+        dash_name, panel_name = os.path.split(key)
+        names.extend('/'.join((dash_name, name)) for name in
+                     _template_names(template_dir, panel_name))
+    return names
+
+
+def _template_names(template_dir, subdir=None):
+    root = os.path.join(template_dir, subdir) if subdir else template_dir
+    names = []
+    for path, dirs, files in os.walk(root):
+        dirs.sort()
+        for filename in sorted(files):
+            if os.path.splitext(filename)[1] not in TEMPLATE_EXTENSIONS:
+                continue
+            name = os.path.relpath(os.path.join(path, filename),
+                                   template_dir)
+            names.append(name.replace(os.sep, '/'))
+    return names
+
+
+def template_names(template_dirs):
+    """Returns the names of the templates found in template_dirs."""
+    names = []
+    for template_dir in template_dirs:
+        names.extend(_template_names(template_dir))
+    return names
+
+
+def precompile_templates(names):
+    """Compiles the given templates with the configured template loaders.
+
+    With :class:`CachedLoader` configured, this loads them into the cache of
+    the current process, e.g. from a WSGI script before serving requests.
+    Returns a list of ``(template name, exception)`` for the templates which
+    failed to compile.
+    """
+    errors = []
+    for name in names:
+        try:
+            template_loader.get_template(name)
+        except Exception as e:
+            errors.append((name, e))
+    return errors
+
+
 _loader = TemplateLoader()
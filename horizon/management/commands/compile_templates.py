@@ -0,0 +1,62 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from optparse import make_option  # noqa
+
+from django.conf import settings
+from django.core.management.base import BaseCommand  # noqa
+from django.core.management.base import CommandError  # noqa
+from django.template.loaders import app_directories
+
+import horizon
+from horizon import loaders
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--all', '-a',
+                    dest='all',
+                    action='store_true',
+                    default=False,
+                    help='Also compile the templates found in '
+                         'TEMPLATE_DIRS and in the "templates" directory '
+                         'of the installed applications.'),)
+    help = ("Compiles the templates of every registered panel, reporting "
+            "those which fail to compile, e.g. because of a syntax error "
+            "or a missing template tag library. Run it when deploying to "
+            "catch broken templates before they are rendered.")
+
+    def handle(self, **options):
+        # Building Horizon's URLconf registers the panels, and with them
+        # their template directories.
+        list(horizon.urls[0])
+
+        names = loaders.panel_template_names()
+        if options.get('all'):
+            names.extend(loaders.template_names(settings.TEMPLATE_DIRS))
+            names.extend(loaders.template_names(
+                app_directories.app_template_dirs))
+        verbosity = int(options.get('verbosity', 1))
+
+        errors = loaders.precompile_templates(names)
+        failed = set(name for name, error in errors)
+        if verbosity > 1:
+            for name in names:
+                if name not in failed:
+                    self.stdout.write("Compiled %s" % name)
+        for name, error in errors:
+            self.stderr.write("Unable to compile %s: %s" % (name, error))
+        if errors:
+            raise CommandError("%d of %d templates failed to compile."
+                               % (len(errors), len(names)))
+        if verbosity > 0:
+            self.stdout.write("Compiled %d templates." % len(names))
@@ -21,6 +21,7 @@ Middleware provided and used by Horizon.
 
 import json
 import logging
+import threading
 import time
 
 from django.conf import settings
@@ -29,6 +30,7 @@ from django.contrib.auth.views import redirect_to_login  # noqa
 from django.contrib import messages as django_messages
 from django import http
 from django import shortcuts
+from django.template.loader import render_to_string
 from django.utils.encoding import iri_to_uri  # noqa
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
@@ -39,10 +41,40 @@ import six
 
 from horizon import exceptions
 from horizon.utils import functions as utils
+from horizon.utils import profiler
 
 
 LOG = logging.getLogger(__name__)
 
+_session_stats_lock = threading.Lock()
+_session_stats = {'requests': 0,
+                  'session_writes': 0,
+                  'activity_writes': 0,
+                  'activity_skipped': 0}
+
+
+def _incr_session_stat(name):
+    with _session_stats_lock:
+        _session_stats[name] += 1
+
+
+def get_session_stats():
+    """Returns a copy of the process-wide session write counters.
+
+    ``requests`` counts the authenticated requests seen by
+    :class:`HorizonMiddleware`, ``session_writes`` how many of them ended
+    with a modified session (and therefore a session save),
+    ``activity_writes`` and ``activity_skipped`` how often the
+    ``last_activity`` timestamp was refreshed or left untouched.
+    """
+    with _session_stats_lock:
+        return dict(_session_stats)
+
+
+def get_activity_granularity():
+    """Returns the number of seconds ``last_activity`` is allowed to lag."""
+    return max(0, int(getattr(settings, 'SESSION_ACTIVITY_GRANULARITY', 0)))
+
 
 class HorizonMiddleware(object):
     """The main Horizon middleware class. Required for use of Horizon."""
@@ -70,7 +102,11 @@ class HorizonMiddleware(object):
             # The user was logged in, but his keystone token expired.
             has_timed_out = True
         if isinstance(last_activity, int):
-            if (timestamp - last_activity) > timeout:
+            # The stored timestamp is only refreshed once it is older than
+            # the activity granularity, so it may lag behind the real last
+            # activity by that many seconds.
+            if (timestamp - last_activity) > (timeout +
+                                              get_activity_granularity()):
                 has_timed_out = True
             if has_timed_out:
                 request.session.pop('last_activity')
@@ -89,7 +125,8 @@ class HorizonMiddleware(object):
 
         request.horizon = {'dashboard': None,
                            'panel': None,
-                           'async_messages': []}
+                           'async_messages': [],
+                           'session_writes': 0}
         if not hasattr(request, "user") or not request.user.is_authenticated():
             # proceed no further if the current request is already known
             # not to be authenticated
@@ -140,8 +177,36 @@ class HorizonMiddleware(object):
                             'max_cookie_size': max_cookie_size,
                         }
                     )
-        # We have a valid session, so we set the timestamp
-        request.session['last_activity'] = timestamp
+        # We have a valid session, so we set the timestamp. Writing it
+        # marks the session as modified and forces it to be saved, so it is
+        # only refreshed once the stored value is older than the configured
+        # granularity.
+        last_activity = request.session.get('last_activity', None)
+        if (not isinstance(last_activity, int) or
+                (timestamp - last_activity) >= get_activity_granularity()):
+            request.session['last_activity'] = timestamp
+            _incr_session_stat('activity_writes')
+        else:
+            _incr_session_stat('activity_skipped')
+
+    def _count_session_write(self, request):
+        """Records whether the session will be saved for this request.
+
+        Django's session middleware runs after this one on the way out, and
+        saves the session when it has been modified.
+        """
+        session = getattr(request, 'session', None)
+        if session is None or not hasattr(request, 'horizon'):
+            return
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated():
+            return
+        _incr_session_stat('requests')
+        if (session.modified or
+                getattr(settings, 'SESSION_SAVE_EVERY_REQUEST', False)):
+            request.horizon['session_writes'] = (
+                request.horizon.get('session_writes', 0) + 1)
+            _incr_session_stat('session_writes')
 
     def process_exception(self, request, exception):
         """Catches internal Horizon exception classes such as NotAuthorized,
@@ -179,6 +244,7 @@ class HorizonMiddleware(object):
         """Convert HttpResponseRedirect to HttpResponse if request is via ajax
         to allow ajax request to redirect url
         """
+        self._count_session_write(request)
         if request.is_ajax() and hasattr(request, 'horizon'):
             queued_msgs = request.horizon['async_messages']
             if type(response) == http.HttpResponseRedirect:
@@ -218,3 +284,66 @@ class HorizonMiddleware(object):
                 # etc.) and is not meant as a long-term solution.
                 response['X-Horizon-Messages'] = json.dumps(queued_msgs)
         return response
+
+
+class ProfilerMiddleware(object):
+    """Traces the backend API calls, template renders and policy checks made
+    while handling each request.
+
+    The result is reported in a ``Server-Timing`` response header, optionally
+    in a panel appended to HTML pages when ``DEBUG`` is on, and aggregated
+    into per-view histograms which are periodically flushed to a log or
+    statsd sink. See the ``HORIZON_PROFILER`` setting.
+
+    It should be the first entry of ``MIDDLEWARE_CLASSES`` so that the whole
+    request, including the other middleware, is measured.
+    """
+
+    def __init__(self):
+        self.options = profiler.get_options()
+        self.sink = profiler.get_sink(self.options)
+        profiler.install_hooks()
+
+    def process_request(self, request):
+        profiler.start_trace(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        trace = profiler.get_trace()
+        if trace is not None:
+            trace.view_name = '%s.%s' % (view_func.__module__,
+                                         view_func.__name__)
+
+    def process_response(self, request, response):
+        trace = profiler.stop_trace()
+        if trace is None:
+            return response
+        if hasattr(request, 'horizon'):
+            trace.session_writes = request.horizon.get('session_writes')
+
+        if self.options['server_timing']:
+            response['Server-Timing'] = profiler.server_timing_header(trace)
+        if (self.options['panel'] and settings.DEBUG and
+                not request.is_ajax() and
+                not getattr(response, 'streaming', False) and
+                'text/html' in response.get('Content-Type', '')):
+            self._add_panel(trace, response)
+
+        profiler.view_statistics.add(trace)
+        views = profiler.view_statistics.collect(
+            self.options['dump_interval'])
+        if views:
+            self.sink.emit(views)
+        return response
+
+    def _add_panel(self, trace, response):
+        panel = render_to_string('horizon/common/_profiler_panel.html',
+                                 {'trace': trace,
+                                  'summary': trace.summary()})
+        content = response.content.decode(response._charset)
+        position = content.lower().rfind('</body>')
+        if position == -1:
+            return
+        content = content[:position] + panel + content[position:]
+        response.content = content.encode(response._charset)
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = len(response.content)
@@ -83,6 +83,14 @@ limitations under the License.
     this.delete = function (url, data, config) {
       return httpCall('DELETE', url, data, config);
     };
+
+    // Makes several calls of the REST API with a single request. Each
+    // request is an object with "path" (relative to /api/), and optionally
+    // "method", "params", "data" and "etag". The result has a "responses"
+    // list with the "status" and "data" of each call, in the same order.
+    this.batch = function (requests, config) {
+      return httpCall('POST', '/api/batch/', {requests: requests}, config);
+    };
   }
 
   angular.module('hz.api.service', [])
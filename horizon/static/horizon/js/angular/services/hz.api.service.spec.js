@@ -45,5 +45,16 @@
       expect(called.called).toBe(true);
     });
 
+    it('should post the requests of a batch', function () {
+      var called = {};
+      var requests = [{path: 'nova/keypairs/'}];
+      $httpBackend.when('POST', '/api/batch/', {requests: requests})
+        .respond({responses: [{status: 200, data: {items: []}}]});
+      $httpBackend.expectPOST('/api/batch/');
+      api.batch(requests).success(function (data) {called.data = data;});
+      $httpBackend.flush();
+      expect(called.data.responses[0].status).toBe(200);
+    });
+
   });
 }());
\ No newline at end of file
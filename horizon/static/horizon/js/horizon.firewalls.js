@@ -1,38 +1,7 @@
 horizon.firewalls = {
-  user_decided_length: false,
   rules_selected: [],
   rules_available: [],
 
-  getConsoleLog: function(via_user_submit) {
-    var form_element = $("#tail_length"),
-      data;
-
-    if (!via_user_submit) {
-      via_user_submit = false;
-    }
-
-    if(this.user_decided_length) {
-      data = $(form_element).serialize();
-    } else {
-      data = "length=35";
-    }
-
-    $.ajax({
-      url: $(form_element).attr('action'),
-      data: data,
-      method: 'get',
-      success: function(response_body) {
-        $('pre.logs').text(response_body);
-      },
-      error: function(response) {
-        if(via_user_submit) {
-          horizon.clearErrorMessages();
-          horizon.alert('error', gettext('There was a problem communicating with the server, please try again.'));
-        }
-      }
-    });
-  },
-
   /*
    * Gets the html select element associated with a given
    * rule id for rule_id.
@@ -146,10 +115,3 @@ horizon.firewalls = {
   }
 };
 
-horizon.addInitFunction(horizon.firewalls.init = function () {
-  $(document).on('submit', '#tail_length', function (evt) {
-    horizon.firewalls.user_decided_length = true;
-    horizon.firewalls.getConsoleLog(true);
-    evt.preventDefault();
-  });
-});
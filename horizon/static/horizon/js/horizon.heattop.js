@@ -177,17 +177,27 @@ function build_reverse_links(node){
 
 function ajax_poll(poll_time){
   setTimeout(function() {
-    $.getJSON(ajax_url, function(json) {
-      //update d3 data element
-      $("#d3_data").attr("data-d3_data", JSON.stringify(json));
+    //Only ask for the nodes changed since the last version we got
+    $.getJSON(ajax_url, {since: version}, function(json) {
+      version = json.version;
 
       //update stack
       $("#stack_box").html(json.stack.info_box);
-      set_in_progress(json.stack, json.nodes);
+      in_progress = json.in_progress;
       needs_update = false;
 
-      //Check Remove nodes
-      remove_nodes(nodes, json.nodes);
+      if (json.delta === true) {
+        //Remove the nodes which are gone, the others are unchanged
+        json.removed.forEach(function(name){
+          if (findNode(name)) { removeNode(name); }
+        });
+      } else {
+        //update d3 data element
+        $("#d3_data").attr("data-d3_data", JSON.stringify(json));
+
+        //Check Remove nodes
+        remove_nodes(nodes, json.nodes);
+      }
 
       //Check for updates and new nodes
       json.nodes.forEach(function(d){
@@ -249,6 +259,7 @@ if ($(container).length){
     stack_id = $("#stack_id").data("stack_id"),
     ajax_url = '/project/stacks/get_d3_data/' + stack_id + '/',
     graph = $("#d3_data").data("d3_data"),
+    version = graph.version,
     force = d3.layout.force()
       .nodes(graph.nodes)
       .links([])
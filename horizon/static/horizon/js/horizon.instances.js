@@ -6,6 +6,8 @@ horizon.instances = {
 
   getConsoleLog: function(via_user_submit) {
     var form_element = $("#tail_length"),
+      log_element = $('pre.logs'),
+      length = "35",
       data;
 
     if (!via_user_submit) {
@@ -13,17 +15,36 @@ horizon.instances = {
     }
 
     if(this.user_decided_length) {
-      data = $(form_element).serialize();
-    } else {
-      data = "length=35";
+      length = $(form_element).find('input[name="length"]').val();
+    }
+    data = {length: length};
+    // Only ask for what was appended since the last fetch, unless the
+    // length changed (which changes what the log shows).
+    if (log_element.attr('data-length') === length) {
+      data.cursor = log_element.attr('data-cursor');
     }
 
     $.ajax({
-      url: $(form_element).attr('action'),
+      url: $(form_element).data('tail-url'),
       data: data,
       method: 'get',
-      success: function(response_body) {
-        $('pre.logs').text(response_body);
+      dataType: 'json',
+      success: function(response) {
+        var text = response.text,
+          lines;
+        if (response.append) {
+          // The server resends the trailing partial line, if any.
+          text = log_element.text().replace(/[^\n]*$/, '') + text;
+          if (length) {
+            lines = text.split('\n');
+            if (lines.length > parseInt(length, 10) + 1) {
+              text = lines.slice(-parseInt(length, 10) - 1).join('\n');
+            }
+          }
+        }
+        log_element.text(text);
+        log_element.attr('data-cursor', response.cursor);
+        log_element.attr('data-length', length);
       },
       error: function(response) {
         if(via_user_submit) {
@@ -2,6 +2,7 @@
 
 horizon.network_topology = {
   model: null,
+  version: null,
   fa_globe_glyph: '\uf0ac',
   fa_globe_glyph_width: 15,
   svg:'#topology_canvas',
@@ -108,7 +109,7 @@ horizon.network_topology = {
           horizon.autoDismissAlerts();
           self.previous_message = message.message;
           self.delete_post_message(message.iframe_id);
-          self.load_network_info();
+          self.load_network_info(true);
           setTimeout(function() {
             self.previous_message = null;
           },10000);
@@ -117,21 +118,65 @@ horizon.network_topology = {
 
     self.load_network_info();
   },
-  load_network_info:function(){
+  load_network_info:function(refresh){
     var self = this;
     if($('#networktopology').length === 0) {
       return;
     }
+    var params = {};
+    if (self.version && self.model) {
+      params.version = self.version;
+    }
+    if (refresh) {
+      params.refresh = true;
+    }
     $.getJSON($('#networktopology').data('networktopology') + '?' + $.now(),
+      params,
       function(data) {
-        self.model = data;
-        self.data_convert();
+        if (!data.unchanged) {
+          if (data.delta) {
+            self.apply_changes(data);
+          } else {
+            self.model = data;
+          }
+          self.version = data.version;
+          self.data_convert();
+        }
         setTimeout(function(){
           self.load_network_info();
         }, self.reload_duration);
       }
     );
   },
+  apply_changes:function(changes) {
+    // Each list of the model is given as the items added or modified and
+    // the ids of those removed since the version we have.
+    var self = this;
+    $.each(['networks', 'ports', 'routers', 'servers'], function(i, key) {
+      var change = changes[key];
+      if (!change) {
+        return;
+      }
+      var changed = {};
+      $.each(change.changed, function(j, item) {
+        changed[item.id] = item;
+      });
+      var items = $.grep(self.model[key], function(item) {
+        return $.inArray(item.id, change.removed) === -1;
+      });
+      items = $.map(items, function(item) {
+        var update = changed[item.id];
+        delete changed[item.id];
+        return update || item;
+      });
+      $.each(change.changed, function(j, item) {
+        if (changed[item.id]) {
+          items.push(item);
+        }
+      });
+      self.model[key] = items;
+    });
+  },
   select_draw_mode:function() {
     var self = this;
     var draw_mode = horizon.cookies.get('ntp_draw_mode');
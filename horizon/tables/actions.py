@@ -13,7 +13,9 @@
 #    under the License.
 
 from collections import defaultdict
+import copy
 import logging
+import re
 import types
 import warnings
 
@@ -22,8 +24,10 @@ from django.core import urlresolvers
 from django import shortcuts
 from django.template.loader import render_to_string  # noqa
 from django.utils.datastructures import SortedDict
+from django.utils.encoding import iri_to_uri
 from django.utils.functional import Promise  # noqa
 from django.utils.http import urlencode  # noqa
+from django.utils.http import urlquote
 from django.utils.translation import pgettext_lazy
 from django.utils.translation import ugettext_lazy as _
 from django.utils.translation import ungettext_lazy
@@ -132,10 +136,27 @@ class BaseAction(html.HTMLElement):
 
         if policy_check and self.policy_rules:
             target = self.get_policy_target(request, datum)
-            return (policy_check(self.policy_rules, request, target) and
+            return (self._check_policy(policy_check, request, target) and
                     self.allowed(request, datum))
         return self.allowed(request, datum)
 
+    def _check_policy(self, policy_check, request, target):
+        """Runs the policy check, reusing the result of an identical check
+        made earlier for the same table (e.g. for another row).
+        """
+        results = getattr(self.table, '_policy_results', None)
+        if results is None:
+            return policy_check(self.policy_rules, request, target)
+        try:
+            key = (tuple(self.policy_rules), tuple(sorted(target.items())))
+            hash(key)
+        except TypeError:
+            # The rules or the target can't be hashed.
+            return policy_check(self.policy_rules, request, target)
+        if key not in results:
+            results[key] = policy_check(self.policy_rules, request, target)
+        return results[key]
+
     def update(self, request, datum):
         """Allows per-action customization based on current conditions.
 
@@ -966,3 +987,136 @@ class UpdateAction(object):
         Data of the row and of the cell are passed to the method.
         """
         return True
+
+
+_MISSING = object()
+
+# Stand in for the object ids when a link action's URL is reversed once for
+# the whole table: each is used for the ids of the form matched by its
+# pattern, if the URL accepts it. Other ids get their URL reversed per row.
+_URL_ID_PLACEHOLDERS = (
+    ('73310000133700', re.compile(r'^\d+$')),
+    ('7331abcd-0000-4133-8700-0123456789ef',
+     re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-'
+                r'[0-9a-f]{12}$')),
+)
+
+
+def _lookup_class_attr(cls, name):
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass.__dict__[name]
+    return _MISSING
+
+
+def _overrides(cls, name, *bases):
+    """Whether cls defines the method ``name`` other than on the bases."""
+    method = _lookup_class_attr(cls, name)
+    return all(method is not base.__dict__.get(name) for base in bases)
+
+
+class BoundRowAction(object):
+    """Base of the classes of the row actions bound to a single row.
+
+    Instead of copying the table's action for each row, each row gets an
+    instance of a subclass of the action's class (see :func:`bind_row_action`)
+    starting with the instance attributes of the table's action,
+    ``base_action``, and holding the row's datum and whatever is set while
+    handling the row (e.g. by ``allowed()`` or ``update()``).
+    """
+
+
+_bound_row_action_classes = {}
+
+
+def bind_row_action(action, datum):
+    """Returns a :class:`BoundRowAction` of action for the row of datum."""
+    cls = type(action)
+    bound_cls = _bound_row_action_classes.get(cls)
+    if bound_cls is None:
+        bound_cls = _bound_row_action_classes[cls] = type(cls)(
+            cls.__name__, (BoundRowAction, cls),
+            {'__module__': cls.__module__})
+    bound_action = object.__new__(bound_cls)
+    # A shallow copy of the attributes set by the action's __init__, which
+    # may differ from the class attributes (e.g. classes, verbose_name).
+    bound_action.__dict__.update(action.__dict__)
+    bound_action.base_action = action
+    bound_action.datum = datum
+    return bound_action
+
+
+class RowActionPlan(object):
+    """What can be worked out once per table about one of its row actions.
+
+    An action which doesn't override ``allowed()`` (or the policy target)
+    gets the same answer for every row, so it is only checked for the first
+    row. The URL of a link action which doesn't override ``get_link_url()``
+    is reversed once with placeholder ids, and the ids of the rows of the
+    same form are put in it; other ids are reversed for each row, as
+    ``get_link_url()`` does. ``update()`` is only called for the actions
+    which implement it.
+    """
+
+    def __init__(self, table, action):
+        self.table = table
+        self.action = action
+        cls = type(action)
+        self.per_row_allowed = (
+            table._meta.mixed_data_type or
+            _overrides(cls, 'allowed', BaseAction) or
+            _overrides(cls, '_allowed', BaseAction, BatchAction) or
+            _overrides(cls, 'get_policy_target', BaseAction))
+        self.allowed = None
+        self.updates = _overrides(cls, 'update', BaseAction)
+        # Rows which are customized get their own copy of the attributes.
+        self.copy_attrs = self.updates or self.per_row_allowed
+        self.is_link = isinstance(action, LinkAction)
+        self.url_templates = []
+        if (self.is_link and action.url and not callable(action.url) and
+                not _overrides(cls, 'get_link_url', LinkAction)):
+            for placeholder, id_pattern in _URL_ID_PLACEHOLDERS:
+                template = self._reverse_url_template(action.url,
+                                                      placeholder)
+                if template is not None:
+                    self.url_templates.append((id_pattern, template))
+
+    def _reverse_url_template(self, url, placeholder):
+        try:
+            bound_url = urlresolvers.reverse(url, args=(placeholder,))
+        except urlresolvers.NoReverseMatch:
+            return None
+        prefix, found, suffix = bound_url.partition(placeholder)
+        if not found or placeholder in suffix:
+            return None
+        return prefix, suffix
+
+    def bind(self, request, datum):
+        """Returns the BoundRowAction for the row, or None if the action
+        isn't allowed for it.
+        """
+        if self.allowed is False:
+            return None
+        bound_action = bind_row_action(self.action, datum)
+        if self.copy_attrs:
+            bound_action.attrs = copy.copy(self.action.attrs)
+        if self.allowed is None:
+            allowed = self.table._filter_action(bound_action, request, datum)
+            if not self.per_row_allowed:
+                self.allowed = bool(allowed)
+            if not allowed:
+                return None
+        if self.updates:
+            bound_action.update(request, datum)
+        if self.is_link:
+            bound_action.bound_url = self.get_link_url(bound_action, datum)
+        return bound_action
+
+    def get_link_url(self, bound_action, datum):
+        if datum:
+            obj_id = six.text_type(self.table.get_object_id(datum))
+            for id_pattern, (prefix, suffix) in self.url_templates:
+                if id_pattern.match(obj_id):
+                    return "%s%s%s" % (prefix, iri_to_uri(urlquote(obj_id)),
+                                       suffix)
+        return bound_action.get_link_url(datum)
@@ -41,6 +41,7 @@ from horizon import exceptions
 from horizon import messages
 from horizon.tables.actions import FilterAction  # noqa
 from horizon.tables.actions import LinkAction  # noqa
+from horizon.tables.actions import RowActionPlan  # noqa
 from horizon.utils import html
 
 
@@ -1155,6 +1156,10 @@ class DataTable(object):
         self.breadcrumb = None
         self.current_item_id = None
         self.permissions = self._meta.permissions
+        # The results of the policy checks of the actions, see
+        # BaseAction._check_policy, and the plans of the row actions.
+        self._policy_results = {}
+        self._row_action_plans = None
 
         # Create a new set
         columns = []
@@ -1361,25 +1366,25 @@ class DataTable(object):
         return [action for action in bound_actions if
                 self._filter_action(action, self.request)]
 
+    def get_row_action_plans(self):
+        """Returns a :class:`~horizon.tables.actions.RowActionPlan` for each
+        of the row actions, built once for the table.
+        """
+        if self._row_action_plans is None:
+            self._row_action_plans = [
+                RowActionPlan(self, self.base_actions[action.name])
+                for action in self._meta.row_actions]
+        return self._row_action_plans
+
     def get_row_actions(self, datum):
         """Returns a list of the action instances for a specific row."""
         bound_actions = []
-        for action in self._meta.row_actions:
-            # Copy to allow modifying properties per row
-            bound_action = copy.copy(self.base_actions[action.name])
-            bound_action.attrs = copy.copy(bound_action.attrs)
-            bound_action.datum = datum
-            # Remove disallowed actions.
-            if not self._filter_action(bound_action,
-                                       self.request,
-                                       datum):
-                continue
-            # Hook for modifying actions based on data. No-op by default.
-            bound_action.update(self.request, datum)
-            # Pre-create the URL for this link with appropriate parameters
-            if issubclass(bound_action.__class__, LinkAction):
-                bound_action.bound_url = bound_action.get_link_url(datum)
-            bound_actions.append(bound_action)
+        for plan in self.get_row_action_plans():
+            # Disallowed actions are skipped; allowed ones are updated for
+            # the datum and get their URL.
+            bound_action = plan.bind(self.request, datum)
+            if bound_action is not None:
+                bound_actions.append(bound_action)
         return bound_actions
 
     def set_multiselect_column_visibility(self, visible=True):
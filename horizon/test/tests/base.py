@@ -17,15 +17,26 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+import shutil
+import tempfile
+
 from django.conf import settings
 from django.contrib.auth.models import User  # noqa
 from django.core.exceptions import ImproperlyConfigured  # noqa
+from django.core.management.base import CommandError  # noqa
+from django.core.management import call_command
 from django.core import urlresolvers
+from django.template import Context  # noqa
+from django.template import TemplateDoesNotExist  # noqa
+from django.test.utils import override_settings
 from django.utils.importlib import import_module  # noqa
+import six
 
 import horizon
 from horizon import base
 from horizon import conf
+from horizon import loaders
 from horizon.test import helpers as test
 from horizon.test.test_dashboards.cats.dashboard import Cats  # noqa
 from horizon.test.test_dashboards.cats.kittens.panel import Kittens  # noqa
@@ -397,6 +408,77 @@ class CustomPanelTests(BaseHorizonTests):
             horizon.get_dashboard("dogs")
 
 
+class TemplateLoaderTests(BaseHorizonTests):
+
+    def setUp(self):
+        super(TemplateLoaderTests, self).setUp()
+        self.loader = loaders.CachedLoader(
+            ('django.template.loaders.filesystem.Loader',
+             'django.template.loaders.app_directories.Loader',
+             'horizon.loaders.TemplateLoader'))
+        self.template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.template_dir)
+
+    def _write_template(self, name, source, mtime=None):
+        path = os.path.join(self.template_dir, name)
+        with open(path, 'w') as f:
+            f.write(source)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    @override_settings(HORIZON_TEMPLATE_AUTO_RELOAD=False)
+    def test_cached_loader(self):
+        template, origin = self.loader.load_template(
+            'cats/kittens/index.html')
+        self.assertEqual(template, self.loader.load_template(
+            'cats/kittens/index.html')[0])
+        # Panel templates are cached under the directory of their panel.
+        key = self.loader.cache_key('cats/kittens/index.html')
+        self.assertIn(loaders.panel_template_dirs['cats/kittens'], key)
+
+        # Missing templates are remembered too.
+        self.assertRaises(TemplateDoesNotExist, self.loader.load_template,
+                          'cats/kittens/missing.html')
+        self.assertIn(self.loader.cache_key('cats/kittens/missing.html'),
+                      self.loader.template_cache)
+
+    @override_settings(HORIZON_TEMPLATE_AUTO_RELOAD=False)
+    def test_cached_loader_without_reload(self):
+        self._write_template('test.html', 'one', mtime=1000)
+        template, origin = self.loader.load_template('test.html',
+                                                     [self.template_dir])
+        self._write_template('test.html', 'two', mtime=2000)
+        template, origin = self.loader.load_template('test.html',
+                                                     [self.template_dir])
+        self.assertEqual('one', template.render(Context()))
+
+    @override_settings(HORIZON_TEMPLATE_AUTO_RELOAD=True)
+    def test_cached_loader_reload(self):
+        self._write_template('test.html', 'one', mtime=1000)
+        template, origin = self.loader.load_template('test.html',
+                                                     [self.template_dir])
+        self.assertEqual(template, self.loader.load_template(
+            'test.html', [self.template_dir])[0])
+        self._write_template('test.html', 'two', mtime=2000)
+        template, origin = self.loader.load_template('test.html',
+                                                     [self.template_dir])
+        self.assertEqual('two', template.render(Context()))
+
+    def test_compile_templates(self):
+        self.assertIn('cats/kittens/index.html',
+                      loaders.panel_template_names())
+        call_command('compile_templates', verbosity=0)
+
+        os.mkdir(os.path.join(self.template_dir, 'kittens'))
+        self._write_template('kittens/broken.html', '{% if %}')
+        self.addCleanup(loaders.panel_template_dirs.__setitem__,
+                        'cats/kittens',
+                        loaders.panel_template_dirs['cats/kittens'])
+        loaders.panel_template_dirs['cats/kittens'] = self.template_dir
+        self.assertRaises(CommandError, call_command, 'compile_templates',
+                          verbosity=0, stderr=six.StringIO())
+
+
 class CustomPermissionsTests(BaseHorizonTests):
 
     """Test customization of permissions on panels
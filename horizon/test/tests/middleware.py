@@ -16,12 +16,14 @@
 import time
 
 from django.conf import settings
-
+from django.http import HttpResponse  # noqa
 from django.http import HttpResponseRedirect  # noqa
+from django.test.utils import override_settings
 
 from horizon import exceptions
 from horizon import middleware
 from horizon.test import helpers as test
+from horizon.utils import profiler
 
 
 class MiddlewareTests(test.TestCase):
@@ -48,6 +50,46 @@ class MiddlewareTests(test.TestCase):
         self.assertEqual(302, resp.status_code)
         self.assertEqual(requested_url, resp.get('Location'))
 
+    @override_settings(SESSION_ACTIVITY_GRANULARITY=60)
+    def test_last_activity_not_rewritten_within_granularity(self):
+        request = self.factory.get('/project/instances/')
+        last_activity = int(time.time()) - 30
+        request.session['last_activity'] = last_activity
+        request.session.modified = False
+        mw = middleware.HorizonMiddleware()
+        self.assertIsNone(mw.process_request(request))
+        self.assertEqual(last_activity, request.session['last_activity'])
+        self.assertFalse(request.session.modified)
+
+    @override_settings(SESSION_ACTIVITY_GRANULARITY=60)
+    def test_last_activity_rewritten_after_granularity(self):
+        request = self.factory.get('/project/instances/')
+        last_activity = int(time.time()) - 90
+        request.session['last_activity'] = last_activity
+        mw = middleware.HorizonMiddleware()
+        self.assertIsNone(mw.process_request(request))
+        self.assertTrue(request.session['last_activity'] > last_activity)
+
+    @override_settings(SESSION_ACTIVITY_GRANULARITY=60, SESSION_TIMEOUT=1800)
+    def test_session_timeout_tolerates_granularity(self):
+        request = self.factory.get('/project/instances/')
+        request.session['last_activity'] = int(time.time()) - (1800 + 30)
+        mw = middleware.HorizonMiddleware()
+        self.assertIsNone(mw.process_request(request))
+
+    def test_session_writes_counted(self):
+        request = self.factory.get('/project/instances/')
+        mw = middleware.HorizonMiddleware()
+        mw.process_request(request)
+        before = middleware.get_session_stats()
+        request.session.modified = True
+        mw.process_response(request, HttpResponse())
+        after = middleware.get_session_stats()
+        self.assertEqual(1, request.horizon['session_writes'])
+        self.assertEqual(before['session_writes'] + 1,
+                         after['session_writes'])
+        self.assertEqual(before['requests'] + 1, after['requests'])
+
     def test_process_response_redirect_on_ajax_request(self):
         url = settings.LOGIN_URL
         mw = middleware.HorizonMiddleware()
@@ -64,3 +106,32 @@ class MiddlewareTests(test.TestCase):
         resp = mw.process_response(request, response)
         self.assertEqual(200, resp.status_code)
         self.assertEqual(url, resp['X-Horizon-Location'])
+
+
+class ProfilerMiddlewareTests(test.TestCase):
+    def test_server_timing_header(self):
+        request = self.factory.get('/project/instances/')
+        mw = middleware.ProfilerMiddleware()
+        mw.process_request(request)
+        mw.process_view(request, _dummy_view, (), {})
+        profiler.record_api_call('compute', 'GET', '/v2/{id}/servers/detail',
+                                 200, 12.5, 1024)
+        profiler.record_api_call('compute', 'GET', '/v2/{id}/flavors/{id}',
+                                 cached=True)
+        profiler.record_policy_check((('compute', 'compute:get'),), 0.5,
+                                     True)
+        resp = mw.process_response(request, HttpResponse())
+
+        self.assertIsNone(profiler.get_trace())
+        header = resp['Server-Timing']
+        self.assertIn('compute;dur=12.5;desc="2 calls, 1 cached"', header)
+        self.assertIn('policy;dur=0.5;desc="1 checks"', header)
+        self.assertIn('total;dur=', header)
+
+    def test_nothing_recorded_without_trace(self):
+        profiler.record_api_call('compute', 'GET', '/v2/{id}/servers', 200)
+        self.assertIsNone(profiler.get_trace())
+
+
+def _dummy_view(request):
+    pass
@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from django.core import urlresolvers
 from django.core.urlresolvers import reverse
 from django import forms
 from django import http
@@ -320,6 +321,30 @@ class DisabledActionsTable(tables.DataTable):
         multi_select = True
 
 
+class MyDetailAction(tables.LinkAction):
+    name = "detail"
+    verbose_name = "Detail"
+    url = "horizon:cats:kittens:detail"
+
+
+class MyPolicyAction(tables.Action):
+    name = "policy"
+    verbose_name = "Policy"
+    policy_rules = (("compute", "compute:start"),)
+
+    def handle(self, data_table, request, object_ids):
+        pass
+
+
+class PlannedActionsTable(tables.DataTable):
+    id = tables.Column('id')
+
+    class Meta(object):
+        name = "planned_actions_table"
+        verbose_name = "Planned Actions Table"
+        row_actions = (MyAction, MyDetailAction, MyPolicyAction)
+
+
 class DataTableTests(test.TestCase):
     def test_table_instantiation(self):
         """Tests everything that happens when the table is instantiated."""
@@ -379,6 +404,136 @@ class DataTableTests(test.TestCase):
         self.assertEqual(forms.CharField, name_column.form_field.__class__)
         self.assertEqual({'class': 'test'}, name_column.form_field_attributes)
 
+    def test_row_action_plans(self):
+        checks = []
+
+        def policy_check(rules, request, target):
+            checks.append(rules)
+            return True
+
+        self.mox.StubOutWithMock(urlresolvers, 'reverse')
+        urlresolvers.reverse('horizon:cats:kittens:detail',
+                             args=(IsA(str),)) \
+            .AndReturn('/cats/kittens/73310000133700/detail/')
+        # The URL only accepts numbers.
+        urlresolvers.reverse('horizon:cats:kittens:detail',
+                             args=(IsA(str),)) \
+            .AndRaise(urlresolvers.NoReverseMatch())
+        self.mox.ReplayAll()
+
+        with self.settings(POLICY_CHECK_FUNCTION=policy_check):
+            self.table = PlannedActionsTable(self.request, TEST_DATA)
+            row_actions = [self.table.get_row_actions(datum)
+                           for datum in TEST_DATA]
+        # The URL was reversed once and the policy checked once for the
+        # whole table, while allowed() was checked for each row.
+        self.assertEqual(1, len(checks))
+        self.assertQuerysetEqual(row_actions[1],
+                                 ['<MyDetailAction: detail>',
+                                  '<MyPolicyAction: policy>'])
+        self.assertEqual(['/cats/kittens/%s/detail/' % datum.id
+                          for datum in TEST_DATA],
+                         [[action.bound_url for action in actions
+                           if action.name == 'detail'][0]
+                          for actions in row_actions])
+        # Each row has its own state, the actions aren't modified.
+        self.assertIsInstance(row_actions[0][0], MyAction)
+        self.assertEqual(TEST_DATA[0], row_actions[0][0].datum)
+        self.assertIsNone(self.table.base_actions['delete'].datum)
+        self.assertIn('planned_actions_table__row_3__action_detail',
+                      row_actions[2][1].attr_string)
+
+    def test_row_action_url_per_row_fallback(self):
+        data = (FakeObject('1', 'object_1', 'value_1', 'up'),
+                FakeObject('a b', 'object_2', 'value_2', 'up'))
+        self.mox.StubOutWithMock(urlresolvers, 'reverse')
+        urlresolvers.reverse('horizon:cats:kittens:detail',
+                             args=(IsA(str),)) \
+            .AndReturn('/cats/kittens/73310000133700/detail/')
+        urlresolvers.reverse('horizon:cats:kittens:detail',
+                             args=(IsA(str),)) \
+            .AndRaise(urlresolvers.NoReverseMatch())
+        # An id of another form is reversed for its row, and the URL name
+        # is used when it can't be.
+        urlresolvers.reverse('horizon:cats:kittens:detail', args=('a b',)) \
+            .AndRaise(urlresolvers.NoReverseMatch())
+        self.mox.ReplayAll()
+
+        self.table = PlannedActionsTable(self.request, data)
+        urls = [[action.bound_url
+                 for action in self.table.get_row_actions(datum)
+                 if action.name == 'detail'][0] for datum in data]
+        self.assertEqual(['/cats/kittens/1/detail/',
+                          'horizon:cats:kittens:detail'], urls)
+
+    def test_bound_row_action_instance_attributes(self):
+        class AjaxLinkAction(tables.LinkAction):
+            name = "ajax_link"
+            verbose_name = "Class Name"
+            url = "/cats/kittens/"
+            classes = ("ajax-modal",)
+            ajax = True
+
+            def __init__(self, **kwargs):
+                kwargs['verbose_name'] = "Instance Name"
+                super(AjaxLinkAction, self).__init__(**kwargs)
+
+        class AjaxLinkTable(tables.DataTable):
+            id = tables.Column('id')
+
+            class Meta(object):
+                name = "ajax_link_table"
+                row_actions = (AjaxLinkAction,)
+
+        self.table = AjaxLinkTable(self.request, TEST_DATA)
+        action = self.table.base_actions['ajax_link']
+        bound_action = self.table.get_row_actions(TEST_DATA[0])[0]
+        # What __init__ set on the table's action, rather than the class
+        # attributes.
+        self.assertEqual(['ajax-modal', 'ajax-update'], action.classes)
+        self.assertEqual(action.classes, bound_action.classes)
+        self.assertEqual("Instance Name", bound_action.verbose_name)
+
+    def test_bound_row_action_property_setter(self):
+        class ToggleAction(tables.Action):
+            name = "toggle"
+
+            def __init__(self, **kwargs):
+                super(ToggleAction, self).__init__(**kwargs)
+                self._verbose = "Off"
+
+            @property
+            def state(self):
+                return self._verbose
+
+            @state.setter
+            def state(self, value):
+                self._verbose = value.capitalize()
+
+            def update(self, request, datum):
+                self.state = datum.status
+
+            def handle(self, data_table, request, object_ids):
+                pass
+
+        class ToggleTable(tables.DataTable):
+            id = tables.Column('id')
+
+            class Meta(object):
+                name = "toggle_table"
+                row_actions = (ToggleAction,)
+
+        self.table = ToggleTable(self.request, TEST_DATA)
+        actions = [self.table.get_row_actions(datum)[0]
+                   for datum in TEST_DATA]
+        # The setter ran for each row, and the table's action kept its own
+        # state.
+        self.assertEqual(['Up', 'Down', 'Up'],
+                         [action.state for action in actions])
+        self.assertEqual('Off', self.table.base_actions['toggle'].state)
+        self.assertIsInstance(actions[0], ToggleAction)
+        self.assertEqual('<ToggleAction: toggle>', repr(actions[0]))
+
     def test_table_force_no_multiselect(self):
         class TempTable(MyTable):
             class Meta(object):
@@ -14,6 +14,7 @@
 
 import datetime
 import os
+import threading
 
 from django.core.exceptions import ValidationError  # noqa
 import django.template
@@ -25,7 +26,9 @@ from horizon.utils import filters
 # we have to import the filter in order to register it
 from horizon.utils.filters import parse_isotime  # noqa
 from horizon.utils import functions
+from horizon.utils import jobs
 from horizon.utils import memoized
+from horizon.utils import profiler
 from horizon.utils import secret_key
 from horizon.utils import units
 from horizon.utils import validators
@@ -354,6 +357,80 @@ class MemoizedTests(test.TestCase):
             cache_calls(1)
         self.assertEqual(1, len(values_list))
 
+    def test_memoized_unhashable_arguments(self):
+        values_list = []
+
+        @memoized.memoized
+        def cache_calls(search_opts, ids):
+            values_list.append(search_opts)
+            return True
+
+        for x in range(0, 5):
+            cache_calls({'all_tenants': True, 'status': ['ACTIVE']}, [1, 2])
+        cache_calls({'status': ['ACTIVE'], 'all_tenants': True}, [1, 2])
+        self.assertEqual(1, len(values_list))
+
+        cache_calls({'all_tenants': True, 'status': ['ACTIVE']}, (1, 2))
+        self.assertEqual(2, len(values_list))
+        self.assertEqual(5, cache_calls.statistics()['hits'])
+
+    def test_memoized_max_size_evicts_least_recently_used(self):
+        values_list = []
+
+        @memoized.memoized(max_size=2)
+        def cache_calls(value):
+            values_list.append(value)
+            return value
+
+        cache_calls(1)
+        cache_calls(2)
+        cache_calls(1)
+        cache_calls(3)
+        self.assertEqual([1, 2, 3], values_list)
+        cache_calls(1)
+        self.assertEqual([1, 2, 3], values_list)
+        cache_calls(2)
+        self.assertEqual([1, 2, 3, 2], values_list)
+
+        statistics = cache_calls.statistics()
+        self.assertEqual(2, statistics['evictions'])
+        self.assertEqual(2, statistics['size'])
+        self.assertEqual(2, statistics['hits'])
+        self.assertEqual(4, statistics['misses'])
+
+    def test_memoized_invalidate(self):
+        values_list = []
+
+        @memoized.memoized
+        def cache_calls(value, opts=None):
+            values_list.append(value)
+            return value
+
+        cache_calls(1, opts={'a': 1})
+        cache_calls(2)
+        cache_calls.invalidate(1, opts={'a': 1})
+        cache_calls(1, opts={'a': 1})
+        cache_calls(2)
+        self.assertEqual([1, 2, 1], values_list)
+
+        cache_calls.invalidate()
+        cache_calls(2)
+        self.assertEqual([1, 2, 1, 2], values_list)
+
+    def test_memoized_weak_references(self):
+        class Request(object):
+            pass
+
+        @memoized.memoized
+        def cache_calls(request):
+            return True
+
+        request = Request()
+        cache_calls(request)
+        self.assertEqual(1, cache_calls.statistics()['size'])
+        del request
+        self.assertEqual(0, cache_calls.statistics()['size'])
+
 
 class GetPageSizeTests(test.TestCase):
     def test_bad_session_value(self):
@@ -456,3 +533,124 @@ class UnitsTests(test.TestCase):
 
         self.assertEqual(units.normalize(1, 'unknown_unit'),
                          (1, 'unknown_unit'))
+
+
+class ProfilerTests(test.TestCase):
+    def test_url_template(self):
+        url = ('http://nova:8774/v2/0123456789abcdef0123456789abcdef/servers/'
+               '2aa4d5b7-0e0d-4b1e-9a68-0b5b4c4f3c0e/os-interface/3'
+               '?all_tenants=1')
+        self.assertEqual('/v2/{id}/servers/{id}/os-interface/{id}',
+                         profiler.url_template(url))
+
+    def test_histogram_buckets(self):
+        histogram = profiler.Histogram((10, 100))
+        for value in (1, 10, 11, 500):
+            histogram.add(value)
+        self.assertEqual([('le_10', 2), ('le_100', 1), ('inf', 1)],
+                         list(histogram.buckets()))
+        self.assertEqual(4, histogram.count)
+        self.assertEqual(522, histogram.total)
+
+    def test_view_statistics_collect(self):
+        stats = profiler.ViewStatistics()
+        trace = profiler.RequestTrace(None)
+        trace.view_name = 'dashboard.views.IndexView'
+        trace.api_calls.append(profiler.APICall('compute', 'GET', '/', 200,
+                                                1.0, None, False))
+        trace.finish()
+        stats.add(trace)
+        views = stats.collect(0)
+        self.assertEqual(1, views['dashboard.views.IndexView']
+                         ['api_calls'].count)
+        self.assertIsNone(stats.collect(0))
+
+
+class JobsTests(test.TestCase):
+    def setUp(self):
+        super(JobsTests, self).setUp()
+        self.request = self.factory.get('/')
+
+    def test_job_succeeds(self):
+        def work(job, size):
+            job.update(bytes_total=size)
+            job.update(bytes_done=size // 2)
+
+        job_id = jobs.submit(self.request, 'test', work, args=(10,),
+                             resource_id='resource')
+        jobs._pool.join()
+        state = jobs.get_job(job_id)
+        self.assertEqual(jobs.SUCCEEDED, state['status'])
+        self.assertEqual(100, state['progress'])
+        self.assertEqual(5, state['bytes_done'])
+        self.assertEqual(job_id, jobs.get_job_for_resource('resource')['id'])
+        self.assertFalse(jobs.cancel(job_id))
+
+    def test_job_fails(self):
+        def work(job):
+            raise ValueError('broken')
+
+        job_id = jobs.submit(self.request, 'test', work)
+        jobs._pool.join()
+        state = jobs.get_job(job_id)
+        self.assertEqual(jobs.FAILED, state['status'])
+        self.assertEqual('broken', state['error'])
+
+    def test_job_cancelled(self):
+        started = threading.Event()
+        cancelled = threading.Event()
+
+        def work(job):
+            started.set()
+            cancelled.wait(5)
+            job._last_sync = 0
+            job.check_cancelled()
+
+        job_id = jobs.submit(self.request, 'test', work)
+        started.wait(5)
+        self.assertTrue(jobs.cancel(job_id))
+        cancelled.set()
+        jobs._pool.join()
+        self.assertEqual(jobs.CANCELLED, jobs.get_job(job_id)['status'])
+
+    def test_cancel_keeps_job_state(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def work(job):
+            started.set()
+            release.wait(5)
+
+        job_id = jobs.submit(self.request, 'test', work)
+        started.wait(5)
+        self.assertTrue(jobs.cancel(job_id))
+        state = jobs.get_job(job_id)
+        self.assertEqual(jobs.RUNNING, state['status'])
+        self.assertTrue(state['cancel_requested'])
+
+        # A job finishing without checking for the cancellation isn't
+        # reported as running by the cancel request.
+        release.set()
+        jobs._pool.join()
+        self.assertEqual(jobs.SUCCEEDED, jobs.get_job(job_id)['status'])
+
+    def test_queue_full(self):
+        started = threading.Semaphore(0)
+        release = threading.Event()
+        options = jobs.get_options()
+
+        def work(job):
+            started.release()
+            release.wait(5)
+
+        # Occupy every worker before filling the queue.
+        for i in range(options['workers']):
+            jobs.submit(self.request, 'test', work)
+        for i in range(options['workers']):
+            started.acquire()
+        for i in range(options['max_pending']):
+            jobs.submit(self.request, 'test', work)
+        self.assertRaises(jobs.QueueFull, jobs.submit, self.request, 'test',
+                          lambda job: None)
+        release.set()
+        jobs._pool.join()
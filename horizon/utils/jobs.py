@@ -0,0 +1,291 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Background jobs run by a bounded pool of worker threads.
+
+Work that outlives the request starting it (such as pushing an uploaded
+image to Glance) is submitted with :func:`submit`. The state of every job
+(status, progress, bytes transferred, error) is kept in the Django cache,
+so that any dashboard process can report on it or cancel it, not only the
+one running it. With a per-process cache backend (the default local memory
+cache) this only holds within a single process.
+"""
+
+import atexit
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from six.moves import queue
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_OPTIONS = {
+    # The number of jobs run at the same time by each process.
+    'workers': 4,
+    # The number of jobs waiting for a worker; more are refused.
+    'max_pending': 20,
+    # How long (in seconds) the state of a job is kept.
+    'state_timeout': 86400,
+}
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# How often (in seconds) a running job writes its progress to the cache and
+# checks whether it was cancelled.
+UPDATE_INTERVAL = 1.0
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while too many are pending."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job to stop it when it was cancelled."""
+
+
+def get_options():
+    options = dict(DEFAULT_OPTIONS)
+    options.update(getattr(settings, 'HORIZON_JOBS', {}))
+    return options
+
+
+def _job_key(job_id):
+    return 'horizon:job:%s' % job_id
+
+
+def _resource_key(resource_id):
+    return 'horizon:job:resource:%s' % resource_id
+
+
+def _cancel_key(job_id):
+    return 'horizon:job:%s:cancel' % job_id
+
+
+def _save(state):
+    state['updated'] = time.time()
+    cache.set(_job_key(state['id']), state,
+              get_options()['state_timeout'])
+
+
+def get_job(job_id):
+    """Returns the state of the job as a dict, or None if it is unknown.
+
+    The dict holds the ``id``, ``name``, ``status``, ``progress`` (a
+    percentage, or None if unknown), ``bytes_done``, ``bytes_total``,
+    ``error``, ``resource_id``, ``user_id`` and ``project_id`` of the job,
+    and whether it was asked to stop (``cancel_requested``).
+    """
+    state = cache.get(_job_key(job_id))
+    if state is not None and not state.get('cancel_requested'):
+        state['cancel_requested'] = bool(cache.get(_cancel_key(job_id)))
+    return state
+
+
+def get_job_for_resource(resource_id):
+    """Returns the state of the last job submitted for resource_id."""
+    job_id = cache.get(_resource_key(resource_id))
+    if job_id is None:
+        return None
+    return get_job(job_id)
+
+
+def cancel(job_id):
+    """Asks the job to stop.
+
+    A queued job doesn't start. A running job stops the next time it checks
+    for cancellation (see :meth:`Job.check_cancelled`). Returns False if the
+    job is unknown or already finished.
+
+    Only the process running the job writes its state. The request is
+    stored under a key of its own, which the job reads.
+    """
+    state = cache.get(_job_key(job_id))
+    if state is None or state['status'] in FINISHED_STATUSES:
+        return False
+    cache.set(_cancel_key(job_id), True, get_options()['state_timeout'])
+    return True
+
+
+class Job(object):
+    """The handle passed to the function run by a job.
+
+    It reports progress and tells the function whether it was cancelled.
+    Both are throttled to one cache access per ``UPDATE_INTERVAL``.
+    """
+
+    def __init__(self, state):
+        self.id = state['id']
+        self._state = state
+        self._last_sync = 0
+
+    @property
+    def state(self):
+        return dict(self._state)
+
+    def _sync(self, force=False):
+        now = time.time()
+        if not force and now - self._last_sync < UPDATE_INTERVAL:
+            return
+        self._last_sync = now
+        if cache.get(_cancel_key(self.id)):
+            self._state['cancel_requested'] = True
+        _save(self._state)
+
+    def update(self, progress=None, bytes_done=None, bytes_total=None):
+        if bytes_total is not None:
+            self._state['bytes_total'] = bytes_total
+        if bytes_done is not None:
+            self._state['bytes_done'] = bytes_done
+            total = self._state.get('bytes_total')
+            if progress is None and total:
+                progress = min(100, bytes_done * 100 // total)
+        if progress is not None:
+            self._state['progress'] = progress
+        self._sync()
+
+    @property
+    def cancelled(self):
+        self._sync()
+        return bool(self._state.get('cancel_requested'))
+
+    def check_cancelled(self):
+        """Raises JobCancelled if the job was cancelled."""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def _finish(self, status, error=None):
+        self._state['status'] = status
+        self._state['error'] = error
+        if status == SUCCEEDED:
+            self._state['progress'] = 100
+        _save(self._state)
+
+
+class _Pool(object):
+    """Worker threads, started on first use, and the jobs they run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = None
+        self._threads = []
+        # The jobs of this process which haven't finished.
+        self._active = {}
+
+    def _start(self):
+        options = get_options()
+        self._queue = queue.Queue(options['max_pending'])
+        for i in range(options['workers']):
+            thread = threading.Thread(target=self._work,
+                                      name='horizon-job-worker-%d' % i)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job, func, args, kwargs):
+        with self._lock:
+            if self._queue is None:
+                self._start()
+            try:
+                self._queue.put_nowait((job, func, args, kwargs))
+            except queue.Full:
+                raise QueueFull()
+            self._active[job.id] = job
+
+    def _work(self):
+        while True:
+            job, func, args, kwargs = self._queue.get()
+            try:
+                self._run(job, func, args, kwargs)
+            finally:
+                with self._lock:
+                    self._active.pop(job.id, None)
+                self._queue.task_done()
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancelled:
+            job._finish(CANCELLED)
+            return
+        job._state['status'] = RUNNING
+        job._state['started'] = time.time()
+        job._sync(force=True)
+        try:
+            func(job, *args, **kwargs)
+        except JobCancelled:
+            job._finish(CANCELLED)
+        except Exception as e:
+            LOG.exception('Background job %s (%s) failed.',
+                          job.id, job._state['name'])
+            job._finish(FAILED, error=str(e) or e.__class__.__name__)
+        else:
+            job._finish(SUCCEEDED)
+
+    def join(self):
+        """Waits until every submitted job has finished."""
+        if self._queue is not None:
+            self._queue.join()
+
+    def interrupt(self):
+        """Marks the unfinished jobs of this process as failed."""
+        with self._lock:
+            jobs = list(self._active.values())
+            self._active.clear()
+        for job in jobs:
+            job._finish(FAILED, error='Interrupted by a server restart.')
+
+
+_pool = _Pool()
+atexit.register(_pool.interrupt)
+
+
+def submit(request, name, func, args=(), kwargs=None, resource_id=None):
+    """Runs ``func(job, *args, **kwargs)`` in the background.
+
+    ``job`` is a :class:`Job` handle the function uses to report progress
+    and check for cancellation. ``resource_id`` (an image id, for example)
+    lets the job be found with :func:`get_job_for_resource`. Returns the id
+    of the job; raises QueueFull when too many jobs are pending.
+    """
+    user = getattr(request, 'user', None)
+    state = {'id': uuid.uuid4().hex,
+             'name': name,
+             'status': QUEUED,
+             'progress': None,
+             'bytes_done': 0,
+             'bytes_total': None,
+             'error': None,
+             'cancel_requested': False,
+             'resource_id': resource_id,
+             'user_id': getattr(user, 'id', None),
+             'project_id': getattr(user, 'tenant_id', None),
+             'created': time.time()}
+    job = Job(state)
+    _save(state)
+    try:
+        _pool.submit(job, func, args, kwargs or {})
+    except QueueFull:
+        job._finish(FAILED, error='Too many pending jobs.')
+        raise
+    if resource_id is not None:
+        cache.set(_resource_key(resource_id), job.id,
+                  get_options()['state_timeout'])
+    return job.id
@@ -12,7 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import functools
+import threading
 import warnings
 import weakref
 
@@ -34,19 +36,97 @@ def _try_weakref(arg, remove_callback):
     return arg
 
 
+def canonicalize(arg, leaf=None):
+    """Return a hashable stand-in for arg.
+
+    Lists, tuples, sets and dicts (such as the ``search_opts`` or ``filters``
+    passed to many API calls) are turned into tagged tuples, so that equal
+    containers produce equal keys and a list is never confused with a tuple
+    holding the same items. Other values are passed through ``leaf`` when
+    it is given, e.g. to replace them with weak references.
+    """
+    if isinstance(arg, dict):
+        return (dict, tuple(sorted(
+            ((key, canonicalize(value, leaf))
+             for (key, value) in six.iteritems(arg)),
+            key=lambda item: item[0])))
+    if isinstance(arg, (list, tuple)):
+        return (type(arg), tuple(canonicalize(item, leaf) for item in arg))
+    if isinstance(arg, (set, frozenset)):
+        return (frozenset, frozenset(canonicalize(item, leaf)
+                                     for item in arg))
+    if leaf is not None:
+        return leaf(arg)
+    return arg
+
+
 def _get_key(args, kwargs, remove_callback):
     """Calculate the cache key, using weak references where possible."""
-    # Use tuples, because lists are not hashable.
-    weak_args = tuple(_try_weakref(arg, remove_callback) for arg in args)
+    def weak(arg):
+        return _try_weakref(arg, remove_callback)
+
+    weak_args = tuple(canonicalize(arg, weak) for arg in args)
     # Use a tuple of (key, values) pairs, because dict is not hashable.
     # Sort it, so that we don't depend on the order of keys.
     weak_kwargs = tuple(sorted(
-        (key, _try_weakref(value, remove_callback))
+        (key, canonicalize(value, weak))
         for (key, value) in six.iteritems(kwargs)))
     return weak_args, weak_kwargs
 
 
-def memoized(func):
+class _Cache(object):
+    """A thread-safe cache with optional LRU eviction and statistics."""
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.lock = threading.RLock()
+        self.data = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.unhashable = 0
+
+    def get(self, key):
+        """Return the cached value for key, raising KeyError on a miss."""
+        with self.lock:
+            try:
+                value = self.data.pop(key)
+            except KeyError:
+                self.misses += 1
+                raise
+            # Re-insert the entry to mark it as the most recently used one.
+            self.data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = value
+            if self.max_size is not None:
+                while len(self.data) > self.max_size:
+                    self.data.popitem(last=False)
+                    self.evictions += 1
+
+    def remove(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def statistics(self):
+        with self.lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'unhashable': self.unhashable,
+                    'size': len(self.data),
+                    'max_size': self.max_size}
+
+
+def memoized(func=None, max_size=None):
     """Decorator that caches function calls.
 
     Caches the decorated function's return value the first time it is called
@@ -54,12 +134,24 @@ def memoized(func):
     cached value is returned instead of calling the decorated function again.
 
     The cache uses weak references to the passed arguments, so it doesn't keep
-    them alive in memory forever.
+    them alive in memory forever. Lists, tuples, sets and dicts are compared
+    by value.
+
+    It can be used either as ``@memoized`` or as ``@memoized(max_size=100)``
+    to keep at most that many results, evicting the least recently used one.
+
+    The decorated function gets two extra attributes: ``invalidate(*args,
+    **kwargs)`` drops the result cached for the given arguments, or every
+    result when called without arguments, and ``statistics()`` returns the
+    hit, miss and eviction counts of the cache.
     """
-    # The dictionary in which all the data will be cached. This is a separate
+    if func is None:
+        return functools.partial(memoized, max_size=max_size)
+
+    # The cache in which all the data will be cached. This is a separate
     # instance for every decorated function, and it's stored in a closure of
     # the wrapped function.
-    cache = {}
+    cache = _Cache(max_size)
 
     @functools.wraps(func)
     def wrapped(*args, **kwargs):
@@ -70,13 +162,10 @@ def memoized(func):
 
         def remove(ref):
             """A callback to remove outdated items from cache."""
-            try:
-                # The key here is from closure, and is calculated later.
-                del cache[key]
-            except KeyError:
-                # Some other weak reference might have already removed that
-                # key -- in that case we don't need to do anything.
-                pass
+            # The key here is from closure, and is calculated later. Some
+            # other weak reference might have already removed that key --
+            # in that case we don't need to do anything.
+            cache.remove(key)
 
         key = _get_key(args, kwargs, remove)
         try:
@@ -85,19 +174,36 @@ def memoized(func):
             # happen once and likely calls some external API, database, or
             # some other slow thing. That's why the hit is in straightforward
             # code, and the miss is in an exception.
-            value = cache[key]
+            return cache.get(key)
         except KeyError:
-            value = cache[key] = func(*args, **kwargs)
+            # The lock isn't held while calling the function, so that slow
+            # calls with different arguments can run concurrently.
+            value = func(*args, **kwargs)
+            cache.set(key, value)
+            return value
         except TypeError:
-            # The calculated key may be unhashable when an unhashable object,
-            # such as a list, is passed as one of the arguments. In that case,
-            # we can't cache anything and simply always call the decorated
-            # function.
+            # The calculated key may still be unhashable when an argument is
+            # an unhashable object that we don't know how to canonicalize. In
+            # that case, we can't cache anything and simply always call the
+            # decorated function.
             warnings.warn(
                 "The key %r is not hashable and cannot be memoized." % (key,),
                 UnhashableKeyWarning, 2)
-            value = func(*args, **kwargs)
-        return value
+            with cache.lock:
+                cache.unhashable += 1
+            return func(*args, **kwargs)
+
+    def invalidate(*args, **kwargs):
+        if not args and not kwargs:
+            cache.clear()
+            return
+        try:
+            cache.remove(_get_key(args, kwargs, None))
+        except TypeError:
+            pass
+
+    wrapped.invalidate = invalidate
+    wrapped.statistics = cache.statistics
     return wrapped
 
 # We can use @memoized for methods now too, because it uses weakref and so
@@ -0,0 +1,385 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Per-request tracing of backend API calls, template renders and policy checks.
+
+A trace is started by :class:`horizon.middleware.ProfilerMiddleware` for
+every request and bound to the current thread. Code that talks to a backend
+reports to it through the ``record_*`` functions below, which do nothing
+when no trace is active, so the hooks cost next to nothing when the profiler
+is not enabled.
+"""
+
+import bisect
+import collections
+import logging
+import re
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.template import base as template_base
+import six
+from six.moves.urllib import parse as urlparse
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_OPTIONS = {
+    # Add a Server-Timing header to every traced response.
+    'server_timing': True,
+    # Append a summary panel to HTML pages (only honoured when DEBUG is on).
+    'panel': False,
+    # How often (in seconds) the per-view histograms are flushed to the sink.
+    'dump_interval': 60,
+    # Either 'log' or 'statsd'.
+    'sink': 'log',
+    'statsd_host': 'localhost',
+    'statsd_port': 8125,
+    'statsd_prefix': 'horizon',
+}
+
+# Upper bounds of the histogram buckets; the last bucket is unbounded.
+DURATION_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+API_CALL_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+APICall = collections.namedtuple('APICall', ['service', 'method', 'url',
+                                             'status', 'duration', 'size',
+                                             'cached'])
+TemplateRender = collections.namedtuple('TemplateRender',
+                                        ['name', 'duration', 'depth'])
+PolicyCheck = collections.namedtuple('PolicyCheck',
+                                     ['actions', 'duration', 'result'])
+
+_ID_SEGMENT = re.compile(r'^(?:[0-9a-fA-F]{32}|'
+                         r'[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-'
+                         r'[0-9a-fA-F]{12}|\d+)$')
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = set()
+
+
+def get_options():
+    options = dict(DEFAULT_OPTIONS)
+    options.update(getattr(settings, 'HORIZON_PROFILER', {}))
+    return options
+
+
+def url_template(url):
+    """Reduces a URL to its path with identifiers replaced by ``{id}``.
+
+    ``http://nova:8774/v2/<tenant>/servers/<uuid>?all_tenants=1`` becomes
+    ``/v2/{id}/servers/{id}``, so calls to the same resource aggregate.
+    """
+    path = urlparse.urlsplit(url).path
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment
+                    for segment in path.split('/'))
+
+
+def _catalog_endpoints(request):
+    """Returns ``(url, service type)`` pairs, longest URL first."""
+    endpoints = []
+    user = getattr(request, 'user', None)
+    for service in getattr(user, 'service_catalog', None) or []:
+        for endpoint in service.get('endpoints', []):
+            for key, value in six.iteritems(endpoint):
+                if (key.lower().endswith('url') and
+                        isinstance(value, six.string_types)):
+                    endpoints.append((value.rstrip('/'), service['type']))
+    endpoints.sort(key=lambda endpoint: len(endpoint[0]), reverse=True)
+    return endpoints
+
+
+class RequestTrace(object):
+    """Collects the events recorded while handling a single request."""
+
+    def __init__(self, request):
+        self.start = time.time()
+        self.duration = None
+        self.view_name = None
+        self.api_calls = []
+        self.templates = []
+        self.policy_checks = []
+        self.template_depth = 0
+        self.session_writes = None
+        self._request = request
+        self._endpoints = None
+
+    def service_for_url(self, url):
+        if self._endpoints is None:
+            self._endpoints = _catalog_endpoints(self._request)
+        for prefix, service_type in self._endpoints:
+            if url.startswith(prefix):
+                return service_type
+        return urlparse.urlsplit(url).netloc
+
+    def finish(self):
+        self.duration = (time.time() - self.start) * 1000
+        self._request = None
+
+    def summary(self):
+        """Aggregates the trace into ``(metric, duration, description)``.
+
+        ``duration`` is in milliseconds, or ``None`` for plain counters.
+        """
+        services = collections.OrderedDict()
+        for call in self.api_calls:
+            count, cached, duration = services.get(call.service, (0, 0, 0.0))
+            services[call.service] = (count + 1, cached + int(call.cached),
+                                      duration + call.duration)
+        metrics = []
+        for service, (count, cached, duration) in six.iteritems(services):
+            description = '%d calls' % count
+            if cached:
+                description += ', %d cached' % cached
+            metrics.append((service, duration, description))
+        if self.templates:
+            duration = sum(render.duration for render in self.templates
+                           if render.depth == 0)
+            metrics.append(('templates', duration,
+                            '%d renders' % len(self.templates)))
+        if self.policy_checks:
+            duration = sum(check.duration for check in self.policy_checks)
+            metrics.append(('policy', duration,
+                            '%d checks' % len(self.policy_checks)))
+        if self.session_writes is not None:
+            metrics.append(('session', None,
+                            '%d writes' % self.session_writes))
+        if self.duration is not None:
+            metrics.append(('total', self.duration, self.view_name or ''))
+        return metrics
+
+
+def start_trace(request):
+    trace = RequestTrace(request)
+    _local.trace = trace
+    return trace
+
+
+def get_trace():
+    """Returns the trace bound to the current thread, if any."""
+    return getattr(_local, 'trace', None)
+
+
+def stop_trace():
+    trace = get_trace()
+    _local.trace = None
+    if trace is not None:
+        trace.finish()
+    return trace
+
+
+def record_api_call(service, method, url, status=None, duration=0.0,
+                    size=None, cached=False):
+    """Records an outgoing call to a backend service.
+
+    ``duration`` is in milliseconds. Calls answered from a cache are
+    recorded with ``cached=True``.
+    """
+    trace = get_trace()
+    if trace is not None:
+        trace.api_calls.append(APICall(service, method, url, status,
+                                       duration, size, cached))
+
+
+def record_policy_check(actions, duration, result):
+    trace = get_trace()
+    if trace is not None:
+        trace.policy_checks.append(PolicyCheck(actions, duration, result))
+
+
+def _traced_render(render):
+    def _render(self, context):
+        trace = get_trace()
+        if trace is None:
+            return render(self, context)
+        depth = trace.template_depth
+        trace.template_depth += 1
+        start = time.time()
+        try:
+            return render(self, context)
+        finally:
+            trace.template_depth = depth
+            trace.templates.append(TemplateRender(
+                self.name, (time.time() - start) * 1000, depth))
+    return _render
+
+
+def _traced_send(send):
+    def _send(self, request, **kwargs):
+        trace = get_trace()
+        if trace is None:
+            return send(self, request, **kwargs)
+        start = time.time()
+        status = None
+        size = None
+        try:
+            response = send(self, request, **kwargs)
+            status = response.status_code
+            size = response.headers.get('content-length')
+            if size is not None:
+                size = int(size)
+            elif not kwargs.get('stream'):
+                size = len(response.content)
+            return response
+        except Exception as e:
+            status = e.__class__.__name__
+            raise
+        finally:
+            trace.api_calls.append(APICall(
+                trace.service_for_url(request.url), request.method,
+                url_template(request.url), status,
+                (time.time() - start) * 1000, size, False))
+    return _send
+
+
+def install_hooks():
+    """Instruments template rendering and outgoing HTTP calls.
+
+    Django doesn't offer a hook for either, so ``Template._render`` and
+    ``requests.Session.send`` (which every python-*client library ends up
+    calling) are wrapped once per process. The wrappers only do work while a
+    trace is active on the current thread.
+    """
+    with _install_lock:
+        if 'templates' not in _installed:
+            template_base.Template._render = _traced_render(
+                template_base.Template._render)
+            _installed.add('templates')
+        if 'requests' not in _installed:
+            try:
+                from requests import sessions
+            except ImportError:
+                LOG.debug('requests is not available, outgoing HTTP calls '
+                          'will not be traced.')
+            else:
+                sessions.Session.send = _traced_send(sessions.Session.send)
+            _installed.add('requests')
+
+
+def server_timing_header(trace):
+    """Formats a trace summary as a ``Server-Timing`` header value."""
+    entries = []
+    for metric, duration, description in trace.summary():
+        entry = re.sub(r'[^\w.-]', '_', metric)
+        if duration is not None:
+            entry += ';dur=%.1f' % duration
+        entries.append('%s;desc="%s"' % (entry,
+                                         description.replace('"', "'")))
+    return ', '.join(entries)
+
+
+class Histogram(object):
+    """A fixed-bucket histogram."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.count = 0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def buckets(self):
+        """Returns ``(label, count)`` for each bucket, e.g. ``le_100``."""
+        labels = ['le_%s' % bound for bound in self.bounds] + ['inf']
+        return zip(labels, self.counts)
+
+
+class ViewStatistics(object):
+    """Per-view histograms of response time and backend call counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._last_dump = time.time()
+
+    def add(self, trace):
+        view = trace.view_name or 'unknown'
+        with self._lock:
+            if view not in self._views:
+                self._views[view] = {
+                    'duration': Histogram(DURATION_BUCKETS),
+                    'api_calls': Histogram(API_CALL_BUCKETS),
+                }
+            histograms = self._views[view]
+            histograms['duration'].add(trace.duration)
+            histograms['api_calls'].add(
+                len([call for call in trace.api_calls if not call.cached]))
+
+    def collect(self, interval):
+        """Returns and resets the histograms if ``interval`` has elapsed."""
+        now = time.time()
+        with self._lock:
+            if now - self._last_dump < interval or not self._views:
+                return None
+            views = self._views
+            self._views = {}
+            self._last_dump = now
+        return views
+
+
+class LogSink(object):
+    def emit(self, views):
+        for view, histograms in sorted(six.iteritems(views)):
+            for name, histogram in sorted(six.iteritems(histograms)):
+                LOG.info('%s %s count=%d mean=%.1f %s', view, name,
+                         histogram.count,
+                         float(histogram.total) / histogram.count,
+                         ' '.join('%s=%d' % bucket
+                                  for bucket in histogram.buckets()))
+
+
+class StatsdSink(object):
+    """Sends the histograms as statsd counters over UDP."""
+
+    def __init__(self, host, port, prefix):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def emit(self, views):
+        lines = []
+        for view, histograms in six.iteritems(views):
+            view = re.sub(r'[^\w-]', '_', view)
+            for name, histogram in six.iteritems(histograms):
+                metric = '%s.%s.%s' % (self.prefix, view, name)
+                lines.append('%s.count:%d|c' % (metric, histogram.count))
+                lines.append('%s.total:%d|c' % (metric, histogram.total))
+                lines.extend('%s.%s:%d|c' % (metric, label, count)
+                             for label, count in histogram.buckets()
+                             if count)
+        # Keep the datagrams well below common MTU sizes.
+        for start in range(0, len(lines), 20):
+            packet = '\n'.join(lines[start:start + 20])
+            try:
+                self._socket.sendto(packet.encode('utf-8'), self.address)
+            except socket.error as e:
+                LOG.warning('Unable to send profiler statistics to %s:%s: %s',
+                            self.address[0], self.address[1], e)
+                return
+
+
+view_statistics = ViewStatistics()
+
+
+def get_sink(options):
+    if options['sink'] == 'statsd':
+        return StatsdSink(options['statsd_host'], options['statsd_port'],
+                          options['statsd_prefix'])
+    return LogSink()
@@ -17,17 +17,24 @@
 #    under the License.
 
 from collections import Sequence  # noqa
+import copy
+import functools
 import logging
+import sys
+import threading
 
 from django.conf import settings
+from django.utils import translation
 
 from horizon import exceptions
+from horizon.utils import memoized
+from horizon.utils import profiler
 
 import six
 
 
 __all__ = ('APIResourceWrapper', 'APIDictWrapper',
-           'get_service_from_catalog', 'url_for',)
+           'get_service_from_catalog', 'url_for', 'request_cached',)
 
 
 LOG = logging.getLogger(__name__)
@@ -90,6 +97,42 @@ class APIVersionManager(object):
         self._active = None
 
 
+class _WrappedAttribute(object):
+    """Looks an attribute listed in ``_attrs`` up on the wrapped resource.
+
+    It is a non-data descriptor, so values set on the wrapper instance
+    still take precedence, just like they did when the lookup was done in
+    ``__getattribute__``.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return getattr(instance._apiresource, self.name)
+
+
+class _APIResourceWrapperType(type):
+    """Adds a :class:`_WrappedAttribute` for each entry of ``_attrs``.
+
+    Names already defined by the class or one of its bases (such as
+    properties computing a value) are left alone, as they always had
+    precedence over the wrapped resource's attributes.
+    """
+
+    def __init__(cls, name, bases, attrs):
+        super(_APIResourceWrapperType, cls).__init__(name, bases, attrs)
+        for attr in cls._attrs:
+            for klass in cls.__mro__:
+                if attr in klass.__dict__:
+                    break
+            else:
+                setattr(cls, attr, _WrappedAttribute(attr))
+
+
+@six.add_metaclass(_APIResourceWrapperType)
 class APIResourceWrapper(object):
     """Simple wrapper for api objects.
 
@@ -102,14 +145,13 @@ class APIResourceWrapper(object):
     def __init__(self, apiresource):
         self._apiresource = apiresource
 
-    def __getattribute__(self, attr):
-        try:
-            return object.__getattribute__(self, attr)
-        except AttributeError:
-            if attr not in self._attrs:
-                raise
-            # __getattr__ won't find properties
-            return getattr(self._apiresource, attr)
+    def __getattr__(self, attr):
+        # Only called when the normal lookup failed, e.g. when a property
+        # raised AttributeError.
+        if attr not in self._attrs:
+            raise AttributeError(attr)
+        # __getattr__ won't find properties
+        return getattr(self._apiresource, attr)
 
     def __repr__(self):
         return "<%s: %s>" % (self.__class__.__name__,
@@ -134,13 +176,13 @@ class APIDictWrapper(object):
     def __init__(self, apidict):
         self._apidict = apidict
 
-    def __getattribute__(self, attr):
+    def __getattr__(self, attr):
+        # Only called when the normal lookup failed, so class attributes
+        # and properties keep precedence over the dictionary.
         try:
-            return object.__getattribute__(self, attr)
-        except AttributeError:
-            if attr not in self._apidict:
-                raise
             return self._apidict[attr]
+        except KeyError:
+            raise AttributeError(attr)
 
     def __getitem__(self, item):
         try:
@@ -165,6 +207,147 @@ class APIDictWrapper(object):
         return "<%s: %s>" % (self.__class__.__name__, self._apidict)
 
 
+class _PendingCall(object):
+    """The shared outcome of a call that may still be in flight."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+    def get(self):
+        self.done.wait()
+        if self.exc_info is not None:
+            six.reraise(*self.exc_info)
+        return _copy_result(self.result)
+
+
+def _copy_container(value):
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        # Keeps the type of dict subclasses, such as defaultdict.
+        return copy.copy(value)
+    return value
+
+
+def _copy_result(result):
+    # Callers routinely append to or pop from the lists they get back, or
+    # update the dicts (e.g. of limits), so each of them gets its own copy
+    # of the top-level containers.
+    if isinstance(result, tuple) and not hasattr(result, '_fields'):
+        return tuple(_copy_container(item) for item in result)
+    return _copy_container(result)
+
+
+class RequestCallCache(object):
+    """The calls shared by :func:`request_cached` during one request."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.hits = 0
+        self.misses = 0
+
+
+_request_cache_lock = threading.Lock()
+_request_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def _get_request_cache(request):
+    cache = getattr(request, '_api_call_cache', None)
+    if cache is None:
+        with _request_cache_lock:
+            cache = getattr(request, '_api_call_cache', None)
+            if cache is None:
+                cache = request._api_call_cache = RequestCallCache()
+    return cache
+
+
+def invalidate_request_cache(request):
+    """Forgets the results shared so far by :func:`request_cached`."""
+    cache = getattr(request, '_api_call_cache', None)
+    if cache is not None:
+        with cache.lock:
+            cache.calls.clear()
+
+
+def get_request_cache_stats(request=None):
+    """Returns the hit and miss counts of :func:`request_cached`.
+
+    With a request, the counts for that request only; otherwise the
+    process-wide totals.
+    """
+    if request is None:
+        with _request_cache_lock:
+            return dict(_request_cache_stats)
+    cache = getattr(request, '_api_call_cache', None)
+    if cache is None:
+        return {'hits': 0, 'misses': 0}
+    return {'hits': cache.hits, 'misses': cache.misses}
+
+
+def request_cached(func):
+    """Shares the result of identical read-only API calls within a request.
+
+    Many code paths rendering a single page (table actions' ``allowed()``,
+    quota usages, several tabs) independently ask for the same resources.
+    Calls with equal arguments made while handling the same ``GET`` or
+    ``HEAD`` request are answered with the result of the first one, and a
+    call made while an identical one is still in flight in another thread
+    waits for it instead of issuing a second request.
+
+    Arguments are compared by value, so dicts such as ``search_opts`` and
+    lists are supported. Other requests methods, and calls with arguments
+    that can't be hashed, always go through. The decorated function must
+    take the request as its first argument and must not modify anything.
+    """
+    service = func.__module__.rsplit('.', 1)[-1]
+
+    @functools.wraps(func)
+    def wrapped(request, *args, **kwargs):
+        if getattr(request, 'method', None) not in ('GET', 'HEAD'):
+            return func(request, *args, **kwargs)
+        key = (func, memoized.canonicalize(args),
+               memoized.canonicalize(kwargs))
+        try:
+            hash(key)
+        except TypeError:
+            return func(request, *args, **kwargs)
+
+        cache = _get_request_cache(request)
+        with cache.lock:
+            pending = cache.calls.get(key)
+            if pending is None:
+                pending = cache.calls[key] = _PendingCall()
+                cache.misses += 1
+                owner = True
+            else:
+                cache.hits += 1
+                owner = False
+        with _request_cache_lock:
+            _request_cache_stats['misses' if owner else 'hits'] += 1
+
+        if not owner:
+            profiler.record_api_call(service, func.__name__, None,
+                                     cached=True)
+            return pending.get()
+        try:
+            pending.result = func(request, *args, **kwargs)
+        except Exception:
+            pending.exc_info = sys.exc_info()
+            # Don't keep failures around; only the calls already waiting
+            # for this one get the exception.
+            with cache.lock:
+                if cache.calls.get(key) is pending:
+                    del cache.calls[key]
+            raise
+        finally:
+            pending.done.set()
+        return _copy_result(pending.result)
+    return wrapped
+
+
 class Quota(object):
     """Wrapper for individual limits in a quota."""
     def __init__(self, name, limit):
@@ -324,3 +507,39 @@ def is_service_enabled(request, service_type, service_name=None):
                 else:
                     return True
     return False
+
+
+def run_concurrently(calls, workers):
+    """Calls each of calls, at most ``workers`` of them at the same time.
+
+    The calls take no arguments and must handle their own exceptions. They
+    run in threads using the language of the current one, or in turn in
+    the current thread when a single worker is allowed.
+    """
+    if workers <= 1 or len(calls) <= 1:
+        for call in calls:
+            call()
+        return
+
+    language = translation.get_language()
+    pending = list(reversed(calls))
+    lock = threading.Lock()
+
+    def work():
+        translation.activate(language)
+        try:
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    call = pending.pop()
+                call()
+        finally:
+            translation.deactivate()
+
+    threads = [threading.Thread(target=work)
+               for i in range(min(workers, len(calls)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
@@ -10,13 +10,18 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+import hashlib
 import logging
 import threading
 
 from ceilometerclient import client as ceilometer_client
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import datastructures
 from django.utils.translation import ugettext_lazy as _
+from keystoneclient import exceptions as keystone_exceptions
+import six
 
 from horizon import exceptions
 from horizon.utils.memoized import memoized  # noqa
@@ -27,6 +32,18 @@ from openstack_dashboard.api import nova
 
 LOG = logging.getLogger(__name__)
 
+# How long (in seconds) the users and projects referenced by resources are
+# kept, and how long ids unknown to Keystone (deleted users and projects)
+# are remembered.
+IDENTITY_CACHE_TIMEOUT = 600
+IDENTITY_MISSING_CACHE_TIMEOUT = 300
+# When more ids than this are unknown, they are resolved by listing the
+# users or projects once instead of getting them one by one.
+IDENTITY_LIST_THRESHOLD = 20
+
+IdentityEntry = collections.namedtuple('IdentityEntry',
+                                       ['id', 'name', 'enabled'])
+
 
 def get_flavor_names(request):
     # TODO(lsmola) The flavors can be set per project,
@@ -286,6 +303,8 @@ def ceilometerclient(request):
 def resource_list(request, query=None, ceilometer_usage_object=None):
     """List the resources."""
     resources = ceilometerclient(request).resources.list(q=query)
+    if ceilometer_usage_object:
+        ceilometer_usage_object.prefetch_users_and_tenants(resources)
     return [Resource(r, ceilometer_usage_object) for r in resources]
 
 
@@ -377,6 +396,110 @@ class ThreadedUpdateResourceWithStatistics(threading.Thread):
             thread.join()
 
 
+class IdentityResolver(object):
+    """Resolves user or project ids to IdentityEntry objects.
+
+    The entries are shared through the Django cache by the requests of the
+    same user, with the same token scope, against the same Identity
+    endpoint. Only the ids which are looked up are kept, never the whole
+    directory. Ids Keystone reports as not found are cached as well, so
+    that deleted users or projects aren't looked up again on every request;
+    ids merely absent from a listing are not, as the listing may be limited
+    by the scope of the token.
+    """
+
+    _MISSING = 'missing'
+
+    def __init__(self, request, kind):
+        self._request = request
+        self._kind = kind
+        # What Keystone shows depends on who asks and on the scope of their
+        # token, not only on the Identity endpoint.
+        user = getattr(request, 'user', None)
+        scope = u':'.join(six.text_type(getattr(user, attr, None) or '')
+                          for attr in ('endpoint', 'id', 'domain_id',
+                                       'project_id'))
+        self._key_prefix = 'openstack_dashboard:identity:%s:%s:' % (
+            kind, hashlib.md5(scope.encode('utf-8')).hexdigest())
+        # The entries resolved for this request, None for unknown ids.
+        self._entries = {}
+
+    def _fetch(self, ids):
+        """Returns the Keystone objects of the ids, by id, and the set of
+        the ids Keystone reported as not found.
+        """
+        found = {}
+        not_found = set()
+        if len(ids) > IDENTITY_LIST_THRESHOLD:
+            if self._kind == 'user':
+                objects = keystone.user_list(self._request)
+            else:
+                objects = keystone.tenant_list(self._request)[0]
+            for obj in objects:
+                if obj.id in ids:
+                    found[obj.id] = obj
+            return found, not_found
+        for identifier in ids:
+            try:
+                if self._kind == 'user':
+                    found[identifier] = keystone.user_get(self._request,
+                                                          identifier)
+                else:
+                    found[identifier] = keystone.tenant_get(self._request,
+                                                            identifier)
+            except keystone_exceptions.NotFound:
+                not_found.add(identifier)
+        return found, not_found
+
+    def prefetch(self, ids):
+        """Resolves the ids which aren't known to this request yet."""
+        wanted = set(i for i in ids if i and i not in self._entries)
+        if not wanted:
+            return
+        keys = dict((self._key_prefix + i, i) for i in wanted)
+        for key, value in six.iteritems(cache.get_many(list(keys))):
+            identifier = keys[key]
+            self._entries[identifier] = (None if value == self._MISSING
+                                         else value)
+            wanted.discard(identifier)
+        if not wanted:
+            return
+
+        try:
+            found, not_found = self._fetch(wanted)
+        except Exception:
+            LOG.warning('Unable to retrieve the %s of %d resources.',
+                        self._kind, len(wanted), exc_info=True)
+            # Don't cache anything, but don't retry in this request either.
+            self._entries.update((i, None) for i in wanted)
+            return
+
+        entries = {}
+        missing = {}
+        for identifier in wanted:
+            obj = found.get(identifier)
+            key = self._key_prefix + identifier
+            if obj is None:
+                self._entries[identifier] = None
+                if identifier in not_found:
+                    missing[key] = self._MISSING
+            else:
+                entry = IdentityEntry(obj.id, obj.name,
+                                      getattr(obj, 'enabled', True))
+                self._entries[identifier] = entry
+                entries[key] = entry
+        if entries:
+            cache.set_many(entries, IDENTITY_CACHE_TIMEOUT)
+        if missing:
+            cache.set_many(missing, IDENTITY_MISSING_CACHE_TIMEOUT)
+
+    def get(self, identifier):
+        """Returns the IdentityEntry of the id, or None if it is unknown."""
+        if identifier not in self._entries:
+            self.prefetch([identifier])
+        return self._entries.get(identifier)
+
+
 class CeilometerUsage(object):
     """Represents wrapper of any Ceilometer queries.
 
@@ -395,63 +518,33 @@ class CeilometerUsage(object):
     def __init__(self, request):
         self._request = request
 
-        # Cached users and tenants.
-        self._users = {}
-        self._tenants = {}
+        # Users and tenants, shared with the other requests.
+        self._users = IdentityResolver(request, 'user')
+        self._tenants = IdentityResolver(request, 'project')
 
     def get_user(self, user_id):
-        """Returns user fetched from API.
+        """Returns the user with user_id as an IdentityEntry.
 
-        Caching the result, so it doesn't contact API twice with the
-        same query.
+        Returns None if the user doesn't exist any more.
         """
-
-        user = self._users.get(user_id, None)
-        if not user:
-            user = keystone.user_get(self._request, user_id)
-            # caching the user, for later use
-            self._users[user_id] = user
-        return user
-
-    def preload_all_users(self):
-        """Preloads all users into dictionary.
-
-        It's more effective to preload all users, rather than fetching many
-        users by separate API get calls.
-        """
-
-        users = keystone.user_list(self._request)
-        # Cache all users on right indexes, this is more effective than to
-        # obtain large number of users one by one by keystone.user_get
-        for u in users:
-            self._users[u.id] = u
+        return self._users.get(user_id)
 
     def get_tenant(self, tenant_id):
-        """Returns tenant fetched from API.
+        """Returns the tenant with tenant_id as an IdentityEntry.
 
-        Caching the result, so it doesn't contact API twice with the
-        same query.
+        Returns None if the tenant doesn't exist any more.
         """
+        return self._tenants.get(tenant_id)
 
-        tenant = self._tenants.get(tenant_id, None)
-        if not tenant:
-            tenant = keystone.tenant_get(self._request, tenant_id)
-            # caching the tenant for later use
-            self._tenants[tenant_id] = tenant
-        return tenant
+    def prefetch_users_and_tenants(self, resources):
+        """Resolves the users and tenants of the resources at once.
 
-    def preload_all_tenants(self):
-        """Preloads all tenants into dictionary.
-
-        It's more effective to preload all tenants, rather than fetching many
-        tenants by separate API get calls.
+        It's more effective than resolving them one resource at a time, as
+        the ids which aren't cached yet are fetched together.
         """
-
-        tenants, more = keystone.tenant_list(self._request)
-        # Cache all tenants on right indexes, this is more effective than to
-        # obtain large number of tenants one by one by keystone.tenant_get
-        for t in tenants:
-            self._tenants[t.id] = t
+        self._users.prefetch(getattr(r, 'user_id', None) for r in resources)
+        self._tenants.prefetch(getattr(r, 'project_id', None)
+                               for r in resources)
 
     def global_data_get(self, used_cls=None, query=None,
                         with_statistics=False, additional_query=None,
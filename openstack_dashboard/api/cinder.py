@@ -29,6 +29,7 @@ from django.utils.translation import ugettext_lazy as _
 from cinderclient.v2.contrib import list_extensions as cinder_list_extensions
 
 from horizon import exceptions
+from horizon.utils import functions as utils
 from horizon.utils.memoized import memoized  # noqa
 
 from openstack_dashboard.api import base
@@ -39,8 +40,12 @@ LOG = logging.getLogger(__name__)
 
 # API static values
 VOLUME_STATE_AVAILABLE = "available"
+VOLUME_STATE_AWAITING_TRANSFER = "awaiting-transfer"
 DEFAULT_QUOTA_NAME = 'default'
 
+# The extra attributes volume_list can look up for the listed volumes.
+VOLUME_DECORATIONS = ('transfer',)
+
 # Available consumer choices associated with QOS Specs
 CONSUMER_CHOICES = (
     ('back-end', _('back-end')),
@@ -179,26 +184,93 @@ def version_get():
     return api_version['version']
 
 
-def volume_list(request, search_opts=None):
+def _decorate_volumes(request, volumes, decorations, search_opts=None):
+    """Looks up the requested decorations (see VOLUME_DECORATIONS) for the
+    given volumes.
+    """
+    unknown = set(decorations) - set(VOLUME_DECORATIONS)
+    if unknown:
+        raise ValueError("Unknown volume decorations: %s"
+                         % ", ".join(sorted(unknown)))
+    if 'transfer' in decorations:
+        # Cinder can't filter transfers by volume, so the transfer list is
+        # only fetched when one of these volumes is being transferred.
+        awaiting = set(v.id for v in volumes
+                       if v.status == VOLUME_STATE_AWAITING_TRANSFER)
+        transfers = {}
+        if awaiting:
+            transfers = {t.volume_id: t
+                         for t in transfer_list(request,
+                                                search_opts=search_opts)
+                         if t.volume_id in awaiting}
+        for v in volumes:
+            v.transfer = transfers.get(v.id)
+    return volumes
+
+
+@base.request_cached
+def volume_list(request, search_opts=None, decorations=()):
     """To see all volumes in the cloud as an admin you can pass in a special
     search option: {'all_tenants': 1}
+
+    ``decorations`` names the extra attributes to look up for the volumes,
+    e.g. ``('transfer',)`` to set the pending transfer of each volume.
     """
     c_client = cinderclient(request)
     if c_client is None:
         return []
 
-    # build a dictionary of volume_id -> transfer
-    transfers = {t.volume_id: t
-                 for t in transfer_list(request, search_opts=search_opts)}
-
-    volumes = []
-    for v in c_client.volumes.list(search_opts=search_opts):
-        v.transfer = transfers.get(v.id)
-        volumes.append(Volume(v))
+    volumes = [Volume(v) for v in c_client.volumes.list(
+        search_opts=search_opts)]
+    return _decorate_volumes(request, volumes, decorations, search_opts)
 
-    return volumes
 
+@base.request_cached
+def volume_list_paged(request, search_opts=None, marker=None, paginate=False,
+                      sort_dir="desc", decorations=()):
+    """Lists volumes like volume_list, a page at a time when ``paginate``
+    is True.
 
+    Returns ``(volumes, has_more_data, has_prev_data)``, as
+    glance.image_list_detailed does. Volumes are sorted by creation date,
+    and ``sort_dir="asc"`` with a marker walks back to the previous page.
+    Version 1 of the volume API can't paginate, so every volume is
+    returned there.
+    """
+    has_more_data = False
+    has_prev_data = False
+    c_client = cinderclient(request)
+    if c_client is None:
+        return [], has_more_data, has_prev_data
+
+    if paginate and VERSIONS.active >= 2:
+        page_size = utils.get_page_size(request)
+        volumes = [Volume(v) for v in c_client.volumes.list(
+            search_opts=search_opts, marker=marker, limit=page_size + 1,
+            sort_key='created_at', sort_dir=sort_dir)]
+        # first and middle page condition
+        if len(volumes) > page_size:
+            volumes.pop(-1)
+            has_more_data = True
+            # middle page condition
+            if marker is not None:
+                has_prev_data = True
+        # first page condition when reached via prev back
+        elif sort_dir == 'asc' and marker is not None:
+            has_more_data = True
+        # last page condition
+        elif marker is not None:
+            has_prev_data = True
+        if sort_dir == 'asc':
+            volumes.reverse()
+    else:
+        volumes = [Volume(v) for v in c_client.volumes.list(
+            search_opts=search_opts)]
+    volumes = _decorate_volumes(request, volumes, decorations, search_opts)
+    return volumes, has_more_data, has_prev_data
+
+
+@base.request_cached
 def volume_get(request, volume_id):
     volume_data = cinderclient(request).volumes.get(volume_id)
 
@@ -213,7 +285,7 @@ def volume_get(request, volume_id):
             attachment['instance_name'] = _("Unknown instance")
 
     volume_data.transfer = None
-    if volume_data.status == 'awaiting-transfer':
+    if volume_data.status == VOLUME_STATE_AWAITING_TRANSFER:
         for transfer in transfer_list(request):
             if transfer.volume_id == volume_id:
                 volume_data.transfer = transfer
@@ -288,6 +360,7 @@ def volume_snapshot_get(request, snapshot_id):
     return VolumeSnapshot(snapshot)
 
 
+@base.request_cached
 def volume_snapshot_list(request, search_opts=None):
     c_client = cinderclient(request)
     if c_client is None:
@@ -341,6 +414,7 @@ def volume_backup_get(request, backup_id):
     return VolumeBackup(backup)
 
 
+@base.request_cached
 def volume_backup_list(request):
     c_client = cinderclient(request)
     if c_client is None:
@@ -560,6 +634,7 @@ def service_list(request):
     return cinderclient(request).services.list()
 
 
+@base.request_cached
 def availability_zone_list(request, detailed=False):
     return cinderclient(request).availability_zones.list(detailed=detailed)
 
@@ -581,6 +656,7 @@ def extension_supported(request, extension_name):
     return False
 
 
+@base.request_cached
 def transfer_list(request, detailed=True, search_opts=None):
     """To see all volumes transfers as an admin pass in a special
     search option: {'all_tenants': 1}
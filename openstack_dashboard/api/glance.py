@@ -19,19 +19,23 @@
 from __future__ import absolute_import
 
 import collections
+import hashlib
 import itertools
 import json
 import logging
 import os
+import uuid
 
 
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import ugettext_lazy as _
 
 import glanceclient as glance_client
-from six.moves import _thread as thread
 
 from horizon import exceptions
 from horizon.utils import functions as utils
+from horizon.utils import jobs
 from horizon.utils.memoized import memoized  # noqa
 from openstack_dashboard.api import base
 
@@ -39,6 +43,10 @@ from openstack_dashboard.api import base
 LOG = logging.getLogger(__name__)
 VERSIONS = base.APIVersionManager("image", preferred_version=2)
 
+# Must be at least as long as image lists are cached for, see
+# image_list_cache_key.
+IMAGE_LIST_VERSION_TIMEOUT = 24 * 3600
+
 
 @memoized
 def glanceclient(request, version='1'):
@@ -49,10 +57,38 @@ def glanceclient(request, version='1'):
                                 insecure=insecure, cacert=cacert)
 
 
+def _image_list_version_key(request):
+    endpoint = base.url_for(request, 'image')
+    return 'openstack_dashboard:image_list_version:%s' % (
+        hashlib.md5(endpoint.encode('utf-8')).hexdigest())
+
+
+def image_list_cache_key(request, *parts):
+    """Returns a key to cache a list of images under.
+
+    The key changes whenever images are created, updated or deleted through
+    the dashboard, so cached lists don't outlive such changes.
+    """
+    version_key = _image_list_version_key(request)
+    return '%s:%s:%s' % (version_key, cache.get(version_key, ''),
+                         ':'.join(parts))
+
+
+def _image_list_changed(request):
+    cache.set(_image_list_version_key(request), uuid.uuid4().hex,
+              IMAGE_LIST_VERSION_TIMEOUT)
+
+
 def image_delete(request, image_id):
+    # Stop pushing data to an image which is being deleted.
+    upload = jobs.get_job_for_resource(image_id)
+    if upload is not None:
+        jobs.cancel(upload['id'])
+    _image_list_changed(request)
     return glanceclient(request).images.delete(image_id)
 
 
+@base.request_cached
 def image_get(request, image_id):
     """Returns an Image object populated with metadata for image
     with supplied identifier.
@@ -63,6 +99,7 @@ def image_get(request, image_id):
     return image
 
 
+@base.request_cached
 def image_list_detailed(request, marker=None, sort_dir='desc',
                         sort_key='created_at', filters=None, paginate=False):
     limit = getattr(settings, 'API_RESULT_LIMIT', 1000)
@@ -104,46 +141,123 @@ def image_list_detailed(request, marker=None, sort_dir='desc',
     return (images, has_more_data, has_prev_data)
 
 
+def _remove_image_file(image_data):
+    try:
+        os.remove(image_data.file.name)
+    except Exception as e:
+        msg = (('Failed to remove temporary image file '
+                '%(file)s (%(e)s)') %
+               dict(file=image_data.file.name, e=str(e)))
+        LOG.warn(msg)
+
+
 def image_update(request, image_id, **kwargs):
     image_data = kwargs.get('data', None)
+    _image_list_changed(request)
     try:
         image = glanceclient(request).images.update(image_id, **kwargs)
     except Exception:
         exceptions.handle(request, ignore=True)
     finally:
         if image_data:
-            try:
-                os.remove(image_data.file.name)
-            except Exception as e:
-                msg = (('Failed to remove temporary image file '
-                        '%(file)s (%(e)s)') %
-                       dict(file=image_data.file.name, e=str(e)))
-                LOG.warn(msg)
+            _remove_image_file(image_data)
     return image
 
 
+class _ProgressFile(object):
+    """Wraps an uploaded file to report the bytes read to a job."""
+
+    def __init__(self, data, job):
+        self._data = data
+        self._job = job
+        self._done = 0
+
+    def read(self, size=-1):
+        self._job.check_cancelled()
+        chunk = self._data.read(size)
+        self._done += len(chunk)
+        self._job.update(bytes_done=self._done)
+        return chunk
+
+    def seek(self, *args):
+        return self._data.seek(*args)
+
+    def tell(self):
+        return self._data.tell()
+
+
+def _upload_image(job, request, image_id, **kwargs):
+    """Pushes the data (or copy_from location) of a new image to Glance."""
+    image_data = kwargs.get('data', None)
+    try:
+        if image_data:
+            job.update(bytes_total=image_data.size)
+            kwargs['data'] = _ProgressFile(image_data, job)
+        glanceclient(request).images.update(image_id, **kwargs)
+        # The image only becomes active now.
+        _image_list_changed(request)
+    except jobs.JobCancelled:
+        LOG.info('Upload of image %s was cancelled.', image_id)
+        raise
+    finally:
+        if image_data:
+            _remove_image_file(image_data)
+
+
 def image_create(request, **kwargs):
     copy_from = kwargs.pop('copy_from', None)
     data = kwargs.pop('data', None)
 
     image = glanceclient(request).images.create(**kwargs)
+    _image_list_changed(request)
 
     if data:
-        thread.start_new_thread(image_update,
-                                (request, image.id),
-                                {'data': data,
-                                 'purge_props': False})
+        upload = {'data': data, 'purge_props': False}
     elif copy_from:
-        thread.start_new_thread(image_update,
-                                (request, image.id),
-                                {'copy_from': copy_from,
-                                 'purge_props': False})
+        upload = {'copy_from': copy_from, 'purge_props': False}
+    else:
+        return image
+
+    try:
+        jobs.submit(request, 'image_upload', _upload_image,
+                    args=(request, image.id), kwargs=upload,
+                    resource_id=image.id)
+    except jobs.QueueFull:
+        # Don't leave an image without data behind.
+        glanceclient(request).images.delete(image.id)
+        if data:
+            _remove_image_file(data)
+        raise exceptions.NotAvailable(
+            _('Too many images are being uploaded, please try again later.'))
 
     return image
 
 
+def image_upload_get(request, image_id):
+    """Returns the state of the upload of the data of a new image.
+
+    The state is the dict described by :func:`horizon.utils.jobs.get_job`,
+    or None if there is no upload for the image in the project of the
+    request.
+    """
+    upload = jobs.get_job_for_resource(image_id)
+    if upload is None or upload['project_id'] != request.user.tenant_id:
+        return None
+    return upload
+
+
+def image_upload_cancel(request, image_id):
+    """Stops the upload of the data of a new image.
+
+    Returns False if there is no such upload or if it already finished.
+    """
+    upload = image_upload_get(request, image_id)
+    return upload is not None and jobs.cancel(upload['id'])
+
+
 def image_update_properties(request, image_id, remove_props=None, **kwargs):
     """Add or update a custom property of an image."""
+    _image_list_changed(request)
     return glanceclient(request, '2').images.update(image_id,
                                                     remove_props,
                                                     **kwargs)
@@ -151,6 +265,7 @@ def image_update_properties(request, image_id, remove_props=None, **kwargs):
 
 def image_delete_properties(request, image_id, keys):
     """Delete custom properties for an image."""
+    _image_list_changed(request)
     return glanceclient(request, '2').images.update(image_id, keys)
 
 
@@ -18,10 +18,15 @@
 #    under the License.
 
 import collections
+import functools
+import hashlib
 import logging
+import uuid
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
+import six
 import six.moves.urllib.parse as urlparse
 
 from keystoneclient import exceptions as keystone_exceptions
@@ -40,6 +45,9 @@ from openstack_dashboard import policy
 LOG = logging.getLogger(__name__)
 DEFAULT_ROLE = None
 
+# Must be at least as long as PROJECT_DIRECTORY_TTL, see ProjectDirectory.
+PROJECT_LIST_VERSION_TIMEOUT = 24 * 3600
+
 
 # Set up our data structure for managing Identity API versions, and
 # add a couple utility methods to it.
@@ -207,9 +215,21 @@ def domain_update(request, domain_id, name=None, description=None,
     return manager.update(domain_id, name, description, enabled)
 
 
+def _project_list_version_key(request):
+    endpoint = getattr(request.user, 'endpoint', None) or ''
+    return 'openstack_dashboard:project_list_version:%s' % (
+        hashlib.md5(endpoint.encode('utf-8')).hexdigest())
+
+
+def _project_list_changed(request):
+    cache.set(_project_list_version_key(request), uuid.uuid4().hex,
+              PROJECT_LIST_VERSION_TIMEOUT)
+
+
 def tenant_create(request, name, description=None, enabled=None,
                   domain=None, **kwargs):
     manager = VERSIONS.get_project_manager(request, admin=True)
+    _project_list_changed(request)
     if VERSIONS.active < 3:
         return manager.create(name, description, enabled, **kwargs)
     else:
@@ -251,11 +271,46 @@ def tenant_get(request, project, admin=True):
 
 def tenant_delete(request, project):
     manager = VERSIONS.get_project_manager(request, admin=True)
+    _project_list_changed(request)
     return manager.delete(project)
 
 
+def get_page(request, items, marker=None, prev_marker=None):
+    """Returns a page of a list of users, groups or projects.
+
+    The Identity API v3 doesn't page its lists, so the pages are cut from
+    the whole list, sorted by name. The page is the one following the item
+    with the id marker, or preceding the one with the id prev_marker.
+
+    :returns: a tuple of the items of the page, whether there are items
+              after it and whether there are items before it
+    """
+    page_size = utils.get_page_size(request)
+    items = sorted(items, key=lambda item: (
+        (getattr(item, 'name', None) or '').lower(), item.id))
+    ids = [item.id for item in items]
+    if prev_marker is not None and prev_marker in ids:
+        end = ids.index(prev_marker)
+        start = max(end - page_size, 0)
+    else:
+        start = ids.index(marker) + 1 if marker in ids else 0
+        end = start + page_size
+    return (items[start:end], end < len(items), start > 0)
+
+
+def _filter_list(items, filters):
+    """Filters a list the way the Identity API v3 does with its query
+    parameters ("hints"), for the API v2 which doesn't.
+    """
+    for attr, value in six.iteritems(filters or {}):
+        items = [item for item in items
+                 if six.text_type(getattr(item, attr, None)) == value]
+    return items
+
+
+@base.request_cached
 def tenant_list(request, paginate=False, marker=None, domain=None, user=None,
-                admin=True):
+                admin=True, filters=None):
     manager = VERSIONS.get_project_manager(request, admin=admin)
     page_size = utils.get_page_size(request)
 
@@ -264,19 +319,173 @@ def tenant_list(request, paginate=False, marker=None, domain=None, user=None,
         limit = page_size + 1
 
     has_more_data = False
-    if VERSIONS.active < 3:
+    if VERSIONS.active < 3 and filters:
+        tenants = _filter_list(manager.list(), filters)
+        if paginate:
+            tenants, has_more_data = get_page(request, tenants,
+                                              marker=marker)[:2]
+    elif VERSIONS.active < 3:
         tenants = manager.list(limit, marker)
         if paginate and len(tenants) > page_size:
             tenants.pop(-1)
             has_more_data = True
     else:
-        tenants = manager.list(domain=domain, user=user)
+        tenants = manager.list(domain=domain, user=user, **(filters or {}))
+        if paginate:
+            tenants, has_more_data = get_page(request, tenants,
+                                              marker=marker)[:2]
     return (tenants, has_more_data)
 
 
+ProjectEntry = collections.namedtuple('ProjectEntry',
+                                      ['id', 'name', 'enabled'])
+
+
+class ProjectDirectory(object):
+    """Maps project ids to their names for the admin listings.
+
+    The project list is kept in the Django cache for
+    ``PROJECT_DIRECTORY_TTL`` seconds and shared by the requests of the
+    same user, with the same token scope, against the same Identity
+    endpoint. Projects created, updated or deleted through the dashboard
+    make the cached lists stale. When an id is missing from a cached list,
+    the list is fetched again, at most once per request. Ids still missing
+    afterwards (deleted projects) are remembered with the list when
+    :meth:`save` is called, so they don't cause any further fetches until
+    it expires. :meth:`join` saves the directory itself.
+
+    Use :func:`project_directory` to get the directory of a request.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.ttl = getattr(settings, 'PROJECT_DIRECTORY_TTL', 300)
+        # The projects listed depend on who asks and on the scope of their
+        # token, not only on the Identity endpoint.
+        user = request.user
+        scope = u':'.join(six.text_type(getattr(user, attr, None) or '')
+                          for attr in ('endpoint', 'id', 'domain_id',
+                                       'project_id'))
+        self._scope = hashlib.md5(scope.encode('utf-8')).hexdigest()
+        self._cache_key = None
+        self._projects = None
+        self._missing = set()
+        self._fresh = False
+        self._failed = False
+        self._dirty = False
+
+    def load(self):
+        """Loads the project list, from the cache if possible.
+
+        Errors of the Identity API are raised. After a failed load, the
+        directory behaves as if there were no projects.
+        """
+        if self._projects is not None:
+            return
+        data = None
+        if self.ttl:
+            version_key = _project_list_version_key(self.request)
+            self._cache_key = 'openstack_dashboard:project_directory:%s:%s' % (
+                self._scope, cache.get(version_key, ''))
+            data = cache.get(self._cache_key)
+        if data is not None:
+            self._projects, self._missing = data
+        else:
+            # Stay empty, and don't retry, if the list can't be fetched.
+            self._projects = {}
+            self._fresh = True
+            self._failed = True
+            self.refresh()
+
+    def refresh(self):
+        """Fetches the project list from the Identity API."""
+        tenants, has_more = tenant_list(self.request)
+        self._projects = dict(
+            (t.id, ProjectEntry(t.id, getattr(t, 'name', None),
+                                getattr(t, 'enabled', True)))
+            for t in tenants)
+        self._missing = set()
+        self._fresh = True
+        self._failed = False
+        self._dirty = True
+        self.save()
+
+    def save(self):
+        """Stores the directory in the cache if it changed."""
+        if self._dirty and self._cache_key and not self._failed:
+            cache.set(self._cache_key, (self._projects, self._missing),
+                      self.ttl)
+        self._dirty = False
+
+    def _refresh_on_miss(self):
+        if self._fresh:
+            return False
+        try:
+            self.refresh()
+        except Exception:
+            # Keep using the cached list, the ids are reported as unknown.
+            LOG.warning('Unable to refresh the project directory.',
+                        exc_info=True)
+            self._fresh = True
+            return False
+        return True
+
+    def get(self, project_id):
+        """Returns the ProjectEntry for project_id, or None."""
+        if project_id is None:
+            return None
+        self.load()
+        entry = self._projects.get(project_id)
+        if entry is not None or project_id in self._missing:
+            return entry
+        if self._refresh_on_miss():
+            entry = self._projects.get(project_id)
+            if entry is not None:
+                return entry
+        self._missing.add(project_id)
+        self._dirty = True
+        return None
+
+    def name(self, project_id, default=None):
+        entry = self.get(project_id)
+        return default if entry is None else entry.name
+
+    def ids_for_name(self, name):
+        """Returns the ids of the projects called name."""
+        self.load()
+        ids = [entry.id for entry in six.itervalues(self._projects)
+               if entry.name == name]
+        if not ids and self._refresh_on_miss():
+            ids = [entry.id for entry in six.itervalues(self._projects)
+                   if entry.name == name]
+        return ids
+
+    def join(self, objects, id_attr='tenant_id', name_attr='tenant_name'):
+        """Sets name_attr of each object to the name of its project.
+
+        The project id is read from the id_attr attribute. Objects whose
+        project is unknown get None.
+        """
+        for obj in objects:
+            setattr(obj, name_attr,
+                    self.name(getattr(obj, id_attr, None)))
+        self.save()
+        return objects
+
+
+def project_directory(request):
+    """Returns the ProjectDirectory of the request."""
+    directory = getattr(request, '_project_directory', None)
+    if directory is None:
+        directory = ProjectDirectory(request)
+        request._project_directory = directory
+    return directory
+
+
 def tenant_update(request, project, name=None, description=None,
                   enabled=None, domain=None, **kwargs):
     manager = VERSIONS.get_project_manager(request, admin=True)
+    _project_list_changed(request)
     if VERSIONS.active < 3:
         return manager.update(project, name, description, enabled, **kwargs)
     else:
@@ -284,7 +493,10 @@ def tenant_update(request, project, name=None, description=None,
                               enabled=enabled, domain=domain, **kwargs)
 
 
-def user_list(request, project=None, domain=None, group=None):
+def user_list(request, project=None, domain=None, group=None, filters=None):
+    """Returns the users, those matching filters (e.g. ``{'name': name}``)
+    if given.
+    """
     if VERSIONS.active < 3:
         kwargs = {"tenant_id": project}
     else:
@@ -293,7 +505,11 @@ def user_list(request, project=None, domain=None, group=None):
             "domain": domain,
             "group": group
         }
+        # The filters are given to Keystone as query parameters.
+        kwargs.update(filters or {})
     users = keystoneclient(request, admin=True).users.list(**kwargs)
+    if VERSIONS.active < 3:
+        users = _filter_list(users, filters)
     return [VERSIONS.upgrade_v2_user(user) for user in users]
 
 
@@ -442,9 +658,9 @@ def group_delete(request, group_id):
     return manager.delete(group_id)
 
 
-def group_list(request, domain=None, project=None, user=None):
+def group_list(request, domain=None, project=None, user=None, filters=None):
     manager = keystoneclient(request, admin=True).groups
-    groups = manager.list(user=user, domain=domain)
+    groups = manager.list(user=user, domain=domain, **(filters or {}))
 
     if project:
         project_groups = []
@@ -566,15 +782,31 @@ def remove_domain_user_role(request, user, role, domain=None):
     return manager.revoke(role, user=user, domain=domain)
 
 
+def _role_update_workers():
+    return getattr(settings, 'OPENSTACK_KEYSTONE_ROLE_UPDATE_WORKERS', 4)
+
+
 def get_project_users_roles(request, project):
     users_roles = collections.defaultdict(list)
     if VERSIONS.active < 3:
         project_users = user_list(request, project=project)
 
-        for user in project_users:
-            roles = roles_for_user(request, user.id, project)
-            roles_ids = [role.id for role in roles]
-            users_roles[user.id].extend(roles_ids)
+        # The API v2 only lists the roles of one user at a time.
+        errors = []
+
+        def get_roles(user_id):
+            try:
+                roles = roles_for_user(request, user_id, project)
+            except Exception as e:
+                errors.append(e)
+                return
+            users_roles[user_id].extend(role.id for role in roles)
+        base.run_concurrently(
+            [functools.partial(get_roles, user.id) for user in project_users],
+            _role_update_workers())
+        # A user left out would keep the roles removed from it.
+        if errors:
+            raise errors[0]
     else:
         project_role_assignments = role_assignments_list(request,
                                                          project=project)
@@ -587,6 +819,61 @@ def get_project_users_roles(request, project):
     return users_roles
 
 
+def update_project_roles(request, project, current, wanted, group=False):
+    """Grants and revokes roles on a project, as a whole.
+
+    :param current: maps the ids of the users (or groups) of the project to
+                    the ids of their roles on it, as returned by
+                    :func:`get_project_users_roles`
+    :param wanted: maps the ids of users (or groups) to the ids of the roles
+                   they should have on the project
+    :param group: whether the ids are those of groups rather than users
+
+    Only the roles which differ are granted or revoked, concurrently by at
+    most ``OPENSTACK_KEYSTONE_ROLE_UPDATE_WORKERS`` threads.
+
+    :returns: the ``(id, role id, exception)`` of each role which couldn't
+              be granted or revoked
+    """
+    changes = []
+    for actor_id in set(current) | set(wanted):
+        current_roles = set(current.get(actor_id, ()))
+        wanted_roles = set(wanted.get(actor_id, ()))
+        changes.extend((True, actor_id, role_id)
+                       for role_id in sorted(wanted_roles - current_roles))
+        changes.extend((False, actor_id, role_id)
+                       for role_id in sorted(current_roles - wanted_roles))
+    changes.sort(key=lambda change: change[1:])
+    failures = []
+
+    def change_role(grant, actor_id, role_id):
+        try:
+            if group and grant:
+                add_group_role(request, role=role_id, group=actor_id,
+                               project=project)
+            elif group:
+                remove_group_role(request, role=role_id, group=actor_id,
+                                  project=project)
+            elif grant:
+                add_tenant_user_role(request, project=project,
+                                     user=actor_id, role=role_id)
+            else:
+                remove_tenant_user_role(request, project=project,
+                                        user=actor_id, role=role_id)
+        except Exception as e:
+            LOG.info('Unable to %s role %s of %s on project %s: %s',
+                     'grant' if grant else 'revoke', role_id, actor_id,
+                     project, e)
+            failures.append((actor_id, role_id, e))
+
+    base.run_concurrently(
+        [functools.partial(change_role, *change) for change in changes],
+        _role_update_workers())
+    # The threads fail in any order.
+    failures.sort(key=lambda failure: failure[:2])
+    return failures
+
+
 def add_tenant_user_role(request, project=None, user=None, role=None,
                          group=None, domain=None):
     """Adds a role for a user on a tenant."""
@@ -20,6 +20,7 @@
 from __future__ import absolute_import
 
 import collections
+import copy
 import logging
 import warnings
 
@@ -30,6 +31,7 @@ from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext_lazy as _
 from neutronclient.common import exceptions as neutron_exc
 from neutronclient.v2_0 import client as neutron_client
+import six
 
 from horizon import messages
 from horizon.utils.memoized import memoized  # noqa
@@ -571,26 +573,59 @@ def list_resources_with_long_filters(list_method,
         return resources
 
 
-def network_list(request, **params):
+def _expand_subnets(request, networks):
+    """Replaces the subnet ids of the given network dicts with Subnets.
+
+    Only the subnets referenced by the networks are retrieved, in a single
+    (chunked if needed) filtered call, rather than every subnet visible to
+    the user.
+    """
+    subnet_ids = set()
+    for n in networks:
+        # Subnets which are already expanded are kept as they are.
+        subnet_ids.update(s for s in n.get('subnets', [])
+                          if isinstance(s, six.string_types))
+    if subnet_ids:
+        subnets = list_resources_with_long_filters(
+            subnet_list, 'id', sorted(subnet_ids), request=request)
+    else:
+        subnets = []
+    subnet_dict = dict((s['id'], s) for s in subnets)
+    for n in networks:
+        expanded = []
+        for s in n.get('subnets', []):
+            if not isinstance(s, six.string_types):
+                expanded.append(s)
+            # Due to potential timing issues, we can't assume the subnet_dict
+            # data is in sync with the network data.
+            elif s in subnet_dict:
+                expanded.append(subnet_dict[s])
+        n['subnets'] = expanded
+    return networks
+
+
+@base.request_cached
+def network_list(request, expand_subnet=True, **params):
+    """Return a list of networks.
+
+    Subnet ids are expanded to Subnet objects unless expand_subnet is False,
+    which saves a call to Neutron when the caller does not use the subnets.
+    """
     LOG.debug("network_list(): params=%s", params)
     networks = neutronclient(request).list_networks(**params).get('networks')
-    # Get subnet list to expand subnet info in network list.
-    subnets = subnet_list(request)
-    subnet_dict = dict([(s['id'], s) for s in subnets])
-    # Expand subnet list from subnet_id to values.
-    for n in networks:
-        # Due to potential timing issues, we can't assume the subnet_dict data
-        # is in sync with the network data.
-        n['subnets'] = [subnet_dict[s] for s in n.get('subnets', []) if
-                        s in subnet_dict]
+    if expand_subnet:
+        _expand_subnets(request, networks)
     return [Network(n) for n in networks]
 
 
-def network_list_for_tenant(request, tenant_id, **params):
+def network_list_for_tenant(request, tenant_id, expand_subnet=True,
+                            **params):
     """Return a network list available for the tenant.
 
     The list contains networks owned by the tenant and public networks.
     If requested_networks specified, it searches requested_networks only.
+    The subnets of both sets of networks are retrieved together, unless
+    expand_subnet is False.
     """
     LOG.debug("network_list_for_tenant(): tenant_id=%s, params=%s"
               % (tenant_id, params))
@@ -599,15 +634,28 @@ def network_list_for_tenant(request, tenant_id, **params):
     # contains networks that do not belong to that tenant.
     # So we need to specify tenant_id when calling network_list().
     networks = network_list(request, tenant_id=tenant_id,
-                            shared=False, **params)
+                            shared=False, expand_subnet=False, **params)
 
     # In the current Neutron API, there is no way to retrieve
     # both owner networks and public networks in a single API call.
-    networks += network_list(request, shared=True, **params)
+    networks += network_list(request, shared=True, expand_subnet=False,
+                             **params)
 
+    if expand_subnet:
+        # The networks are shared with the other callers through the request
+        # cache, so their subnets are expanded in copies.
+        networks = [_copy_network(n) for n in networks]
+        _expand_subnets(request, [n._apidict for n in networks])
     return networks
 
 
+def _copy_network(network):
+    network = copy.copy(network)
+    network._apidict = dict(network._apidict)
+    return network
+
+
+@base.request_cached
 def network_get(request, network_id, expand_subnet=True, **params):
     LOG.debug("network_get(): netid=%s, params=%s" % (network_id, params))
     network = neutronclient(request).show_network(network_id,
@@ -654,6 +702,7 @@ def network_delete(request, network_id):
     neutronclient(request).delete_network(network_id)
 
 
+@base.request_cached
 def subnet_list(request, **params):
     LOG.debug("subnet_list(): params=%s" % (params))
     subnets = neutronclient(request).list_subnets(**params).get('subnets')
@@ -705,6 +754,7 @@ def subnet_delete(request, subnet_id):
     neutronclient(request).delete_subnet(subnet_id)
 
 
+@base.request_cached
 def port_list(request, **params):
     LOG.debug("port_list(): params=%s" % (params))
     ports = neutronclient(request).list_ports(**params).get('ports')
@@ -834,6 +884,7 @@ def router_get(request, router_id, **params):
     return Router(router)
 
 
+@base.request_cached
 def router_list(request, **params):
     routers = neutronclient(request).list_routers(**params).get('routers')
     return [Router(r) for r in routers]
@@ -891,6 +942,22 @@ def list_dhcp_agent_hosting_networks(request, network, **params):
     return [Agent(a) for a in agents['agents']]
 
 
+def dhcp_agent_network_counts(request):
+    """Return a dict mapping network ids to the number of DHCP agents.
+
+    The networks hosted by each DHCP agent are listed, which takes one call
+    per agent rather than calling list_dhcp_agent_hosting_networks() for
+    every network. Networks which no agent hosts are not in the dict.
+    """
+    counts = collections.defaultdict(int)
+    for agent in agent_list(request, agent_type='DHCP agent'):
+        networks = neutronclient(request).list_networks_on_dhcp_agent(
+            agent.id, fields='id')
+        for network in networks['networks']:
+            counts[network['id']] += 1
+    return dict(counts)
+
+
 def add_network_to_dhcp_agent(request, dhcp_agent, network_id):
     body = {'network_id': network_id}
     return neutronclient(request).add_network_to_dhcp_agent(dhcp_agent, body)
@@ -927,7 +994,7 @@ def servers_update_addresses(request, servers, all_tenants=False):
             floating_ips = []
         networks = list_resources_with_long_filters(
             network_list, 'id', set([port.network_id for port in ports]),
-            request=request)
+            request=request, expand_subnet=False)
     except Exception:
         error_message = _('Unable to connect to Neutron.')
         LOG.error(error_message)
@@ -20,9 +20,13 @@
 
 from __future__ import absolute_import
 
+import collections
+import datetime
+import hashlib
 import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.functional import cached_property  # noqa
 from django.utils.translation import ugettext_lazy as _
 
@@ -33,12 +37,14 @@ from novaclient.v1_1.contrib import list_extensions as nova_list_extensions
 from novaclient.v1_1 import security_group_rules as nova_rules
 from novaclient.v1_1 import security_groups as nova_security_groups
 from novaclient.v1_1 import servers as nova_servers
+from novaclient.v1_1 import usage as nova_usage
 
 from horizon import conf
 from horizon.utils import functions as utils
 from horizon.utils.memoized import memoized  # noqa
 
 from openstack_dashboard.api import base
+from openstack_dashboard.api import glance
 from openstack_dashboard.api import network_base
 
 
@@ -50,6 +56,12 @@ INSTANCE_ACTIVE_STATE = 'ACTIVE'
 VOLUME_STATE_AVAILABLE = "available"
 DEFAULT_QUOTA_NAME = 'default'
 
+# The usage of a period which is over doesn't change any more, so it is
+# kept for a long time.
+CLOSED_USAGE_CACHE_TIMEOUT = 7 * 24 * 3600
+USAGE_TOTALS = ('total_local_gb_usage', 'total_memory_mb_usage',
+                'total_vcpus_usage', 'total_hours')
+
 
 class VNCConsole(base.APIDictWrapper):
     """Wrapper for the "console" dictionary.
@@ -166,14 +178,25 @@ class NovaUsage(base.APIResourceWrapper):
                 'disk_gb_hours': self.disk_gb_hours,
                 'memory_mb_hours': self.memory_mb_hours}
 
+    @cached_property
+    def _active_totals(self):
+        """Sums up the instances which are still running, in one pass."""
+        totals = {'instances': 0, 'vcpus': 0, 'local_gb': 0, 'memory_mb': 0}
+        for s in getattr(self, 'server_usages', []):
+            if s['ended_at'] is None:
+                totals['instances'] += 1
+                totals['vcpus'] += s['vcpus']
+                totals['local_gb'] += s['local_gb']
+                totals['memory_mb'] += s['memory_mb']
+        return totals
+
     @property
     def total_active_instances(self):
-        return sum(1 for s in self.server_usages if s['ended_at'] is None)
+        return self._active_totals['instances']
 
     @property
     def vcpus(self):
-        return sum(s['vcpus'] for s in self.server_usages
-                   if s['ended_at'] is None)
+        return self._active_totals['vcpus']
 
     @property
     def vcpu_hours(self):
@@ -181,13 +204,11 @@ class NovaUsage(base.APIResourceWrapper):
 
     @property
     def local_gb(self):
-        return sum(s['local_gb'] for s in self.server_usages
-                   if s['ended_at'] is None)
+        return self._active_totals['local_gb']
 
     @property
     def memory_mb(self):
-        return sum(s['memory_mb'] for s in self.server_usages
-                   if s['ended_at'] is None)
+        return self._active_totals['memory_mb']
 
     @property
     def disk_gb_hours(self):
@@ -483,6 +504,7 @@ def flavor_delete(request, flavor_id):
     novaclient(request).flavors.delete(flavor_id)
 
 
+@base.request_cached
 def flavor_get(request, flavor_id):
     return novaclient(request).flavors.get(flavor_id)
 
@@ -536,6 +558,8 @@ def flavor_extra_set(request, flavor_id, metadata):
 
 
 def snapshot_create(request, instance_id, name):
+    # The snapshot is an image, listed with the others.
+    glance._image_list_changed(request)
     return novaclient(request).servers.create_image(instance_id, name)
 
 
@@ -551,6 +575,7 @@ def keypair_delete(request, keypair_id):
     novaclient(request).keypairs.delete(keypair_id)
 
 
+@base.request_cached
 def keypair_list(request):
     return novaclient(request).keypairs.list()
 
@@ -579,10 +604,12 @@ def server_delete(request, instance):
     novaclient(request).servers.delete(instance)
 
 
+@base.request_cached
 def server_get(request, instance_id):
     return Server(novaclient(request).servers.get(instance_id), request)
 
 
+@base.request_cached
 def server_list(request, search_opts=None, all_tenants=False):
     page_size = utils.get_page_size(request)
     c = novaclient(request)
@@ -706,13 +733,126 @@ def default_quota_update(request, **kwargs):
     novaclient(request).quota_classes.update(DEFAULT_QUOTA_NAME, **kwargs)
 
 
+def _usage_windows(start, end):
+    """Splits the period from start to end at the start of every month and
+    at the start of today (all in UTC).
+
+    Returns the windows which are over, whose usage can be cached, and the
+    window still open, or None if the whole period is over.
+    """
+    today = datetime.datetime.utcnow().replace(hour=0, minute=0, second=0,
+                                               microsecond=0)
+    closed = []
+    window_start = start
+    while window_start < min(end, today):
+        month = window_start.replace(day=1, hour=0, minute=0, second=0,
+                                     microsecond=0)
+        next_month = (month + datetime.timedelta(days=32)).replace(day=1)
+        window_end = min(next_month, today, end)
+        closed.append((window_start, window_end))
+        window_start = window_end
+    if end > today:
+        return closed, (max(start, today), end)
+    return closed, None
+
+
+def _usage_cache_key(request, tenant_id, start, end):
+    endpoint = base.url_for(request, 'compute')
+    return 'openstack_dashboard:usage:%s:%s:%s:%s' % (
+        hashlib.md5(endpoint.encode('utf-8')).hexdigest(), tenant_id or '*',
+        start.isoformat(), end.isoformat())
+
+
+def _merge_usages(infos):
+    """Combines the usage of one project over consecutive windows.
+
+    Totals and instance hours are added up. The other details of an
+    instance (state, uptime, end...) are taken from the latest window.
+    """
+    merged = {}
+    servers = collections.OrderedDict()
+    for info in infos:
+        if not info:
+            continue
+        merged.setdefault('start', info.get('start'))
+        merged['stop'] = info.get('stop')
+        merged['tenant_id'] = info.get('tenant_id')
+        for total in USAGE_TOTALS:
+            merged[total] = merged.get(total, 0) + info.get(total, 0)
+        for server in info.get('server_usages', []):
+            # Without an instance id, the entry can't be matched with the
+            # other windows and is kept on its own.
+            key = server.get('instance_id') or object()
+            previous = servers.get(key)
+            server = dict(server)
+            if previous is not None:
+                server['hours'] += previous['hours']
+            servers[key] = server
+    if merged:
+        merged['server_usages'] = list(servers.values())
+    return merged
+
+
+def _windowed_usage(request, tenant_id, start, end, fetch):
+    """Returns the raw usage of each window of the period, oldest first.
+
+    ``fetch(start, end)`` returns the usage (a list of dicts) of a window.
+    The usage of the windows which are over is cached.
+    """
+    closed, tail = _usage_windows(start, end)
+    windows = []
+    for window_start, window_end in closed:
+        key = _usage_cache_key(request, tenant_id, window_start, window_end)
+        infos = cache.get(key)
+        if infos is None:
+            infos = fetch(window_start, window_end)
+            cache.set(key, infos, CLOSED_USAGE_CACHE_TIMEOUT)
+        windows.append(infos)
+    if tail is not None:
+        windows.append(fetch(*tail))
+    return windows
+
+
+def _usage_resource(info):
+    return NovaUsage(nova_usage.Usage(nova_usage.UsageManager(None), info,
+                                      loaded=True))
+
+
 def usage_get(request, tenant_id, start, end):
-    return NovaUsage(novaclient(request).usage.get(tenant_id, start, end))
+    """Returns the usage of a project over the period from start to end.
+
+    Parts of the period which are over (whole months and the days of the
+    current month before today) are cached, so repeated requests only fetch
+    the usage of today from Nova.
+    """
+    client = novaclient(request)
+    if not isinstance(start, datetime.datetime):
+        return NovaUsage(client.usage.get(tenant_id, start, end))
+
+    def fetch(window_start, window_end):
+        usage = client.usage.get(tenant_id, window_start, window_end)
+        return [usage._info]
+
+    windows = _windowed_usage(request, tenant_id, start, end, fetch)
+    return _usage_resource(_merge_usages(infos[0] for infos in windows))
 
 
 def usage_list(request, start, end):
-    return [NovaUsage(u) for u in
-            novaclient(request).usage.list(start, end, True)]
+    """Returns the usage of every project, caching it like usage_get."""
+    client = novaclient(request)
+    if not isinstance(start, datetime.datetime):
+        return [NovaUsage(u) for u in client.usage.list(start, end, True)]
+
+    def fetch(window_start, window_end):
+        return [u._info for u in
+                client.usage.list(window_start, window_end, True)]
+
+    by_tenant = collections.OrderedDict()
+    for infos in _windowed_usage(request, None, start, end, fetch):
+        for info in infos:
+            by_tenant.setdefault(info['tenant_id'], []).append(info)
+    return [_usage_resource(_merge_usages(infos))
+            for infos in by_tenant.values()]
 
 
 def virtual_interfaces_list(request, instance_id):
@@ -792,6 +932,7 @@ def evacuate_host(request, host, target=None, on_shared_storage=False):
     return True
 
 
+@base.request_cached
 def tenant_absolute_limits(request, reserved=False):
     limits = novaclient(request).limits.get(reserved=reserved).absolute
     limits_dict = {}
@@ -810,10 +951,12 @@ def tenant_absolute_limits(request, reserved=False):
     return limits_dict
 
 
+@base.request_cached
 def availability_zone_list(request, detailed=False):
     return novaclient(request).availability_zones.list(detailed=detailed)
 
 
+@base.request_cached
 def service_list(request, binary=None):
     return novaclient(request).services.list(binary=binary)
 
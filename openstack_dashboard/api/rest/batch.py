@@ -0,0 +1,186 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""API to make several calls of the REST API in a single request.
+"""
+
+import copy
+import json
+import logging
+
+from django.conf import settings
+from django.core import urlresolvers
+from django import http
+from django.utils import datastructures
+from django.views import generic
+import six
+
+from openstack_dashboard.api import base
+from openstack_dashboard.api.rest import urls
+from openstack_dashboard.api.rest import utils as rest_utils
+
+
+LOG = logging.getLogger(__name__)
+
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+
+def _max_requests():
+    return getattr(settings, 'REST_API_BATCH_MAX_REQUESTS', 20)
+
+
+def _workers():
+    return getattr(settings, 'REST_API_BATCH_WORKERS', 4)
+
+
+def _query_value(value):
+    # Values are given as JSON, while the views expect the strings
+    # Javascript would put in a query string.
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return six.text_type(value)
+
+
+def _sub_request(request, method, path, params, data, etag):
+    """Returns a copy of the request for one of the calls of the batch.
+
+    The copy keeps the session, the user and whatever else the middleware
+    set on the batch request, with the method, path, query and body of the
+    call.
+    """
+    path, _, query = path.partition('?')
+    query = http.QueryDict(query.encode('utf-8'), mutable=True)
+    for key, value in (params or {}).items():
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        query.setlist(key, [_query_value(item) for item in value])
+    body = json.dumps(data) if data is not None else ''
+
+    sub = copy.copy(request)
+    for attr in ('_request', '_post', '_files', '_api_call_cache'):
+        sub.__dict__.pop(attr, None)
+    sub.META = dict(request.META)
+    if hasattr(request, 'environ'):
+        sub.environ = sub.META
+    sub.META.update(REQUEST_METHOD=method,
+                    QUERY_STRING=query.urlencode(),
+                    CONTENT_TYPE='application/json',
+                    CONTENT_LENGTH=str(len(body)))
+    # The results are decoded to be put in the batch's response.
+    sub.META.pop('HTTP_ACCEPT_ENCODING', None)
+    sub.META.pop('HTTP_IF_NONE_MATCH', None)
+    if etag:
+        sub.META['HTTP_IF_NONE_MATCH'] = etag
+    prefix = request.path[:len(request.path) - len('batch/')]
+    sub.path = sub.path_info = prefix + path
+    sub.method = method
+    sub.GET = query
+    sub.POST = http.QueryDict('')
+    sub._files = datastructures.MultiValueDict()
+    sub._body = body
+    return sub
+
+
+def _response_item(response):
+    item = {'status': response.status_code}
+    if response.get('Content-Type', '').startswith('application/json') and \
+            response.content:
+        item['data'] = json.loads(response.content)
+    for header in ('ETag', 'Location'):
+        if response.has_header(header):
+            item[header.lower()] = response[header]
+    return item
+
+
+def _error_item(status, message):
+    return {'status': status, 'data': message}
+
+
+class _Call(object):
+    """One of the calls of a batch."""
+
+    def __init__(self, request, spec):
+        self.request = request
+        self.spec = spec
+        self.result = None
+
+    def __call__(self):
+        try:
+            self.result = self._call()
+        except Exception as e:
+            LOG.exception('error invoking batched call')
+            self.result = _error_item(500, str(e))
+
+    def _call(self):
+        spec = self.spec
+        if not isinstance(spec, dict) or 'path' not in spec:
+            return _error_item(400, 'each request requires a path')
+        method = spec.get('method', 'GET').upper()
+        if method not in METHODS:
+            return _error_item(405, 'method %s not allowed' % method)
+        path = spec['path'].lstrip('/')
+        try:
+            match = urlresolvers.resolve('/' + path.partition('?')[0],
+                                         urlconf=urls)
+        except urlresolvers.Resolver404:
+            return _error_item(404, 'no API at %s' % path)
+        if (match.func.__module__, match.func.__name__) == \
+                (Batch.__module__, Batch.__name__):
+            return _error_item(400, 'batch requests cannot be nested')
+        sub = _sub_request(self.request, method, path, spec.get('params'),
+                           spec.get('data'), spec.get('etag'))
+        sub.resolver_match = match
+        return _response_item(match.func(sub, *match.args, **match.kwargs))
+
+
+@urls.register
+class Batch(generic.View):
+    """API to make several calls of the REST API at once.
+
+    Pages such as the launch instance wizard need a dozen resources to
+    start; asking for them with a single request saves the cost of
+    authenticating and processing each of them.
+    """
+    url_regex = r'batch/$'
+
+    @rest_utils.ajax(data_required=True)
+    def post(self, request):
+        """Make the calls given in the POST application/json object.
+
+        The object has a property "requests", a list of objects with:
+
+        :param path: the path of the API, relative to the API root (e.g.
+            "nova/keypairs/")
+        :param method: (optional) the HTTP method, "GET" by default
+        :param params: (optional) an object with the query parameters
+        :param data: (optional) the JSON body of the call
+        :param etag: (optional) the ETag of the result the caller already
+            has; the call then results in a 304 if it is unchanged
+
+        The calls are made concurrently, so calls which depend on one
+        another should not be made in the same batch.
+
+        The result is an object with property "responses", which for each of
+        the requests, in the same order, has properties "status" and "data"
+        (the decoded result, or the error message), plus "etag" and
+        "location" when the call returned them.
+        """
+        requests = None
+        if isinstance(request.DATA, dict):
+            requests = request.DATA.get('requests')
+        if not isinstance(requests, list):
+            raise rest_utils.AjaxError(400, 'requests must be a list')
+        if len(requests) > _max_requests():
+            raise rest_utils.AjaxError(
+                400, 'at most %d requests may be batched' % _max_requests())
+        calls = [_Call(request, spec) for spec in requests]
+        base.run_concurrently(calls, _workers())
+        return {'responses': [call.result for call in calls]}
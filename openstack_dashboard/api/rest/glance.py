@@ -24,6 +24,12 @@ from openstack_dashboard.api.rest import urls
 
 CLIENT_KEYWORDS = {'marker', 'sort_dir', 'sort_key', 'paginate'}
 
+IMAGES_CACHE = rest_utils.CachePolicy('glance.images', timeout=10)
+METADEFS_CACHE = rest_utils.CachePolicy('glance.metadefs', timeout=60)
+
+UPLOAD_FIELDS = ('status', 'progress', 'bytes_done', 'bytes_total', 'error',
+                 'cancel_requested')
+
 
 def _parse_filters_kwargs(request):
     """REST request parameters are separated appropriately.
@@ -43,13 +49,51 @@ def _parse_filters_kwargs(request):
     return filters, kwargs
 
 
+@urls.register
+class ImageUpload(generic.View):
+    """API for the upload of the data of a new image
+    """
+    url_regex = r'glance/images/(?P<image_id>[^/]+)/upload/$'
+
+    @rest_utils.ajax()
+    def get(self, request, image_id):
+        """Get the state of the upload of an image's data.
+
+        The result is an object with properties "status" (one of "queued",
+        "running", "succeeded", "failed" and "cancelled"), "progress" (a
+        percentage, or null if unknown), "bytes_done", "bytes_total" and
+        "error".
+
+        Example GET:
+        http://localhost/api/glance/images/cc758c90-3d98-4ea1-af44-aab405c9c915/upload/  #flake8: noqa
+        """
+        upload = api.glance.image_upload_get(request, image_id)
+        if upload is None:
+            raise rest_utils.AjaxError(404, 'no upload for image %s'
+                                       % image_id)
+        return dict((key, upload.get(key)) for key in UPLOAD_FIELDS)
+
+    @rest_utils.ajax()
+    def delete(self, request, image_id):
+        """Cancel the upload of an image's data.
+
+        Returns HTTP 204 (no content) on successful cancellation, and HTTP
+        409 if the upload already finished.
+        """
+        if api.glance.image_upload_get(request, image_id) is None:
+            raise rest_utils.AjaxError(404, 'no upload for image %s'
+                                       % image_id)
+        if not api.glance.image_upload_cancel(request, image_id):
+            raise rest_utils.AjaxError(409, 'the upload already finished')
+
+
 @urls.register
 class Image(generic.View):
     """API for retrieving a single image
     """
     url_regex = r'glance/images/(?P<image_id>.+|default)$'
 
-    @rest_utils.ajax()
+    @rest_utils.ajax(cache_policy=IMAGES_CACHE)
     def get(self, request, image_id):
         """Get a specific image
 
@@ -64,7 +108,7 @@ class Images(generic.View):
     """
     url_regex = r'glance/images/$'
 
-    @rest_utils.ajax()
+    @rest_utils.ajax(cache_policy=IMAGES_CACHE)
     def get(self, request):
         """Get a list of images.
 
@@ -99,7 +143,7 @@ class Images(generic.View):
             request, filters=filters, **kwargs)
 
         return {
-            'items': [i.to_dict() for i in images],
+            'items': list(images),
             'has_more_data': has_more_data,
             'has_prev_data': has_prev_data,
         }
@@ -113,7 +157,7 @@ class MetadefsNamespace(generic.View):
     """
     url_regex = r'glance/metadefs/namespaces/(?P<namespace>.+|default)$'
 
-    @rest_utils.ajax()
+    @rest_utils.ajax(cache_policy=METADEFS_CACHE)
     def get(self, request, namespace):
         """Get a specific metadata definition namespaces.
 
@@ -133,7 +177,7 @@ class MetadefsNamespaces(generic.View):
     """
     url_regex = r'glance/metadefs/namespaces/$'
 
-    @rest_utils.ajax()
+    @rest_utils.ajax(cache_policy=METADEFS_CACHE)
     def get(self, request):
         """Get a list of metadata definition namespaces.
 
@@ -170,7 +214,7 @@ class MetadefsNamespaces(generic.View):
             request, filters=filters, **kwargs)
 
         return {
-            'items': [n.to_dict() for n in namespaces],
+            'items': list(namespaces),
             'has_more_data': has_more,
             'has_prev_data': has_prev,
         }
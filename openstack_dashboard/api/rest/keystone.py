@@ -23,6 +23,11 @@ from openstack_dashboard.api.rest import utils as rest_utils
 from openstack_dashboard.api.rest import urls
 
 
+# Roles rarely change, and are asked for by every identity panel.
+ROLES_CACHE = rest_utils.CachePolicy('keystone.roles', timeout=60,
+                                     scope=rest_utils.SCOPE_USER)
+
+
 @urls.register
 class Users(generic.View):
     """API for keystone users.
@@ -46,7 +51,7 @@ class Users(generic.View):
             domain=request.GET.get('domain_id', domain_context),
             group=request.GET.get('group_id')
         )
-        return {'items': [u.to_dict() for u in result]}
+        return {'items': list(result)}
 
     @rest_utils.ajax(data_required=True)
     def post(self, request):
@@ -151,7 +156,7 @@ class Roles(generic.View):
     """
     url_regex = r'keystone/roles/$'
 
-    @rest_utils.ajax()
+    @rest_utils.ajax(cache_policy=ROLES_CACHE)
     def get(self, request):
         """Get a list of roles.
 
@@ -170,12 +175,12 @@ class Roles(generic.View):
                 user_id = request.user.id
             roles = api.keystone.roles_for_user(request, user_id,
                                                 project_id) or []
-            items = [r.to_dict() for r in roles]
+            items = list(roles)
         else:
-            items = [r.to_dict() for r in api.keystone.role_list(request)]
+            items = list(api.keystone.role_list(request))
         return {'items': items}
 
-    @rest_utils.ajax(data_required=True)
+    @rest_utils.ajax(data_required=True, cache_policy=ROLES_CACHE)
     def post(self, request):
         """Create a role.
 
@@ -190,7 +195,7 @@ class Roles(generic.View):
             new_role.to_dict()
         )
 
-    @rest_utils.ajax(data_required=True)
+    @rest_utils.ajax(data_required=True, cache_policy=ROLES_CACHE)
     def delete(self, request):
         """Delete multiple roles by id.
 
@@ -209,7 +214,7 @@ class Role(generic.View):
     """
     url_regex = r'keystone/roles/(?P<id>[0-9a-f]+|default)$'
 
-    @rest_utils.ajax()
+    @rest_utils.ajax(cache_policy=ROLES_CACHE)
     def get(self, request, id):
         """Get a specific role by id.
 
@@ -220,7 +225,7 @@ class Role(generic.View):
             return api.keystone.get_default_role(request).to_dict()
         return api.keystone.role_get(request, id).to_dict()
 
-    @rest_utils.ajax()
+    @rest_utils.ajax(cache_policy=ROLES_CACHE)
     def delete(self, request, id):
         """Delete a single role by id.
 
@@ -230,7 +235,7 @@ class Role(generic.View):
             raise django.http.HttpResponseNotFound('default')
         api.keystone.role_delete(request, id)
 
-    @rest_utils.ajax(data_required=True)
+    @rest_utils.ajax(data_required=True, cache_policy=ROLES_CACHE)
     def patch(self, request, id):
         """Update a single role.
 
@@ -256,7 +261,7 @@ class Domains(generic.View):
 
         The listing result is an object with property "items".
         """
-        items = [d.to_dict() for d in api.keystone.domain_list(request)]
+        items = list(api.keystone.domain_list(request))
         return {'items': items}
 
     @rest_utils.ajax(data_required=True)
@@ -387,7 +392,7 @@ class Projects(generic.View):
             admin=request.GET.get('admin', True)
         )
         # return (list of results, has_more_data)
-        return dict(has_more=has_more, items=[d.to_dict() for d in result])
+        return dict(has_more=has_more, items=list(result))
 
     @rest_utils.ajax(data_required=True)
     def post(self, request):
@@ -473,7 +478,7 @@ class ProjectRole(generic.View):
     url_regex = r'keystone/projects/(?P<project_id>[0-9a-f]+)/' \
                 ' (?P<role_id>[0-9a-f]+)/(?P<user_id>[0-9a-f]+)$'
 
-    @rest_utils.ajax()
+    @rest_utils.ajax(cache_policy=ROLES_CACHE)
     def put(self, request, project_id, role_id, user_id):
         """Grant the specified role to the user in the project (tenant).
 
@@ -24,6 +24,11 @@ from openstack_dashboard.api.rest import urls
 from openstack_dashboard.api.rest import utils as rest_utils
 
 
+# The limits are polled by the launch instance wizard; creating servers
+# through this API drops them, other changes show after the timeout.
+LIMITS_CACHE = rest_utils.CachePolicy('nova.limits', timeout=10)
+
+
 @urls.register
 class Keypairs(generic.View):
     """API for nova keypairs.
@@ -38,7 +43,7 @@ class Keypairs(generic.View):
         The listing result is an object with property "items".
         """
         result = api.nova.keypair_list(request)
-        return {'items': [u.to_dict() for u in result]}
+        return {'items': list(result)}
 
     @rest_utils.ajax(data_required=True)
     def post(self, request):
@@ -83,7 +88,7 @@ class AvailabilityZones(generic.View):
         """
         detailed = request.GET.get('detailed') == 'true'
         result = api.nova.availability_zone_list(request, detailed)
-        return {'items': [u.to_dict() for u in result]}
+        return {'items': list(result)}
 
 
 @urls.register
@@ -92,7 +97,7 @@ class Limits(generic.View):
     """
     url_regex = r'nova/limits/$'
 
-    @rest_utils.ajax()
+    @rest_utils.ajax(cache_policy=LIMITS_CACHE)
     def get(self, request):
         """Get an object describing the current project limits.
 
@@ -124,7 +129,7 @@ class Servers(generic.View):
         'config_drive'
     ]
 
-    @rest_utils.ajax(data_required=True)
+    @rest_utils.ajax(data_required=True, cache_policy=LIMITS_CACHE)
     def post(self, request):
         """Create a server.
 
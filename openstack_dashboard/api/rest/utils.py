@@ -12,17 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import functools
+import hashlib
 import json
 import logging
+import uuid
 
 from django.conf import settings
+from django.core.cache import cache
 from django import http
+from django.middleware import gzip
+from django.utils import cache as cache_utils
 from django.utils import decorators
-
-from oslo_serialization import jsonutils
+from django.utils.encoding import force_bytes
+from django.utils import http as http_utils
+from django.utils import text
+import six
 
 from horizon import exceptions
 
+from openstack_dashboard.utils import serializers
+
 log = logging.getLogger(__name__)
 
 
@@ -38,7 +47,7 @@ http_errors = exceptions.UNAUTHORIZED + exceptions.NOT_FOUND + \
 class CreatedResponse(http.HttpResponse):
     def __init__(self, location, data=None):
         if data is not None:
-            content = jsonutils.dumps(data, sort_keys=settings.DEBUG)
+            content = serializers.dumps(data, sort_keys=settings.DEBUG)
             content_type = 'application/json'
         else:
             content = ''
@@ -53,7 +62,7 @@ class JSONResponse(http.HttpResponse):
         if status == 204:
             content = ''
         else:
-            content = jsonutils.dumps(data, sort_keys=settings.DEBUG)
+            content = serializers.dumps(data, sort_keys=settings.DEBUG)
 
         super(JSONResponse, self).__init__(
             status=status,
@@ -62,7 +71,129 @@ class JSONResponse(http.HttpResponse):
         )
 
 
-def ajax(authenticated=True, data_required=False):
+SCOPE_USER = 'user'
+SCOPE_PROJECT = 'project'
+
+
+class CachePolicy(object):
+    '''Describe how the results of a view's GET requests may be cached.
+
+    :param name: identifies the cached results; views sharing a policy
+        share its invalidation
+    :param timeout: how long (in seconds) a result is kept in the Django
+        cache and served to further requests for the same URL in the same
+        scope; 0 disables this
+    :param max_age: how long (in seconds) the browser may reuse a result
+        without checking it is still current; with 0 it checks every time,
+        getting a 304 "NOT MODIFIED" if the result is unchanged
+    :param scope: SCOPE_PROJECT if the result depends on the user's current
+        project, SCOPE_USER if it only depends on the user
+
+    Successful calls with other methods of views using the policy (such as
+    POST or DELETE) drop the results it cached.
+    '''
+    def __init__(self, name, timeout=0, max_age=0, scope=SCOPE_PROJECT):
+        self.name = name
+        self.timeout = timeout
+        self.max_age = max_age
+        self.scope = scope
+
+    def _generation(self):
+        # Cached results are keyed on a random generation, replaced when they
+        # are invalidated, rather than enumerated and deleted.
+        key = 'horizon:rest:%s:generation' % self.name
+        generation = cache.get(key)
+        if generation is None:
+            cache.add(key, uuid.uuid4().hex, 86400)
+            generation = cache.get(key)
+        return generation
+
+    def _key(self, request):
+        parts = [self.name, self._generation(), request.user.id]
+        if self.scope == SCOPE_PROJECT:
+            parts.append(request.user.project_id)
+        parts.append(request.get_full_path())
+        digest = hashlib.sha1(force_bytes('|'.join(
+            six.text_type(part) for part in parts))).hexdigest()
+        return 'horizon:rest:%s:%s' % (self.name, digest)
+
+    def get(self, request):
+        '''Return the cached response for the request, or None.'''
+        if not self.timeout:
+            return None
+        content = cache.get(self._key(request))
+        if content is None:
+            return None
+        return http.HttpResponse(content=content,
+                                 content_type='application/json')
+
+    def set(self, request, response):
+        if self.timeout and response.status_code == 200 and \
+                not response.streaming:
+            cache.set(self._key(request), response.content, self.timeout)
+
+    def invalidate(self):
+        if not self.timeout:
+            return
+        cache.set('horizon:rest:%s:generation' % self.name,
+                  uuid.uuid4().hex, 86400)
+
+    def patch_response(self, response):
+        if self.max_age:
+            cache_utils.patch_cache_control(response, private=True,
+                                            max_age=self.max_age)
+        else:
+            cache_utils.patch_cache_control(response, private=True,
+                                            no_cache=True)
+
+
+DEFAULT_CACHE_POLICY = CachePolicy('default')
+
+
+def etag_response(request, response):
+    '''Add an ETag to a successful response to a GET request, and return a
+    304 "NOT MODIFIED" instead if the caller's If-None-Match matches it.
+    '''
+    if request.method != 'GET' or response.status_code != 200 or \
+            response.streaming or response.has_header('ETag'):
+        return response
+    etag = hashlib.md5(response.content).hexdigest()
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = http_utils.parse_etags(if_none_match)
+        if etag in etags or '*' in etags:
+            response = http.HttpResponseNotModified()
+    response['ETag'] = http_utils.quote_etag(etag)
+    return response
+
+
+def gzip_response(request, response):
+    '''Compress the response if it is at least REST_API_GZIP_MIN_LENGTH bytes
+    long and the caller accepts gzip.
+    '''
+    min_length = getattr(settings, 'REST_API_GZIP_MIN_LENGTH', 1024)
+    if min_length is None or response.streaming or \
+            len(response.content) < min_length:
+        return response
+    cache_utils.patch_vary_headers(response, ('Accept-Encoding',))
+    if response.has_header('Content-Encoding') or not \
+            gzip.re_accepts_gzip.search(
+                request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        return response
+    content = text.compress_string(response.content)
+    if len(content) >= len(response.content):
+        return response
+    response.content = content
+    response['Content-Length'] = str(len(content))
+    response['Content-Encoding'] = 'gzip'
+    if response.has_header('ETag'):
+        # The compressed body is only semantically equivalent to the
+        # uncompressed one.
+        response['ETag'] = 'W/' + response['ETag']
+    return response
+
+
+def ajax(authenticated=True, data_required=False, cache_policy=None):
     '''Provide a decorator to wrap a view method so that it may exist in an
     entirely AJAX environment:
 
@@ -86,9 +217,18 @@ def ajax(authenticated=True, data_required=False):
 
     Methods returning nothing (or None explicitly) will result in a 204 "NO
     CONTENT" being returned to the caller.
+
+    Successful responses to GET requests carry an ETag, so that callers
+    sending it back in If-None-Match get a 304 "NOT MODIFIED" when the
+    result is unchanged. How else they may be cached is given by
+    cache_policy, a CachePolicy; give the same policy to the methods
+    modifying what the GET returns. Large responses are compressed for
+    callers accepting gzip.
     '''
     def decorator(function, authenticated=authenticated,
-                  data_required=data_required):
+                  data_required=data_required, cache_policy=cache_policy):
+        policy = cache_policy or DEFAULT_CACHE_POLICY
+
         @functools.wraps(function,
                          assigned=decorators.available_attrs(function))
         def _wrapped(self, request, *args, **kw):
@@ -97,36 +237,55 @@ def ajax(authenticated=True, data_required=False):
             if not request.is_ajax():
                 return JSONResponse('request must be AJAX', 400)
 
-            # decode the JSON body if present
-            request.DATA = None
-            if request.body:
-                try:
-                    request.DATA = json.loads(request.body)
-                except (TypeError, ValueError) as e:
-                    return JSONResponse('malformed JSON request: %s' % e, 400)
-
-            if data_required:
-                if not request.DATA:
-                    return JSONResponse('request requires JSON body', 400)
-
-            # invoke the wrapped function, handling exceptions sanely
-            try:
-                data = function(self, request, *args, **kw)
-                if isinstance(data, http.HttpResponse):
-                    return data
-                elif data is None:
-                    return JSONResponse('', status=204)
-                return JSONResponse(data)
-            except http_errors as e:
-                # exception was raised with a specific HTTP status
-                if hasattr(e, 'http_status'):
-                    http_status = e.http_status
-                else:
-                    http_status = e.code
-                return JSONResponse(str(e), http_status)
-            except Exception as e:
-                log.exception('error invoking apiclient')
-                return JSONResponse(str(e), 500)
+            if request.method == 'GET':
+                response = policy.get(request)
+                if response is None:
+                    response = _call(function, self, request, args, kw,
+                                     data_required)
+                    policy.set(request, response)
+                response = etag_response(request, response)
+                if response.status_code in (200, 304):
+                    policy.patch_response(response)
+            else:
+                response = _call(function, self, request, args, kw,
+                                 data_required)
+                if request.method != 'HEAD' and \
+                        response.status_code < 400:
+                    policy.invalidate()
+            return gzip_response(request, response)
 
         return _wrapped
     return decorator
+
+
+def _call(function, self, request, args, kw, data_required):
+    # decode the JSON body if present
+    request.DATA = None
+    if request.body:
+        try:
+            request.DATA = json.loads(request.body)
+        except (TypeError, ValueError) as e:
+            return JSONResponse('malformed JSON request: %s' % e, 400)
+
+    if data_required:
+        if not request.DATA:
+            return JSONResponse('request requires JSON body', 400)
+
+    # invoke the wrapped function, handling exceptions sanely
+    try:
+        data = function(self, request, *args, **kw)
+        if isinstance(data, http.HttpResponse):
+            return data
+        elif data is None:
+            return JSONResponse('', status=204)
+        return JSONResponse(data)
+    except http_errors as e:
+        # exception was raised with a specific HTTP status
+        if hasattr(e, 'http_status'):
+            http_status = e.http_status
+        else:
+            http_status = e.code
+        return JSONResponse(str(e), http_status)
+    except Exception as e:
+        log.exception('error invoking apiclient')
+        return JSONResponse(str(e), 500)
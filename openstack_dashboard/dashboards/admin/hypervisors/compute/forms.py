@@ -18,6 +18,7 @@ from horizon import forms
 from horizon import messages
 
 from openstack_dashboard import api
+from openstack_dashboard.dashboards.admin.hypervisors import inventory
 
 
 class EvacuateHostForm(forms.SelfHandlingForm):
@@ -57,6 +58,7 @@ class EvacuateHostForm(forms.SelfHandlingForm):
             on_shared_storage = data['on_shared_storage']
             api.nova.evacuate_host(request, current_host,
                                    target_host, on_shared_storage)
+            inventory.invalidate(request)
 
             msg = _('Starting evacuation from %(current)s to %(target)s.') % \
                 {'current': current_host, 'target': target_host}
@@ -83,6 +85,7 @@ class DisableServiceForm(forms.SelfHandlingForm):
             reason = data["reason"]
             api.nova.service_disable(request, host, "nova-compute",
                                      reason=reason)
+            inventory.invalidate(request)
             msg = _("Disabled compute service for host: %s.") % host
             messages.success(request, msg)
             return True
@@ -18,6 +18,7 @@ from horizon import tables
 from horizon.utils import filters as utils_filters
 
 from openstack_dashboard import api
+from openstack_dashboard.dashboards.admin.hypervisors import inventory
 from openstack_dashboard import policy
 
 
@@ -81,6 +82,7 @@ class EnableService(policy.PolicyTargetMixin, tables.BatchAction):
 
     def action(self, request, obj_id):
         api.nova.service_enable(request, obj_id, 'nova-compute')
+        inventory.invalidate(request)
 
 
 class ComputeHostFilterAction(tables.FilterAction):
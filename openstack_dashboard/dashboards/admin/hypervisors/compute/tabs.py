@@ -15,8 +15,8 @@ from django.utils.translation import ugettext_lazy as _
 from horizon import exceptions
 from horizon import tabs
 
-from openstack_dashboard.api import nova
 from openstack_dashboard.dashboards.admin.hypervisors.compute import tables
+from openstack_dashboard.dashboards.admin.hypervisors import inventory
 
 
 class ComputeHostTab(tabs.TableTab):
@@ -27,9 +27,8 @@ class ComputeHostTab(tabs.TableTab):
 
     def get_compute_host_data(self):
         try:
-            services = nova.service_list(self.tab_group.request)
-            return [service for service in services
-                    if service.binary == 'nova-compute']
+            return inventory.get_inventory(self.tab_group.request) \
+                .compute_services()
         except Exception:
             msg = _('Unable to get nova services list.')
             exceptions.handle(self.tab_group.request, msg)
@@ -0,0 +1,170 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Inventory of the hypervisors and compute services of a region.
+
+Listing them takes Nova a while in a large region, so they are kept in the
+Django cache and shared by the administrators of the region (see
+:mod:`openstack_dashboard.utils.snapshots`). Once they are older than
+``HYPERVISOR_INVENTORY_INTERVAL`` seconds, the pages keep showing them while
+they are listed again by a background job (see :mod:`horizon.utils.jobs`).
+The pages show how old they are and can ask for them to be refreshed at
+once. The inventory of a large region is stored in pieces, below the item
+size limit of memcached.
+"""
+
+import datetime
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from novaclient.v1_1 import hypervisors
+from novaclient.v1_1 import services
+
+from horizon.utils import jobs
+
+from openstack_dashboard.api import base
+from openstack_dashboard.api import nova
+from openstack_dashboard.utils import snapshots
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 60
+
+# The snapshots invalidated when an action changes the compute hosts.
+HOST_SNAPSHOTS = ('hypervisors', 'hypervisor_stats', 'compute_services')
+
+
+def get_interval():
+    return getattr(settings, 'HYPERVISOR_INVENTORY_INTERVAL',
+                   DEFAULT_INTERVAL)
+
+
+def _scope(request):
+    """Identifies the Nova endpoint of the request.
+
+    The region alone isn't enough: clouds with their own Keystone (see
+    ``AVAILABLE_REGIONS``) may give their regions the same names.
+    """
+    scope = '%s|%s' % (base.url_for(request, 'compute'),
+                       request.user.services_region)
+    return hashlib.md5(scope.encode('utf-8')).hexdigest()
+
+
+def _info(resource):
+    return getattr(resource, '_info', resource)
+
+
+def _rebuild(job, name, scope, build):
+    snapshots.get_snapshot(name, scope, build, interval=get_interval())
+
+
+def _rebuild_later(request, name, scope, build):
+    """Submits a job building the snapshot again, unless one is pending."""
+    resource_id = 'hypervisor_inventory:%s:%s' % (name, scope)
+    job = jobs.get_job_for_resource(resource_id)
+    # A job lost with its process is given up on like a snapshot lock.
+    if job is not None and job['status'] not in jobs.FINISHED_STATUSES \
+            and time.time() - job['created'] < max(get_interval(), 1) * 6:
+        return
+    try:
+        jobs.submit(request, 'hypervisor_inventory', _rebuild,
+                    args=(name, scope, build), resource_id=resource_id)
+    except jobs.QueueFull:
+        LOG.warning('Unable to queue the refresh of the hypervisor '
+                    'inventory %s, it is tried again on the next request.',
+                    name)
+
+
+class Inventory(object):
+    """The hypervisors and compute services of the region of a request.
+
+    Each of them is read from its snapshot, or from Nova when there is no
+    snapshot yet or ``refresh`` is set. A snapshot older than the interval
+    is still used, while a background job builds it again.
+    """
+
+    def __init__(self, request, refresh=False):
+        self.request = request
+        self.refresh = refresh
+        self.timestamps = []
+
+    def _get(self, name, build):
+        scope = _scope(self.request)
+        snapshot = None
+        if not self.refresh:
+            snapshot = snapshots.get_current(name, scope)
+        if snapshot is None:
+            snapshot = snapshots.get_snapshot(
+                name, scope, build, force=self.refresh,
+                interval=get_interval())
+        elif time.time() - snapshot.timestamp >= get_interval():
+            _rebuild_later(self.request, name, scope, build)
+        self.timestamps.append(snapshot.timestamp)
+        return snapshot.data
+
+    @property
+    def updated(self):
+        """When the oldest of the data read was fetched from Nova."""
+        if not self.timestamps:
+            return None
+        return datetime.datetime.fromtimestamp(min(self.timestamps),
+                                               timezone.utc)
+
+    def hypervisors(self):
+        data = self._get('hypervisors', lambda: [
+            _info(hypervisor)
+            for hypervisor in nova.hypervisor_list(self.request)])
+        manager = hypervisors.HypervisorManager(None)
+        return [hypervisors.Hypervisor(manager, info, loaded=True)
+                for info in data]
+
+    def stats(self):
+        return base.APIDictWrapper(self._get('hypervisor_stats', lambda: (
+            _info(nova.hypervisor_stats(self.request)))))
+
+    def compute_services(self):
+        data = self._get('compute_services', lambda: [
+            _info(service) for service in nova.service_list(self.request)
+            if service.binary == 'nova-compute'])
+        manager = services.ServiceManager(None)
+        return [services.Service(manager, info, loaded=True)
+                for info in data]
+
+    def hypervisor_servers(self, hypervisor):
+        """The servers of the hypervisors matching hypervisor."""
+        def build():
+            servers = []
+            for result in nova.hypervisor_search(self.request, hypervisor):
+                servers += getattr(result, 'servers', [])
+            return servers
+        return self._get('hypervisor_servers:%s' % hypervisor, build)
+
+
+def get_inventory(request):
+    """Returns the :class:`Inventory` of the request, refreshed if the
+    request has ``refresh=true``.
+    """
+    if not hasattr(request, '_hypervisor_inventory'):
+        request._hypervisor_inventory = Inventory(
+            request, refresh=request.GET.get('refresh') == 'true')
+    return request._hypervisor_inventory
+
+
+def invalidate(request):
+    """Makes the next requests fetch the compute hosts from Nova."""
+    for name in HOST_SNAPSHOTS:
+        snapshots.invalidate(name, _scope(request))
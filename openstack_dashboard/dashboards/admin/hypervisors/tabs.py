@@ -15,9 +15,9 @@ from django.utils.translation import ugettext_lazy as _
 from horizon import exceptions
 from horizon import tabs
 
-from openstack_dashboard.api import nova
 from openstack_dashboard.dashboards.admin.hypervisors.compute \
     import tabs as cmp_tabs
+from openstack_dashboard.dashboards.admin.hypervisors import inventory
 from openstack_dashboard.dashboards.admin.hypervisors import tables
 
 
@@ -30,7 +30,7 @@ class HypervisorTab(tabs.TableTab):
     def get_hypervisors_data(self):
         hypervisors = []
         try:
-            hypervisors = nova.hypervisor_list(self.request)
+            hypervisors = inventory.get_inventory(self.request).hypervisors()
         except Exception:
             exceptions.handle(self.request,
                               _('Unable to retrieve hypervisor information.'))
@@ -14,9 +14,14 @@
 
 from django.core.urlresolvers import reverse
 from django import http
+from django.test.utils import override_settings
+import mock
 from mox import IsA  # noqa
 
+from horizon.utils import jobs
+
 from openstack_dashboard import api
+from openstack_dashboard.dashboards.admin.hypervisors import inventory
 from openstack_dashboard.test import helpers as test
 
 
@@ -41,20 +46,95 @@ class HypervisorViewTest(test.BaseAdminViewTests):
         self.assertTemplateUsed(res, 'admin/hypervisors/index.html')
 
         hypervisors_tab = res.context['tab_group'].get_tab('hypervisor')
-        self.assertItemsEqual(hypervisors_tab._tables['hypervisors'].data,
-                              hypervisors)
+        # The hypervisors and services are rebuilt from the inventory.
+        self.assertItemsEqual(
+            [h._info for h in hypervisors_tab._tables['hypervisors'].data],
+            [h._info for h in hypervisors])
 
         host_tab = res.context['tab_group'].get_tab('compute_host')
         host_table = host_tab._tables['compute_host']
         compute_services = [service for service in services
                             if service.binary == 'nova-compute']
-        self.assertItemsEqual(host_table.data, compute_services)
+        self.assertItemsEqual([s._info for s in host_table.data],
+                              [s._info for s in compute_services])
         actions_host_up = host_table.get_row_actions(host_table.data[0])
         self.assertEqual(1, len(actions_host_up))
         actions_host_down = host_table.get_row_actions(host_table.data[1])
         self.assertEqual(2, len(actions_host_down))
         self.assertEqual('evacuate', actions_host_down[0].name)
 
+    @test.create_stubs({api.nova: ('extension_supported',
+                                   'hypervisor_list',
+                                   'hypervisor_stats',
+                                   'service_list')})
+    def test_index_inventory(self):
+        api.nova.extension_supported('AdminActions',
+                                     IsA(http.HttpRequest)) \
+            .MultipleTimes().AndReturn(True)
+        for i in range(2):
+            api.nova.hypervisor_list(IsA(http.HttpRequest)) \
+                .AndReturn(self.hypervisors.list())
+            api.nova.hypervisor_stats(IsA(http.HttpRequest)) \
+                .AndReturn(self.hypervisors.stats)
+            api.nova.service_list(IsA(http.HttpRequest)) \
+                .AndReturn(self.services.list())
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:admin:hypervisors:index')
+        self.client.get(url)
+        # Nova is only asked again once the inventory is stale, or when
+        # asked to refresh it.
+        res = self.client.get(url)
+        self.assertIsNotNone(res.context['inventory_updated'])
+        self.assertContains(res, 'Refresh now')
+        res = self.client.get(url, {'refresh': 'true'})
+        self.assertEqual(3, len(res.context['tab_group'].get_tab(
+            'hypervisor')._tables['hypervisors'].data))
+
+    @override_settings(HYPERVISOR_INVENTORY_INTERVAL=0)
+    @test.create_stubs({api.nova: ('extension_supported',
+                                   'hypervisor_list',
+                                   'hypervisor_stats',
+                                   'service_list')})
+    def test_index_stale_inventory(self):
+        hypervisors = self.hypervisors.list()
+        api.nova.extension_supported('AdminActions',
+                                     IsA(http.HttpRequest)) \
+            .MultipleTimes().AndReturn(True)
+        api.nova.hypervisor_list(IsA(http.HttpRequest)) \
+            .AndReturn(hypervisors)
+        api.nova.hypervisor_stats(IsA(http.HttpRequest)) \
+            .AndReturn(self.hypervisors.stats)
+        api.nova.service_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.services.list())
+        api.nova.hypervisor_list(IsA(http.HttpRequest)) \
+            .AndReturn(hypervisors[:1])
+        api.nova.hypervisor_stats(IsA(http.HttpRequest)) \
+            .AndReturn(self.hypervisors.stats)
+        api.nova.service_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.services.list())
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:admin:hypervisors:index')
+        self.client.get(url)
+        # The stale inventory is shown while it is listed again in the
+        # background.
+        res = self.client.get(url)
+        self.assertEqual(len(hypervisors), len(res.context['tab_group']
+                         .get_tab('hypervisor')._tables['hypervisors'].data))
+        jobs._pool.join()
+        scope = inventory._scope(self.request)
+        self.assertEqual(1, len(inventory.snapshots.get_current(
+            'hypervisors', scope).data))
+
+    def test_inventory_scope(self):
+        scope = inventory._scope(self.request)
+        # Regions of different clouds may have the same name.
+        with mock.patch.object(api.base, 'url_for',
+                               return_value='http://other:8774/v2'):
+            self.assertNotEqual(scope, inventory._scope(self.request))
+        self.assertEqual(scope, inventory._scope(self.request))
+
     @test.create_stubs({api.nova: ('hypervisor_list',
                                    'hypervisor_stats',
                                    'service_list')})
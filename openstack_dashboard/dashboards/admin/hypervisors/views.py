@@ -19,7 +19,7 @@ from horizon import tables
 from horizon import tabs
 from horizon.utils import functions as utils
 
-from openstack_dashboard import api
+from openstack_dashboard.dashboards.admin.hypervisors import inventory
 from openstack_dashboard.dashboards.admin.hypervisors \
     import tables as project_tables
 from openstack_dashboard.dashboards.admin.hypervisors \
@@ -34,7 +34,7 @@ class AdminIndexView(tabs.TabbedTableView):
     def get_data(self):
         hypervisors = []
         try:
-            hypervisors = api.nova.hypervisor_list(self.request)
+            hypervisors = inventory.get_inventory(self.request).hypervisors()
             hypervisors.sort(key=utils.natural_sort('hypervisor_hostname'))
         except Exception:
             exceptions.handle(self.request,
@@ -44,12 +44,13 @@ class AdminIndexView(tabs.TabbedTableView):
 
     def get_context_data(self, **kwargs):
         context = super(AdminIndexView, self).get_context_data(**kwargs)
+        hosts = inventory.get_inventory(self.request)
         try:
-            context["stats"] = api.nova.hypervisor_stats(self.request)
+            context["stats"] = hosts.stats()
         except Exception:
             exceptions.handle(self.request,
                               _('Unable to retrieve hypervisor statistics.'))
-
+        context["inventory_updated"] = hosts.updated
         return context
 
 
@@ -61,15 +62,16 @@ class AdminDetailView(tables.DataTableView):
     def get_data(self):
         instances = []
         try:
-            result = api.nova.hypervisor_search(self.request,
-                                                self.kwargs['hypervisor'])
-            for hypervisor in result:
-                try:
-                    instances += hypervisor.servers
-                except AttributeError:
-                    pass
+            instances = inventory.get_inventory(self.request) \
+                .hypervisor_servers(self.kwargs['hypervisor'])
         except Exception:
             exceptions.handle(
                 self.request,
                 _('Unable to retrieve hypervisor instances list.'))
         return instances
+
+    def get_context_data(self, **kwargs):
+        context = super(AdminDetailView, self).get_context_data(**kwargs)
+        context["inventory_updated"] = \
+            inventory.get_inventory(self.request).updated
+        return context
@@ -16,6 +16,7 @@ import uuid
 
 from django.core.urlresolvers import reverse
 from django import http
+from django.test.utils import override_settings
 from django.utils.datastructures import SortedDict
 
 from mox import IgnoreArg  # noqa
@@ -28,6 +29,7 @@ from openstack_dashboard.test import helpers as test
 INDEX_URL = reverse('horizon:admin:instances:index')
 
 
+@override_settings(PROJECT_DIRECTORY_TTL=300)
 class InstanceViewTest(test.BaseAdminViewTests):
     @test.create_stubs({api.nova: ('flavor_list', 'server_list',
                                    'extension_supported',),
@@ -75,16 +75,15 @@ class AdminIndexView(tables.DataTableView):
             project_tables.AdminInstancesTable._meta.pagination_param, None)
         search_opts = self.get_filters({'marker': marker, 'paginate': True})
         # Gather our tenants to correlate against IDs
+        projects = api.keystone.project_directory(self.request)
         try:
-            tenants, has_more = api.keystone.tenant_list(self.request)
+            projects.load()
         except Exception:
-            tenants = []
             msg = _('Unable to retrieve instance project information.')
             exceptions.handle(self.request, msg)
 
         if 'project' in search_opts:
-            ten_filter_ids = [t.id for t in tenants
-                              if t.name == search_opts['project']]
+            ten_filter_ids = projects.ids_for_name(search_opts['project'])
             del search_opts['project']
             if len(ten_filter_ids) > 0:
                 search_opts['tenant_id'] = ten_filter_ids[0]
@@ -119,8 +118,7 @@ class AdminIndexView(tables.DataTableView):
                 flavors = []
 
             full_flavors = SortedDict([(f.id, f) for f in flavors])
-            tenant_dict = SortedDict([(t.id, t) for t in tenants])
-            # Loop through instances to get flavor and tenant info.
+            # Loop through instances to get flavor info.
             for inst in instances:
                 flavor_id = inst.flavor["id"]
                 try:
@@ -134,8 +132,7 @@ class AdminIndexView(tables.DataTableView):
                 except Exception:
                     msg = _('Unable to retrieve instance size information.')
                     exceptions.handle(self.request, msg)
-                tenant = tenant_dict.get(inst.tenant_id, None)
-                inst.tenant_name = getattr(tenant, "name", None)
+            projects.join(instances)
         return instances
 
     def get_filters(self, filters):
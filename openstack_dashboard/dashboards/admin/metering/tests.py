@@ -174,3 +174,32 @@ class MeteringLineChartTabTests(test.BaseAdminViewTests):
 
         self._verify_series(res._container[0], 9.0, '2012-12-21T11:00:55',
                             expected_names)
+
+    @test.create_stubs({api.keystone: ('tenant_list',),
+                        api.ceilometer: ('meter_list',
+                                         'statistic_list',
+                                         ), })
+    def test_stats_for_line_chart_cached(self):
+        api.ceilometer.meter_list(IsA(http.HttpRequest))\
+            .AndReturn(self.testdata.meters.list())
+        api.ceilometer.statistic_list(IsA(http.HttpRequest),
+                                      'memory', period=IsA(int),
+                                      query=IsA(list))\
+            .MultipleTimes().AndReturn(self.testdata.statistics.list())
+        api.keystone.tenant_list(IsA(http.HttpRequest),
+                                 domain=None,
+                                 paginate=False) \
+            .AndReturn([self.testdata.tenants.list(), False])
+
+        self.mox.ReplayAll()
+
+        url = (reverse('horizon:admin:metering:samples') +
+               "?meter=memory&group_by=project&stats_attr=max"
+               "&date_options=7")
+        res = self.client.get(url)
+        # The same chart is served from the cache, without listing the
+        # projects or the statistics again.
+        cached = self.client.get(url)
+        self.assertEqual(res._container[0], cached._container[0])
+        self.assertEqual(cached._headers['content-type'],
+                         ('Content-Type', 'application/json'))
@@ -13,6 +13,7 @@
 import json
 import logging
 
+from django.core.cache import cache
 from django.core.urlresolvers import reverse_lazy
 from django.http import HttpResponse  # noqa
 from django.utils.translation import ugettext_lazy as _
@@ -62,6 +63,14 @@ class SamplesView(django.views.generic.TemplateView):
         stats_attr = request.GET.get('stats_attr', 'avg')
         group_by = request.GET.get('group_by', None)
 
+        cache_key = metering_utils.series_cache_key(
+            request, meter, group_by, stats_attr, date_options, date_from,
+            date_to)
+        content = cache.get(cache_key)
+        if content is not None:
+            return HttpResponse(content, content_type='application/json')
+
+        explicit_date_to = date_options == 'other' and bool(date_to)
         try:
             date_from, date_to = metering_utils.calc_date_args(date_from,
                                                                date_to,
@@ -85,7 +94,11 @@ class SamplesView(django.views.generic.TemplateView):
 
         series = metering_utils.normalize_series_by_unit(series)
         ret = {'series': series, 'settings': {}}
-        return HttpResponse(json.dumps(ret), content_type='application/json')
+        content = json.dumps(ret)
+        cache.set(cache_key, content,
+                  metering_utils.series_cache_timeout(date_to,
+                                                      explicit_date_to))
+        return HttpResponse(content, content_type='application/json')
 
 
 class CsvReportView(django.views.generic.View):
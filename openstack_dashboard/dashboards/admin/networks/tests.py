@@ -14,6 +14,7 @@
 
 from django.core.urlresolvers import reverse
 from django import http
+from django.test.utils import override_settings
 
 from horizon.workflows import views
 
@@ -27,9 +28,10 @@ from openstack_dashboard.test import helpers as test
 INDEX_URL = reverse('horizon:admin:networks:index')
 
 
+@override_settings(PROJECT_DIRECTORY_TTL=300)
 class NetworkTests(test.BaseAdminViewTests):
     @test.create_stubs({api.neutron: ('network_list',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agent_network_counts',
                                       'is_extension_supported'),
                         api.keystone: ('tenant_list',)})
     def test_index(self):
@@ -38,17 +40,11 @@ class NetworkTests(test.BaseAdminViewTests):
             .AndReturn(self.networks.list())
         api.keystone.tenant_list(IsA(http.HttpRequest))\
             .AndReturn([tenants, False])
-        for network in self.networks.list():
-            api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                         network.id)\
-                .AndReturn(self.agents.list())
-            api.neutron.is_extension_supported(
-                IsA(http.HttpRequest),
-                'dhcp_agent_scheduler').AndReturn(True)
-
+        api.neutron.dhcp_agent_network_counts(IsA(http.HttpRequest))\
+            .AndReturn({self.networks.first().id: len(self.agents.list())})
         api.neutron.is_extension_supported(
             IsA(http.HttpRequest),
-            'dhcp_agent_scheduler').AndReturn(True)
+            'dhcp_agent_scheduler').MultipleTimes().AndReturn(True)
         self.mox.ReplayAll()
 
         res = self.client.get(INDEX_URL)
@@ -56,6 +52,34 @@ class NetworkTests(test.BaseAdminViewTests):
         self.assertTemplateUsed(res, 'admin/networks/index.html')
         networks = res.context['networks_table'].data
         self.assertItemsEqual(networks, self.networks.list())
+        self.assertEqual([len(self.agents.list())] +
+                         [0] * (len(networks) - 1),
+                         [n.num_agents for n in networks])
+
+    @test.create_stubs({api.neutron: ('network_list',
+                                      'dhcp_agent_network_counts',
+                                      'is_extension_supported'),
+                        api.keystone: ('tenant_list',)})
+    def test_index_dhcp_agent_exception(self):
+        tenants = self.tenants.list()
+        api.neutron.network_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.networks.list())
+        api.keystone.tenant_list(IsA(http.HttpRequest))\
+            .AndReturn([tenants, False])
+        api.neutron.dhcp_agent_network_counts(IsA(http.HttpRequest))\
+            .AndRaise(self.exceptions.neutron)
+        api.neutron.is_extension_supported(
+            IsA(http.HttpRequest),
+            'dhcp_agent_scheduler').MultipleTimes().AndReturn(True)
+        self.mox.ReplayAll()
+
+        res = self.client.get(INDEX_URL)
+
+        self.assertTemplateUsed(res, 'admin/networks/index.html')
+        networks = res.context['networks_table'].data
+        self.assertEqual(['Unknown'] * len(networks),
+                         [n.num_agents for n in networks])
+        self.assertMessageCount(res, error=1)
 
     @test.create_stubs({api.neutron: ('network_list',
                                       'is_extension_supported',)})
@@ -594,15 +618,14 @@ class NetworkTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.neutron: ('network_list',
                                       'network_delete',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agent_network_counts',
                                       'is_extension_supported'),
                         api.keystone: ('tenant_list',)})
     def test_delete_network(self):
         tenants = self.tenants.list()
         network = self.networks.first()
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network.id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agent_network_counts(IsA(http.HttpRequest)).\
+            AndReturn({network.id: len(self.agents.list())})
         api.neutron.is_extension_supported(
             IsA(http.HttpRequest),
             'dhcp_agent_scheduler').AndReturn(True)
@@ -624,15 +647,14 @@ class NetworkTests(test.BaseAdminViewTests):
 
     @test.create_stubs({api.neutron: ('network_list',
                                       'network_delete',
-                                      'list_dhcp_agent_hosting_networks',
+                                      'dhcp_agent_network_counts',
                                       'is_extension_supported'),
                         api.keystone: ('tenant_list',)})
     def test_delete_network_exception(self):
         tenants = self.tenants.list()
         network = self.networks.first()
-        api.neutron.list_dhcp_agent_hosting_networks(IsA(http.HttpRequest),
-                                                     network.id).\
-            AndReturn(self.agents.list())
+        api.neutron.dhcp_agent_network_counts(IsA(http.HttpRequest)).\
+            AndReturn({network.id: len(self.agents.list())})
         api.neutron.is_extension_supported(
             IsA(http.HttpRequest),
             'dhcp_agent_scheduler').AndReturn(True)
@@ -13,7 +13,6 @@
 #    under the License.
 
 from django.core.urlresolvers import reverse_lazy
-from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
@@ -40,33 +39,27 @@ class IndexView(tables.DataTableView):
     table_class = networks_tables.NetworksTable
     template_name = 'admin/networks/index.html'
 
-    @memoized.memoized_method
-    def _get_tenant_list(self):
+    def _get_projects(self):
+        projects = api.keystone.project_directory(self.request)
         try:
-            tenants, has_more = api.keystone.tenant_list(self.request)
+            projects.load()
         except Exception:
-            tenants = []
             msg = _('Unable to retrieve instance project information.')
             exceptions.handle(self.request, msg)
+        return projects
 
-        tenant_dict = SortedDict([(t.id, t) for t in tenants])
-        return tenant_dict
-
-    def _get_agents_data(self, network):
-        agents = []
-        data = _("Unknown")
+    def _get_agents_data(self):
+        """Returns the number of DHCP agents hosting each network, or None
+        if it cannot be retrieved.
+        """
         try:
             if api.neutron.is_extension_supported(self.request,
                                                   'dhcp_agent_scheduler'):
-                # This method is called for each network. If agent-list cannot
-                # be retrieved, we will see many pop-ups. So the error message
-                # will be popup-ed in get_data() below.
-                agents = api.neutron.list_dhcp_agent_hosting_networks(
-                    self.request, network)
-                data = len(agents)
+                return api.neutron.dhcp_agent_network_counts(self.request)
         except Exception:
-            self.exception = True
-        return data
+            msg = _('Unable to list dhcp agents hosting network.')
+            exceptions.handle(self.request, msg)
+        return None
 
     def get_data(self):
         try:
@@ -76,17 +69,14 @@ class IndexView(tables.DataTableView):
             msg = _('Network list can not be retrieved.')
             exceptions.handle(self.request, msg)
         if networks:
-            self.exception = False
-            tenant_dict = self._get_tenant_list()
+            # Set tenant names
+            self._get_projects().join(networks)
+            agent_counts = self._get_agents_data()
             for n in networks:
-                # Set tenant name
-                tenant = tenant_dict.get(n.tenant_id, None)
-                n.tenant_name = getattr(tenant, 'name', None)
-                n.num_agents = self._get_agents_data(n.id)
-
-            if self.exception:
-                msg = _('Unable to list dhcp agents hosting network.')
-                exceptions.handle(self.request, msg)
+                if agent_counts is None:
+                    n.num_agents = _("Unknown")
+                else:
+                    n.num_agents = agent_counts.get(n.id, 0)
         return networks
 
 
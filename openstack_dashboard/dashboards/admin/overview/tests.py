@@ -20,6 +20,7 @@ import datetime
 
 from django.core.urlresolvers import reverse
 from django import http
+from django.test.utils import override_settings
 from django.utils import encoding
 from django.utils import timezone
 
@@ -35,6 +36,7 @@ from openstack_dashboard import usage
 INDEX_URL = reverse('horizon:project:overview:index')
 
 
+@override_settings(PROJECT_DIRECTORY_TTL=300)
 class UsageViewTests(test.BaseAdminViewTests):
 
     def _stub_api_calls(self, nova_stu_enabled):
@@ -57,20 +57,21 @@ class GlobalOverview(usage.UsageView):
     def get_data(self):
         data = super(GlobalOverview, self).get_data()
         # Pre-fill project names
+        projects = api.keystone.project_directory(self.request)
         try:
-            projects, has_more = api.keystone.tenant_list(self.request)
+            projects.load()
         except Exception:
-            projects = []
             exceptions.handle(self.request,
                               _('Unable to retrieve project list.'))
         for instance in data:
-            project = filter(lambda t: t.id == instance.tenant_id, projects)
+            project = projects.get(instance.tenant_id)
             # If we could not get the project name, show the tenant_id with
             # a 'Deleted' identifier instead.
             if project:
-                instance.project_name = getattr(project[0], "name", None)
+                instance.project_name = project.name
             else:
                 deleted = _("Deleted")
                 instance.project_name = translation.string_concat(
                     instance.tenant_id, " (", deleted, ")")
+        projects.save()
         return data
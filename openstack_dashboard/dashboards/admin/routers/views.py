@@ -41,12 +41,10 @@ class IndexView(r_views.IndexView, n_views.IndexView):
             exceptions.handle(self.request,
                               _('Unable to retrieve router list.'))
         if routers:
-            tenant_dict = self._get_tenant_list()
+            # Set tenant names
+            self._get_projects().join(routers)
             ext_net_dict = self._list_external_networks()
             for r in routers:
-                # Set tenant name
-                tenant = tenant_dict.get(r.tenant_id, None)
-                r.tenant_name = getattr(tenant, 'name', None)
                 # If name is empty use UUID as name
                 r.name = r.name_or_id
                 # Set external network name
@@ -12,6 +12,7 @@
 
 from django.core.urlresolvers import reverse
 from django import http
+from django.test.utils import override_settings
 from mox import IsA  # noqa
 
 from openstack_dashboard.api import cinder
@@ -21,6 +22,7 @@ from openstack_dashboard.test import helpers as test
 INDEX_URL = reverse('horizon:admin:volumes:index')
 
 
+@override_settings(PROJECT_DIRECTORY_TTL=300)
 class VolumeSnapshotsViewTests(test.BaseAdminViewTests):
     @test.create_stubs({cinder: ('volume_snapshot_reset_state',
                                  'volume_snapshot_get')})
@@ -37,27 +37,57 @@ class VolumeTab(tabs.TableTab, volumes_tabs.VolumeTableMixIn):
     template_name = "admin/volumes/volumes/volumes_tables.html"
     preload = False
 
+    def has_prev_data(self, table):
+        return self._prev
+
+    def has_more_data(self, table):
+        return self._more
+
     def get_volumes_data(self):
-        volumes = self._get_volumes(search_opts={'all_tenants': True})
-        instances = self._get_instances(search_opts={'all_tenants': True})
+        volumes = []
+        prev_marker = self.request.GET.get(
+            volumes_tables.VolumesTable._meta.prev_pagination_param, None)
+        if prev_marker is not None:
+            sort_dir = 'asc'
+            marker = prev_marker
+        else:
+            sort_dir = 'desc'
+            marker = self.request.GET.get(
+                volumes_tables.VolumesTable._meta.pagination_param, None)
+        try:
+            volumes, self._more, self._prev = cinder.volume_list_paged(
+                self.request,
+                search_opts={'all_tenants': True},
+                marker=marker,
+                paginate=True,
+                sort_dir=sort_dir)
+        except Exception:
+            self._prev = False
+            self._more = False
+            exceptions.handle(self.request,
+                              _('Unable to retrieve volume list.'))
+        if not volumes:
+            return volumes
+
+        # Only look the instances up when a volume on this page is attached.
+        if any(volume.attachments for volume in volumes):
+            instances = self._get_instances(
+                search_opts={'all_tenants': True})
+        else:
+            instances = []
         volume_ids_with_snapshots = self._get_volumes_ids_with_snapshots(
             search_opts={'all_tenants': True})
         self._set_volume_attributes(
             volumes, instances, volume_ids_with_snapshots)
 
         # Gather our tenants to correlate against IDs
+        projects = keystone.project_directory(self.request)
         try:
-            tenants, has_more = keystone.tenant_list(self.request)
+            projects.load()
         except Exception:
-            tenants = []
             msg = _('Unable to retrieve volume project information.')
             exceptions.handle(self.request, msg)
-
-        tenant_dict = SortedDict([(t.id, t) for t in tenants])
-        for volume in volumes:
-            tenant_id = getattr(volume, "os-vol-tenant-attr:tenant_id", None)
-            tenant = tenant_dict.get(tenant_id, None)
-            volume.tenant_name = getattr(tenant, "name", None)
+        projects.join(volumes, id_attr='os-vol-tenant-attr:tenant_id')
 
         return volumes
 
@@ -134,23 +164,22 @@ class SnapshotTab(tabs.TableTab):
                                                   "volume snapshots."))
 
             # Gather our tenants to correlate against volume IDs
+            projects = keystone.project_directory(self.request)
             try:
-                tenants, has_more = keystone.tenant_list(self.request)
+                projects.load()
             except Exception:
-                tenants = []
                 msg = _('Unable to retrieve volume project information.')
                 exceptions.handle(self.request, msg)
 
-            tenant_dict = dict([(t.id, t) for t in tenants])
             for snapshot in snapshots:
                 volume = volumes.get(snapshot.volume_id)
                 tenant_id = getattr(volume,
                                     'os-vol-tenant-attr:tenant_id', None)
-                tenant = tenant_dict.get(tenant_id, None)
                 snapshot._volume = volume
-                snapshot.tenant_name = getattr(tenant, "name", None)
+                snapshot.tenant_name = projects.name(tenant_id)
                 snapshot.host_name = getattr(
                     volume, 'os-vol-host-attr:host', None)
+            projects.save()
 
         else:
             snapshots = []
@@ -14,6 +14,7 @@
 
 from django.core.urlresolvers import reverse
 from django import http
+from django.test.utils import override_settings
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
@@ -23,13 +24,16 @@ from openstack_dashboard.dashboards.admin.volumes.volumes import forms
 from openstack_dashboard.test import helpers as test
 
 
+@override_settings(PROJECT_DIRECTORY_TTL=300)
 class VolumeTests(test.BaseAdminViewTests):
     @test.create_stubs({api.nova: ('server_list',),
-                        cinder: ('volume_list',),
+                        cinder: ('volume_list_paged',),
                         keystone: ('tenant_list',)})
     def test_index(self):
-        cinder.volume_list(IsA(http.HttpRequest), search_opts={
-            'all_tenants': True}).AndReturn(self.cinder_volumes.list())
+        cinder.volume_list_paged(IsA(http.HttpRequest), search_opts={
+            'all_tenants': True}, marker=None, paginate=True,
+            sort_dir='desc') \
+            .AndReturn([self.cinder_volumes.list(), False, False])
         api.nova.server_list(IsA(http.HttpRequest), search_opts={
                              'all_tenants': True}) \
             .AndReturn([self.servers.list(), False])
@@ -43,6 +47,28 @@ class VolumeTests(test.BaseAdminViewTests):
         volumes = res.context['volumes_table'].data
         self.assertItemsEqual(volumes, self.cinder_volumes.list())
 
+    @test.create_stubs({cinder: ('volume_list_paged',),
+                        keystone: ('tenant_list',)})
+    def test_index_paginated(self):
+        volumes = [v for v in self.cinder_volumes.list()
+                   if not v.attachments]
+        url = reverse('horizon:admin:volumes:index')
+        cinder.volume_list_paged(IsA(http.HttpRequest), search_opts={
+            'all_tenants': True}, marker=volumes[0].id, paginate=True,
+            sort_dir='desc') \
+            .AndReturn([volumes[1:], True, True])
+        keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([self.tenants.list(), False])
+
+        self.mox.ReplayAll()
+        # No volume on the page is attached, so the instances aren't listed.
+        res = self.client.get(url + '?marker=%s' % volumes[0].id)
+
+        table = res.context['volumes_table']
+        self.assertItemsEqual(table.data, volumes[1:])
+        self.assertTrue(table.has_more_data())
+        self.assertTrue(table.has_prev_data())
+
     @test.create_stubs({cinder: ('volume_reset_state',
                                  'volume_get')})
     def test_update_volume_status(self):
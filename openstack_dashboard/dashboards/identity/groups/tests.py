@@ -48,7 +48,8 @@ class GroupsViewTests(test.BaseAdminViewTests):
         domain_id = self._get_domain_id()
         groups = self._get_groups(domain_id)
 
-        api.keystone.group_list(IgnoreArg(), domain=domain_id) \
+        api.keystone.group_list(IgnoreArg(), domain=domain_id,
+                                filters=None) \
             .AndReturn(groups)
 
         self.mox.ReplayAll()
@@ -77,7 +78,8 @@ class GroupsViewTests(test.BaseAdminViewTests):
         domain_id = self._get_domain_id()
         groups = self._get_groups(domain_id)
 
-        api.keystone.group_list(IgnoreArg(), domain=domain_id) \
+        api.keystone.group_list(IgnoreArg(), domain=domain_id,
+                                filters=None) \
             .AndReturn(groups)
         api.keystone.keystone_can_edit_group() \
             .MultipleTimes().AndReturn(False)
@@ -148,7 +150,8 @@ class GroupsViewTests(test.BaseAdminViewTests):
         domain_id = self._get_domain_id()
         group = self.groups.get(id="2")
 
-        api.keystone.group_list(IgnoreArg(), domain=domain_id) \
+        api.keystone.group_list(IgnoreArg(), domain=domain_id,
+                                filters=None) \
             .AndReturn(self.groups.list())
         api.keystone.group_delete(IgnoreArg(), group.id)
 
@@ -30,9 +30,10 @@ from openstack_dashboard.dashboards.identity.groups \
     import forms as project_forms
 from openstack_dashboard.dashboards.identity.groups \
     import tables as project_tables
+from openstack_dashboard.dashboards.identity import views as identity_views
 
 
-class IndexView(tables.DataTableView):
+class IndexView(identity_views.PagedListMixin, tables.DataTableView):
     table_class = project_tables.GroupsTable
     template_name = constants.GROUPS_INDEX_VIEW_TEMPLATE
     page_title = _("Groups")
@@ -44,7 +45,9 @@ class IndexView(tables.DataTableView):
                         self.request):
             try:
                 groups = api.keystone.group_list(self.request,
-                                                 domain=domain_context)
+                                                 domain=domain_context,
+                                                 filters=self.get_filters())
+                groups = self.get_page(groups)
             except Exception:
                 exceptions.handle(self.request,
                                   _('Unable to retrieve group list.'))
@@ -18,14 +18,19 @@ import logging
 import os
 
 import django
+from django.contrib import messages as django_messages
+from django.contrib.messages.storage import default_storage
 from django.core.urlresolvers import reverse
 from django import http
 from django.test.utils import override_settings
 from django.utils import timezone
 from django.utils import unittest
 
+from keystoneclient.v3 import role_assignments
+import mock
 from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
+import six
 
 from horizon import exceptions
 from horizon.workflows import views
@@ -56,8 +61,7 @@ class TenantsViewTests(test.BaseAdminViewTests):
     def test_index(self):
         api.keystone.tenant_list(IsA(http.HttpRequest),
                                  domain=None,
-                                 paginate=True,
-                                 marker=None) \
+                                 filters=None) \
             .AndReturn([self.tenants.list(), False])
         self.mox.ReplayAll()
 
@@ -74,8 +78,7 @@ class TenantsViewTests(test.BaseAdminViewTests):
                           if tenant.domain_id == domain.id]
         api.keystone.tenant_list(IsA(http.HttpRequest),
                                  domain=domain.id,
-                                 paginate=True,
-                                 marker=None) \
+                                 filters=None) \
                     .AndReturn([domain_tenants, False])
         self.mox.ReplayAll()
 
@@ -84,6 +87,45 @@ class TenantsViewTests(test.BaseAdminViewTests):
         self.assertItemsEqual(res.context['table'].data, domain_tenants)
         self.assertContains(res, "<em>test_domain:</em>")
 
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_index_paginated(self):
+        tenants = self.tenants.list()
+        by_name = sorted(tenants, key=lambda tenant: (tenant.name.lower(),
+                                                      tenant.id))
+        api.keystone.tenant_list(IgnoreArg(), domain=None, filters=None) \
+            .MultipleTimes().AndReturn([tenants, False])
+        self.mox.ReplayAll()
+
+        with self.settings(API_RESULT_PAGE_SIZE=2):
+            res = self.client.get(INDEX_URL, {'tenant_marker': by_name[1].id})
+            table = res.context['table']
+            self.assertEqual(by_name[2:], table.data)
+            self.assertTrue(table.has_prev_data())
+            self.assertFalse(table.has_more_data())
+
+            # The previous page is the one before the first project shown.
+            res = self.client.get(INDEX_URL,
+                                  {'prev_tenant_marker': by_name[2].id})
+            table = res.context['table']
+            self.assertEqual(by_name[:2], table.data)
+            self.assertTrue(table.has_more_data())
+            self.assertFalse(table.has_prev_data())
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_index_paginated_by_keystone_v2(self):
+        tenants = self.tenants.list()
+        api.keystone.tenant_list(IsA(http.HttpRequest), paginate=True,
+                                 marker=tenants[0].id, domain=None) \
+            .AndReturn([tenants[1:3], True])
+        self.mox.ReplayAll()
+
+        with mock.patch.object(api.keystone.VERSIONS, '_active', 2):
+            res = self.client.get(INDEX_URL, {'tenant_marker': tenants[0].id})
+        table = res.context['table']
+        self.assertEqual(tenants[1:3], table.data)
+        self.assertTrue(table.has_more_data())
+        self.assertFalse(table.has_prev_data())
+
 
 class ProjectsViewNonAdminTests(test.TestCase):
     @override_settings(POLICY_CHECK_FUNCTION=policy_backend.check)
@@ -91,9 +133,8 @@ class ProjectsViewNonAdminTests(test.TestCase):
     def test_index(self):
         api.keystone.tenant_list(IsA(http.HttpRequest),
                                  user=self.user.id,
-                                 paginate=True,
-                                 marker=None,
-                                 admin=False) \
+                                 admin=False,
+                                 filters=None) \
             .AndReturn([self.tenants.list(), False])
         self.mox.ReplayAll()
 
@@ -754,14 +795,49 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         return [user for user in self.users.list()
                 if user.project_id == project_id]
 
-    def _get_proj_groups(self, project_id):
-        return [group for group in self.groups.list()
-                if group.project_id == project_id]
-
     def _get_proj_role_assignment(self, project_id):
         project_scope = {'project': {'id': project_id}}
         return self.role_assignments.filter(scope=project_scope)
 
+    def _get_members_role_assignments(self, project_id, kind, members_roles):
+        scope = {'project': {'id': project_id}}
+        return [role_assignments.RoleAssignment(
+            role_assignments.RoleAssignmentManager,
+            {kind: {'id': member_id}, 'role': {'id': role_id},
+             'scope': scope})
+            for member_id, role_ids in sorted(members_roles.items())
+            for role_id in role_ids]
+
+    def _record_users_roles(self, project_id, users_roles):
+        # The roles of the users are listed once, before they are updated.
+        if api.keystone.VERSIONS.active >= 3:
+            api.keystone.role_assignments_list(IsA(http.HttpRequest),
+                                               project=project_id) \
+                .AndReturn(self._get_members_role_assignments(
+                    project_id, 'user', users_roles))
+        else:
+            users = [user for user in self.users.list()
+                     if user.id in users_roles]
+            api.keystone.user_list(IsA(http.HttpRequest),
+                                   project=project_id).AndReturn(users)
+            for user in users:
+                api.keystone.roles_for_user(IsA(http.HttpRequest),
+                                            user.id, project_id) \
+                    .AndReturn([role for role in self.roles.list()
+                                if role.id in users_roles[user.id]])
+
+    def _get_messages(self):
+        request = self.client.request(**{'wsgi.input': None})
+        request.COOKIES = self.client.cookies
+        return default_storage(request)._decode(
+            self.client.cookies['messages'].value)
+
+    def _record_groups_roles(self, project_id, groups_roles):
+        api.keystone.role_assignments_list(IsA(http.HttpRequest),
+                                           project=project_id) \
+            .AndReturn(self._get_members_role_assignments(
+                project_id, 'group', groups_roles))
+
     @test.create_stubs({api.keystone: ('get_default_role',
                                        'roles_for_user',
                                        'tenant_get',
@@ -879,7 +955,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         users = self._get_all_users(domain_id)
         proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
-        proj_groups = self._get_proj_groups(project.id)
         roles = self.roles.list()
         role_assignments = self._get_proj_role_assignment(project.id)
         quota_usages = self.quota_usages.first()
@@ -952,91 +1027,60 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
         # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id) \
-            .AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id) \
-            .AndReturn((roles[0],))
-        # remove role 1
+        # member user 2 - has role 1, will be given role 2 instead
+        # member user 3 - has role 2, will be given role 1 instead
+        # user 4 - of another domain, not offered by the step, keeps its role
+        self._record_users_roles(self.tenant.id,
+                                 {'1': ['1', '2'], '2': ['1'], '3': ['2'],
+                                  '4': ['1']})
+        # The roles are changed in the order of the users, then roles.
         api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
                                              project=self.tenant.id,
                                              user='2',
                                              role='1')
-        # add role 2
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='2',
                                           role='2')
-
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id) \
-            .AndReturn((roles[1],))
-        # remove role 2
-        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
-                                             project=self.tenant.id,
-                                             user='3',
-                                             role='2')
-        # add role 1
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
                                           role='1')
+        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             user='3',
+                                             role='2')
 
         # Group assignments
-        api.keystone.group_list(IsA(http.HttpRequest),
-                                domain=domain_id,
-                                project=self.tenant.id).AndReturn(proj_groups)
-
         # admin group - try to remove all roles on current project
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='1',
-                                     project=self.tenant.id) \
-            .AndReturn(roles)
+        # member group 2 - has role 1, will be given role 2 instead
+        # member group 3 - has role 2, will be given role 1 instead
+        # group 4 - of another domain, not offered by the step, keeps its role
+        self._record_groups_roles(self.tenant.id,
+                                  {'1': ['1', '2'], '2': ['1'], '3': ['2'],
+                                   '4': ['2']})
         for role in roles:
             api.keystone.remove_group_role(IsA(http.HttpRequest),
                                            role=role.id,
                                            group='1',
                                            project=self.tenant.id)
-
-        # member group 1 - has role 1, will remove it
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='2',
-                                     project=self.tenant.id) \
-            .AndReturn((roles[0],))
-        # remove role 1
         api.keystone.remove_group_role(IsA(http.HttpRequest),
                                        role='1',
                                        group='2',
                                        project=self.tenant.id)
-        # add role 2
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='2',
                                     group='2',
                                     project=self.tenant.id)
-
-        # member group 3 - has role 2
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='3',
-                                     project=self.tenant.id) \
-            .AndReturn((roles[1],))
-        # remove role 2
-        api.keystone.remove_group_role(IsA(http.HttpRequest),
-                                       role='2',
-                                       group='3',
-                                       project=self.tenant.id)
-        # add role 1
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='1',
                                     group='3',
                                     project=self.tenant.id)
+        api.keystone.remove_group_role(IsA(http.HttpRequest),
+                                       role='2',
+                                       group='3',
+                                       project=self.tenant.id)
 
         quotas.tenant_quota_usages(IsA(http.HttpRequest), tenant_id=project.id) \
             .AndReturn(quota_usages)
@@ -1253,7 +1297,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         users = self._get_all_users(domain_id)
         proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
-        proj_groups = self._get_proj_groups(project.id)
         roles = self.roles.list()
         role_assignments = self._get_proj_role_assignment(project.id)
         quota_usages = self.quota_usages.first()
@@ -1323,53 +1366,20 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
-        # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id) \
-            .AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id) \
-            .AndReturn((roles[1],))
-
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id) \
-            .AndReturn((roles[0],))
-        # add role 2
+        # admin user 1 and member user 2 - have no change
+        # member user 3 - has role 1, will be given role 2
+        self._record_users_roles(self.tenant.id,
+                                 {'1': ['1', '2'], '2': ['2'], '3': ['1']})
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
                                           role='2')
 
         # Group assignment
-        api.keystone.group_list(IsA(http.HttpRequest),
-                                domain=domain_id,
-                                project=self.tenant.id).AndReturn(proj_groups)
-
-        # admin group 1- try to remove all roles on current project
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='1',
-                                     project=self.tenant.id) \
-            .AndReturn(roles)
-
-        # member group 1 - has no change
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='2',
-                                     project=self.tenant.id) \
-            .AndReturn((roles[1],))
-
-        # member group 3 - has role 1
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='3',
-                                     project=self.tenant.id) \
-            .AndReturn((roles[0],))
-
-        # add role 2
+        # admin group 1 and member group 2 - have no change
+        # member group 3 - has role 1, will be given role 2
+        self._record_groups_roles(self.tenant.id,
+                                  {'1': ['1', '2'], '2': ['2'], '3': ['1']})
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='2',
                                     group='3',
@@ -1421,6 +1431,71 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                  'get_disabled_quotas',
                                  'tenant_quota_usages')})
     def test_update_project_member_update_error(self):
+        def record_changes():
+            # admin user 1 and member user 2 - have no change
+            # member user 3 - has role 1, will be given role 2
+            self._record_users_roles(self.tenant.id, {'1': ['1', '2'],
+                                                      '2': ['2'],
+                                                      '3': ['1']})
+            # add role 2
+            api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
+                                              project=self.tenant.id,
+                                              user='3',
+                                              role='2')\
+                .AndRaise(self.exceptions.keystone)
+
+        self._test_update_project_member_update_error(record_changes)
+
+    @test.create_stubs({api.keystone: ('tenant_get',
+                                       'domain_get',
+                                       'tenant_update',
+                                       'get_default_role',
+                                       'roles_for_user',
+                                       'remove_tenant_user_role',
+                                       'add_tenant_user_role',
+                                       'user_list',
+                                       'roles_for_group',
+                                       'remove_group_role',
+                                       'add_group_role',
+                                       'group_list',
+                                       'role_list',
+                                       'role_assignments_list'),
+                        quotas: ('get_tenant_quota_data',
+                                 'get_disabled_quotas',
+                                 'tenant_quota_usages')})
+    @override_settings(OPENSTACK_KEYSTONE_ROLE_UPDATE_WORKERS=4)
+    def test_update_project_member_update_errors_concurrently(self):
+        def record_changes():
+            # member user 2 - has role 1, will have role 2 instead
+            # member user 3 - has role 1, will be given role 2
+            self._record_users_roles(self.tenant.id, {'1': ['1', '2'],
+                                                      '2': ['1'],
+                                                      '3': ['1']})
+
+        def add_role(request, project, user, role):
+            raise self.exceptions.keystone
+
+        # The roles are changed by several threads, in any order.
+        with mock.patch.object(api.keystone, 'add_tenant_user_role',
+                               side_effect=add_role) as add, \
+                mock.patch.object(api.keystone,
+                                  'remove_tenant_user_role') as remove:
+            self._test_update_project_member_update_error(record_changes)
+
+        add.assert_has_calls([mock.call(IsA(http.HttpRequest),
+                                        project=self.tenant.id,
+                                        user=user_id, role='2')
+                              for user_id in ('2', '3')], any_order=True)
+        remove.assert_called_once_with(IsA(http.HttpRequest),
+                                       project=self.tenant.id,
+                                       user='2', role='1')
+        # All the roles which couldn't be granted are reported.
+        errors = [six.text_type(message) for message in self._get_messages()
+                  if message.level == django_messages.ERROR]
+        self.assertIn(u'Failed to modify the roles of 2 project members: '
+                      u'user_two (_member_), user_three (_member_).', errors)
+
+    def _test_update_project_member_update_error(self, record_changes):
         keystone_api_version = api.keystone.VERSIONS.active
 
         project = self.tenants.first()
@@ -1500,27 +1575,7 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
-        # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id).AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id).AndReturn((roles[1],))
-
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id).AndReturn((roles[0],))
-        # add role 2
-        api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
-                                          project=self.tenant.id,
-                                          user='3',
-                                          role='2')\
-            .AndRaise(self.exceptions.keystone)
-
+        record_changes()
         self.mox.ReplayAll()
 
         # submit form data
@@ -1538,6 +1593,7 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         self.assertNoFormErrors(res)
         self.assertMessageCount(error=2, warning=0)
         self.assertRedirectsNoFollow(res, INDEX_URL)
+        return res
 
     @test.create_stubs({api.keystone: ('get_default_role',
                                        'tenant_get',
@@ -1682,8 +1738,7 @@ class SeleniumTests(test.SeleniumAdminTestCase):
         # Tenant List
         api.keystone.tenant_list(IgnoreArg(),
                                  domain=None,
-                                 marker=None,
-                                 paginate=True) \
+                                 filters=None) \
             .AndReturn([self.tenants.list(), False])
         # Edit mod
         api.keystone.tenant_get(IgnoreArg(),
@@ -1763,8 +1818,7 @@ class SeleniumTests(test.SeleniumAdminTestCase):
         # Tenant List
         api.keystone.tenant_list(IgnoreArg(),
                                  domain=None,
-                                 marker=None,
-                                 paginate=True) \
+                                 filters=None) \
             .AndReturn([self.tenants.list(), False])
         # Edit mod
         api.keystone.tenant_get(IgnoreArg(),
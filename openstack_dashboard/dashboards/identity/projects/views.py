@@ -36,6 +36,7 @@ from openstack_dashboard.dashboards.identity.projects \
     import tables as project_tables
 from openstack_dashboard.dashboards.identity.projects \
     import workflows as project_workflows
+from openstack_dashboard.dashboards.identity import views as identity_views
 from openstack_dashboard.dashboards.project.overview \
     import views as project_views
 
@@ -65,46 +66,48 @@ class TenantContextMixin(object):
         return context
 
 
-class IndexView(tables.DataTableView):
+class IndexView(identity_views.PagedListMixin, tables.DataTableView):
     table_class = project_tables.TenantsTable
     template_name = 'identity/projects/index.html'
     page_title = _("Projects")
 
-    def has_more_data(self, table):
-        return self._more
+    def _get_tenants(self, **kwargs):
+        """Returns the page of projects to show.
+
+        The Identity API v2 pages the unfiltered project list itself, but
+        only forwards. The other lists are fetched whole and cut into pages
+        with :meth:`get_page`.
+        """
+        filters = self.get_filters()
+        if api.keystone.VERSIONS.active < 3 and not filters:
+            marker = self.request.GET.get(
+                self.table_class._meta.pagination_param)
+            tenants, self._more = api.keystone.tenant_list(
+                self.request, paginate=True, marker=marker, **kwargs)
+            return tenants
+        tenants = api.keystone.tenant_list(self.request, filters=filters,
+                                           **kwargs)[0]
+        return self.get_page(tenants)
 
     def get_data(self):
         tenants = []
-        marker = self.request.GET.get(
-            project_tables.TenantsTable._meta.pagination_param, None)
         domain_context = self.request.session.get('domain_context', None)
         if policy.check((("identity", "identity:list_projects"),),
                         self.request):
             try:
-                tenants, self._more = api.keystone.tenant_list(
-                    self.request,
-                    domain=domain_context,
-                    paginate=True,
-                    marker=marker)
+                tenants = self._get_tenants(domain=domain_context)
             except Exception:
-                self._more = False
                 exceptions.handle(self.request,
                                   _("Unable to retrieve project list."))
         elif policy.check((("identity", "identity:list_user_projects"),),
                           self.request):
             try:
-                tenants, self._more = api.keystone.tenant_list(
-                    self.request,
-                    user=self.request.user.id,
-                    paginate=True,
-                    marker=marker,
-                    admin=False)
+                tenants = self._get_tenants(user=self.request.user.id,
+                                            admin=False)
             except Exception:
-                self._more = False
                 exceptions.handle(self.request,
                                   _("Unable to retrieve project information."))
         else:
-            self._more = False
             msg = \
                 _("Insufficient privilege level to view project information.")
             messages.info(self.request, msg)
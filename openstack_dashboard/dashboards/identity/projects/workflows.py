@@ -17,6 +17,8 @@
 #    under the License.
 
 
+import collections
+
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.utils.translation import ugettext_lazy as _
@@ -43,6 +45,64 @@ PROJECT_USER_MEMBER_SLUG = "update_members"
 PROJECT_GROUP_MEMBER_SLUG = "update_group_members"
 
 
+def _get_member_roles(member_step, data, available_roles):
+    """Maps the users (or groups) chosen in a members step to the ids of
+    the roles they were given.
+    """
+    member_roles = collections.defaultdict(list)
+    for role in available_roles:
+        field_name = member_step.get_member_field_name(role.id)
+        for member_id in data[field_name]:
+            member_roles[member_id].append(role.id)
+    return member_roles
+
+
+def _get_member_names(member_step, available_roles):
+    """Maps the ids of the users (or groups) offered by a members step, those
+    of the domain of the project, to their names.
+    """
+    member_names = {}
+    for role in available_roles:
+        field = member_step.action.fields.get(
+            member_step.get_member_field_name(role.id))
+        if field is not None:
+            member_names.update(field.choices)
+    return member_names
+
+
+def _get_offered_roles(member_step, current, available_roles):
+    """Returns the roles on the project in current of the users (or groups)
+    offered by a members step.
+
+    Members of other domains can't be chosen in the step, their roles must
+    not be revoked for being missing from it.
+    """
+    member_names = _get_member_names(member_step, available_roles)
+    return dict((member_id, role_ids)
+                for member_id, role_ids in current.items()
+                if member_id in member_names)
+
+
+def _report_role_failures(request, message, member_step, failures,
+                          available_roles):
+    """Shows the error message about the failures returned by
+    :func:`openstack_dashboard.api.keystone.update_project_roles`.
+
+    The message is given the number of members (``count``) and the list of
+    their names and roles (``failures``), e.g. ``"jdoe (admin), jsmith
+    (Member)"``.
+    """
+    member_names = _get_member_names(member_step, available_roles)
+    role_names = dict((role.id, role.name) for role in available_roles)
+    failed = u', '.join(
+        u'%s (%s)' % (member_names.get(member_id, member_id),
+                      role_names.get(role_id, role_id))
+        for member_id, role_id, exc in failures)
+    messages.error(request, message % {
+        'count': len(set(failure[0] for failure in failures)),
+        'failures': failed})
+
+
 class ProjectQuotaAction(workflows.Action):
     ifcb_label = _("Injected File Content (Bytes)")
     metadata_items = forms.IntegerField(min_value=-1,
@@ -420,23 +480,16 @@ class CreateProject(workflows.Workflow):
         try:
             available_roles = api.keystone.role_list(request)
             member_step = self.get_step(PROJECT_USER_MEMBER_SLUG)
-            # count how many users are to be added
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                users_to_add += len(role_list)
-            # add new users to project
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                users_added = 0
-                for user in role_list:
-                    api.keystone.add_tenant_user_role(request,
-                                                      project=project_id,
-                                                      user=user,
-                                                      role=role.id)
-                    users_added += 1
-                users_to_add -= users_added
+            wanted = _get_member_roles(member_step, data, available_roles)
+            users_to_add = len(wanted)
+            failures = api.keystone.update_project_roles(
+                request, project_id, {}, wanted)
+            if failures:
+                _report_role_failures(
+                    request,
+                    _('Failed to add the roles of %(count)s '
+                      'project members: %(failures)s.'),
+                    member_step, failures, available_roles)
         except Exception:
             if PROJECT_GROUP_ENABLED:
                 group_msg = _(", add project groups")
@@ -456,24 +509,16 @@ class CreateProject(workflows.Workflow):
         try:
             available_roles = api.keystone.role_list(request)
             member_step = self.get_step(PROJECT_GROUP_MEMBER_SLUG)
-
-            # count how many groups are to be added
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                groups_to_add += len(role_list)
-            # add new groups to project
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                groups_added = 0
-                for group in role_list:
-                    api.keystone.add_group_role(request,
-                                                role=role.id,
-                                                group=group,
-                                                project=project_id)
-                    groups_added += 1
-                groups_to_add -= groups_added
+            wanted = _get_member_roles(member_step, data, available_roles)
+            groups_to_add = len(wanted)
+            failures = api.keystone.update_project_roles(
+                request, project_id, {}, wanted, group=True)
+            if failures:
+                _report_role_failures(
+                    request,
+                    _('Failed to add the roles of %(count)s '
+                      'project groups: %(failures)s.'),
+                    member_step, failures, available_roles)
         except Exception:
             exceptions.handle(request,
                               _('Failed to add %s project groups '
@@ -604,53 +649,17 @@ class UpdateProject(workflows.Workflow):
             exceptions.handle(request, ignore=True)
             return
 
-    def _add_roles_to_users(self, request, data, project_id, user,
-                            current_roles, available_roles):
-        member_step = self.get_step(PROJECT_USER_MEMBER_SLUG)
-        current_role_ids = [role.id for role in current_roles]
-
-        for role in available_roles:
-            field_name = member_step.get_member_field_name(role.id)
-            # Check if the user is in the list of users with this role.
-            if user.id in data[field_name]:
-                # Add it if necessary
-                if role.id not in current_role_ids:
-                    # user role has changed
-                    api.keystone.add_tenant_user_role(
-                        request,
-                        project=project_id,
-                        user=user.id,
-                        role=role.id)
-                else:
-                    # User role is unchanged, so remove it from the
-                    # remaining roles list to avoid removing it later.
-                    index = current_role_ids.index(role.id)
-                    current_role_ids.pop(index)
-
-        return current_role_ids
-
-    def _remove_roles_from_user(self, request, project_id, user,
-                                current_role_ids):
-        for id_to_delete in current_role_ids:
-            api.keystone.remove_tenant_user_role(
-                request,
-                project=project_id,
-                user=user.id,
-                role=id_to_delete)
-
-    def _is_removing_self_admin_role(self, request, project_id, user,
-                                     current_roles, current_role_ids):
-        is_current_user = user.id == request.user.id
+    def _is_removing_self_admin_role(self, request, project_id,
+                                     current_role_ids, wanted_role_ids):
         is_current_project = project_id == request.user.tenant_id
-        admin_roles = [role for role in current_roles
-                       if role.name.lower() == 'admin']
-        if len(admin_roles):
-            removing_admin = any([role.id in current_role_ids
-                                  for role in admin_roles])
-        else:
-            removing_admin = False
-
-        if is_current_user and is_current_project and removing_admin:
+        admin_role_ids = [role.id for role
+                          in self._get_available_roles(request)
+                          if role.name.lower() == 'admin']
+        removing_admin = any(role_id in current_role_ids and
+                             role_id not in wanted_role_ids
+                             for role_id in admin_role_ids)
+
+        if is_current_project and removing_admin:
             # Cannot remove "admin" role on current(admin) project
             msg = _('You cannot revoke your administrative privileges '
                     'from the project you are currently logged into. '
@@ -670,45 +679,33 @@ class UpdateProject(workflows.Workflow):
         try:
             # Get our role options
             available_roles = self._get_available_roles(request)
-            # Get the users currently associated with this project so we
-            # can diff against it.
-            project_members = api.keystone.user_list(request,
-                                                     project=project_id)
-            users_to_modify = len(project_members)
-
-            for user in project_members:
-                # Check if there have been any changes in the roles of
-                # Existing project members.
-                current_roles = api.keystone.roles_for_user(
-                    self.request, user.id, project_id)
-                current_role_ids = self._add_roles_to_users(
-                    request, data, project_id, user,
-                    current_roles, available_roles)
-                # Prevent admins from doing stupid things to themselves.
-                removing_admin = self._is_removing_self_admin_role(
-                    request, project_id, user, current_roles, current_role_ids)
-                # Otherwise go through and revoke any removed roles.
-                if not removing_admin:
-                    self._remove_roles_from_user(request, project_id, user,
-                                                 current_role_ids)
-                users_to_modify -= 1
-
-            # Grant new roles on the project.
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                # Count how many users may be added for exception handling.
-                users_to_modify += len(data[field_name])
-            for role in available_roles:
-                users_added = 0
-                field_name = member_step.get_member_field_name(role.id)
-                for user_id in data[field_name]:
-                    if not filter(lambda x: user_id == x.id, project_members):
-                        api.keystone.add_tenant_user_role(request,
-                                                          project=project_id,
-                                                          user=user_id,
-                                                          role=role.id)
-                    users_added += 1
-                users_to_modify -= users_added
+            # Get the roles of the users currently associated with this
+            # project so we can diff against it.
+            current = _get_offered_roles(
+                member_step,
+                api.keystone.get_project_users_roles(request, project_id),
+                available_roles)
+            wanted = _get_member_roles(member_step, data, available_roles)
+            users_to_modify = len(set(current) | set(wanted))
+
+            # Prevent admins from doing stupid things to themselves: they
+            # keep all their roles.
+            user_id = request.user.id
+            if self._is_removing_self_admin_role(
+                    request, project_id, current.get(user_id, []),
+                    wanted.get(user_id, [])):
+                wanted[user_id] = list(set(wanted.get(user_id, [])) |
+                                       set(current[user_id]))
+
+            failures = api.keystone.update_project_roles(
+                request, project_id, current, wanted)
+            if failures:
+                _report_role_failures(
+                    request,
+                    _('Failed to modify the roles of %(count)s '
+                      'project members: %(failures)s.'),
+                    member_step, failures, available_roles)
+                return False
             return True
         except Exception:
             if PROJECT_GROUP_ENABLED:
@@ -725,71 +722,29 @@ class UpdateProject(workflows.Workflow):
         finally:
             auth_utils.remove_project_cache(request.user.token.id)
 
-    def _update_project_groups(self, request, data, project_id, domain_id):
+    def _update_project_groups(self, request, data, project_id):
         # update project groups
         groups_to_modify = 0
         member_step = self.get_step(PROJECT_GROUP_MEMBER_SLUG)
         try:
             available_roles = self._get_available_roles(request)
-            # Get the groups currently associated with this project so we
-            # can diff against it.
-            project_groups = api.keystone.group_list(request,
-                                                     domain=domain_id,
-                                                     project=project_id)
-            groups_to_modify = len(project_groups)
-            for group in project_groups:
-                # Check if there have been any changes in the roles of
-                # Existing project members.
-                current_roles = api.keystone.roles_for_group(
-                    self.request,
-                    group=group.id,
-                    project=project_id)
-                current_role_ids = [role.id for role in current_roles]
-                for role in available_roles:
-                    # Check if the group is in the list of groups with
-                    # this role.
-                    field_name = member_step.get_member_field_name(role.id)
-                    if group.id in data[field_name]:
-                        # Add it if necessary
-                        if role.id not in current_role_ids:
-                            # group role has changed
-                            api.keystone.add_group_role(
-                                request,
-                                role=role.id,
-                                group=group.id,
-                                project=project_id)
-                        else:
-                            # Group role is unchanged, so remove it from
-                            # the remaining roles list to avoid removing it
-                            # later.
-                            index = current_role_ids.index(role.id)
-                            current_role_ids.pop(index)
-
-                # Revoke any removed roles.
-                for id_to_delete in current_role_ids:
-                    api.keystone.remove_group_role(request,
-                                                   role=id_to_delete,
-                                                   group=group.id,
-                                                   project=project_id)
-                groups_to_modify -= 1
-
-            # Grant new roles on the project.
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                # Count how many groups may be added for error handling.
-                groups_to_modify += len(data[field_name])
-            for role in available_roles:
-                groups_added = 0
-                field_name = member_step.get_member_field_name(role.id)
-                for group_id in data[field_name]:
-                    if not filter(lambda x: group_id == x.id,
-                                  project_groups):
-                        api.keystone.add_group_role(request,
-                                                    role=role.id,
-                                                    group=group_id,
-                                                    project=project_id)
-                    groups_added += 1
-                groups_to_modify -= groups_added
+            # Get the roles of the groups currently associated with this
+            # project so we can diff against it.
+            current = _get_offered_roles(
+                member_step,
+                api.keystone.get_project_groups_roles(request, project_id),
+                available_roles)
+            wanted = _get_member_roles(member_step, data, available_roles)
+            groups_to_modify = len(set(current) | set(wanted))
+            failures = api.keystone.update_project_roles(
+                request, project_id, current, wanted, group=True)
+            if failures:
+                _report_role_failures(
+                    request,
+                    _('Failed to modify the roles of %(count)s '
+                      'project groups: %(failures)s.'),
+                    member_step, failures, available_roles)
+                return False
             return True
         except Exception:
             exceptions.handle(request,
@@ -833,25 +788,18 @@ class UpdateProject(workflows.Workflow):
             return False
 
     def handle(self, request, data):
-        # FIXME(gabriel): This should be refactored to use Python's built-in
-        # sets and do this all in a single "roles to add" and "roles to remove"
-        # pass instead of the multi-pass thing happening now.
-
         project = self._update_project(request, data)
         if not project:
             return False
 
         project_id = data['project_id']
-        # Use the domain_id from the project if available
-        domain_id = getattr(project, "domain_id", '')
 
         ret = self._update_project_members(request, data, project_id)
         if not ret:
             return False
 
         if PROJECT_GROUP_ENABLED:
-            ret = self._update_project_groups(request, data,
-                                              project_id, domain_id)
+            ret = self._update_project_groups(request, data, project_id)
             if not ret:
                 return False
 
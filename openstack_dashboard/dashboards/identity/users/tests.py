@@ -56,7 +56,8 @@ class UsersViewTests(test.BaseAdminViewTests):
         domain_id = domain.id
         users = self._get_users(domain_id)
         api.keystone.user_list(IgnoreArg(),
-                               domain=domain_id).AndReturn(users)
+                               domain=domain_id,
+                               filters=None).AndReturn(users)
 
         self.mox.ReplayAll()
         res = self.client.get(USERS_INDEX_URL)
@@ -73,6 +74,27 @@ class UsersViewTests(test.BaseAdminViewTests):
                               domain_context_name=domain.name)
         self.test_index()
 
+    @test.create_stubs({api.keystone: ('user_list',)})
+    def test_index_paginated(self):
+        users = self.users.list()
+        by_name = sorted(users, key=lambda user: user.name.lower())
+        api.keystone.user_list(IgnoreArg(), domain=None, filters=None) \
+            .MultipleTimes().AndReturn(users)
+        self.mox.ReplayAll()
+
+        with self.settings(API_RESULT_PAGE_SIZE=2):
+            res = self.client.get(USERS_INDEX_URL)
+            table = res.context['table']
+            self.assertEqual(by_name[:2], table.data)
+            self.assertTrue(table.has_more_data())
+            self.assertFalse(table.has_prev_data())
+
+            res = self.client.get(USERS_INDEX_URL,
+                                  {'marker': by_name[1].id})
+            table = res.context['table']
+            self.assertEqual(by_name[2:4], table.data)
+            self.assertTrue(table.has_prev_data())
+
     @test.create_stubs({api.keystone: ('user_create',
                                        'get_default_domain',
                                        'tenant_list',
@@ -461,7 +483,8 @@ class UsersViewTests(test.BaseAdminViewTests):
         users = self._get_users(domain_id)
         user.enabled = False
 
-        api.keystone.user_list(IgnoreArg(), domain=domain_id).AndReturn(users)
+        api.keystone.user_list(IgnoreArg(), domain=domain_id,
+                               filters=None).AndReturn(users)
         api.keystone.user_update_enabled(IgnoreArg(),
                                          user.id,
                                          True).AndReturn(user)
@@ -482,7 +505,7 @@ class UsersViewTests(test.BaseAdminViewTests):
 
         self.assertTrue(user.enabled)
 
-        api.keystone.user_list(IgnoreArg(), domain=domain_id) \
+        api.keystone.user_list(IgnoreArg(), domain=domain_id, filters=None) \
             .AndReturn(users)
         api.keystone.user_update_enabled(IgnoreArg(),
                                          user.id,
@@ -503,7 +526,7 @@ class UsersViewTests(test.BaseAdminViewTests):
         users = self._get_users(domain_id)
         user.enabled = False
 
-        api.keystone.user_list(IgnoreArg(), domain=domain_id) \
+        api.keystone.user_list(IgnoreArg(), domain=domain_id, filters=None) \
             .AndReturn(users)
         api.keystone.user_update_enabled(IgnoreArg(), user.id, True) \
                     .AndRaise(self.exceptions.keystone)
@@ -520,7 +543,8 @@ class UsersViewTests(test.BaseAdminViewTests):
         domain_id = domain.id
         users = self._get_users(domain_id)
         for i in range(0, 2):
-            api.keystone.user_list(IgnoreArg(), domain=domain_id) \
+            api.keystone.user_list(IgnoreArg(), domain=domain_id,
+                                   filters=None) \
                 .AndReturn(users)
 
         self.mox.ReplayAll()
@@ -538,7 +562,8 @@ class UsersViewTests(test.BaseAdminViewTests):
         domain_id = domain.id
         users = self._get_users(domain_id)
         for i in range(0, 2):
-            api.keystone.user_list(IgnoreArg(), domain=domain_id) \
+            api.keystone.user_list(IgnoreArg(), domain=domain_id,
+                                   filters=None) \
                 .AndReturn(users)
 
         self.mox.ReplayAll()
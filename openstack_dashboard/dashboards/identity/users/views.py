@@ -38,9 +38,10 @@ from openstack_dashboard.dashboards.identity.users \
     import forms as project_forms
 from openstack_dashboard.dashboards.identity.users \
     import tables as project_tables
+from openstack_dashboard.dashboards.identity import views as identity_views
 
 
-class IndexView(tables.DataTableView):
+class IndexView(identity_views.PagedListMixin, tables.DataTableView):
     table_class = project_tables.UsersTable
     template_name = 'identity/users/index.html'
     page_title = _("Users")
@@ -52,7 +53,9 @@ class IndexView(tables.DataTableView):
                         self.request):
             try:
                 users = api.keystone.user_list(self.request,
-                                               domain=domain_context)
+                                               domain=domain_context,
+                                               filters=self.get_filters())
+                users = self.get_page(users)
             except Exception:
                 exceptions.handle(self.request,
                                   _('Unable to retrieve user list.'))
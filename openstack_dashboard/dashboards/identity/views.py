@@ -0,0 +1,49 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from openstack_dashboard import api
+
+
+class PagedListMixin(object):
+    """Pages and filters the table of a DataTableView listing users,
+    groups or projects.
+
+    The ``get_data`` of the view passes :meth:`get_filters` to the Identity
+    API and cuts the page to show from the list with :meth:`get_page`.
+    """
+    _prev = False
+    _more = False
+
+    def has_prev_data(self, table):
+        return self._prev
+
+    def has_more_data(self, table):
+        return self._more
+
+    def get_filters(self):
+        """Returns the filter of the table to pass to the API, or None."""
+        filter_field = self.table.get_filter_field()
+        filter_string = self.table.get_filter_string()
+        filter_action = self.table._meta._filter_action
+        if filter_field and filter_string and (
+                filter_action.is_api_filter(filter_field)):
+            return {filter_field: filter_string}
+        return None
+
+    def get_page(self, items):
+        """Returns the page of items asked for by the request."""
+        meta = self.table_class._meta
+        page, self._more, self._prev = api.keystone.get_page(
+            self.request, items,
+            marker=self.request.GET.get(meta.pagination_param),
+            prev_marker=self.request.GET.get(meta.prev_pagination_param))
+        return page
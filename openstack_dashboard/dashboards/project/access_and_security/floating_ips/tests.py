@@ -308,7 +308,8 @@ class FloatingIpNeutronViewTests(FloatingIpViewTests):
             .AndReturn(self.routers.list())
         api.neutron.subnet_list(IsA(http.HttpRequest)) \
             .AndReturn(self.subnets.list())
-        api.neutron.network_list(IsA(http.HttpRequest), shared=False) \
+        api.neutron.network_list(IsA(http.HttpRequest), shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list())
         api.network.floating_ip_supported(IsA(http.HttpRequest)) \
             .AndReturn(True)
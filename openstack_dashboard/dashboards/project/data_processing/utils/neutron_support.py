@@ -22,7 +22,8 @@ from openstack_dashboard.api import neutron
 def populate_neutron_management_network_choices(self, request, context):
     try:
         tenant_id = self.request.user.tenant_id
-        networks = neutron.network_list_for_tenant(request, tenant_id)
+        networks = neutron.network_list_for_tenant(request, tenant_id,
+                                                   expand_subnet=False)
         network_list = [(network.id, network.name_or_id)
                         for network in networks]
     except Exception:
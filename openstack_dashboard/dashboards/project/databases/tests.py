@@ -184,11 +184,13 @@ class DatabaseTests(test.TestCase):
 
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False).AndReturn(
+                                 shared=False,
+                                 expand_subnet=False).AndReturn(
                                      self.networks.list()[:1])
 
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True).AndReturn(
+                                 shared=True,
+                                 expand_subnet=False).AndReturn(
                                      self.networks.list()[1:])
 
         nics = [{"net-id": self.networks.first().id, "v4-fixed-ip": ''}]
@@ -240,11 +242,13 @@ class DatabaseTests(test.TestCase):
 
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False).AndReturn(
+                                 shared=False,
+                                 expand_subnet=False).AndReturn(
                                      self.networks.list()[:1])
 
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True).AndReturn(
+                                 shared=True,
+                                 expand_subnet=False).AndReturn(
                                      self.networks.list()[1:])
 
         nics = [{"net-id": self.networks.first().id, "v4-fixed-ip": ''}]
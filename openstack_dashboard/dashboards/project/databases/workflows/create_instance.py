@@ -151,7 +151,8 @@ class SetNetworkAction(workflows.Action):
     def populate_network_choices(self, request, context):
         try:
             tenant_id = self.request.user.tenant_id
-            networks = api.neutron.network_list_for_tenant(request, tenant_id)
+            networks = api.neutron.network_list_for_tenant(
+                request, tenant_id, expand_subnet=False)
             network_list = [(network.id, network.name_or_id)
                             for network in networks]
         except Exception:
@@ -309,6 +309,67 @@ class ImagesAndSnapshotsUtilsTests(test.TestCase):
             len(private_images),
             len(images_cache['images_by_project'][self.tenant.id]))
 
+    @test.create_stubs({api.glance: ('image_list_detailed',)})
+    def test_image_index(self):
+        public_images = [image for image in self.images.list()
+                         if image.status == 'active' and image.is_public]
+        private_images = [image for image in self.images.list()
+                          if (image.status == 'active' and
+                              not image.is_public)]
+        api.glance.image_list_detailed(
+            IsA(http.HttpRequest),
+            filters={'is_public': True, 'status': 'active'}) \
+            .AndReturn([public_images, False, False])
+        api.glance.image_list_detailed(
+            IsA(http.HttpRequest),
+            filters={'property-owner_id': self.tenant.id,
+                     'status': 'active'}) \
+            .AndReturn([private_images, False, False])
+
+        self.mox.ReplayAll()
+
+        index = utils.get_image_index(self.request, self.tenant.id)
+        # The index is shared by the whole request.
+        self.assertIs(index, utils.get_image_index(self.request,
+                                                   self.tenant.id))
+        image = private_images[0]
+        self.assertEqual(image, index.get(image.id))
+        self.assertIn(image, index.by_name[image.name])
+        self.assertEqual(
+            [i for i in index.images
+             if i.container_format not in ('aki', 'ari')],
+            index.launchable)
+        self.assertEqual(
+            [i for i in index.launchable
+             if i.properties.get('image_type', '') == 'snapshot'],
+            index.snapshots)
+
+        # Another request gets the lists from the cache.
+        request = self.factory.get('/')
+        request.user = self.request.user
+        other = utils.get_image_index(request, self.tenant.id)
+        self.assertEqual(list(index.by_id), list(other.by_id))
+
+    @test.create_stubs({api.glance: ('image_list_detailed',)})
+    def test_image_index_invalidated(self):
+        public_images = [image for image in self.images.list()
+                         if image.status == 'active' and image.is_public]
+        for i in range(2):
+            api.glance.image_list_detailed(
+                IsA(http.HttpRequest),
+                filters={'is_public': True, 'status': 'active'}) \
+                .AndReturn([public_images, False, False])
+
+        self.mox.ReplayAll()
+
+        utils.get_image_index(self.request)
+        api.glance._image_list_changed(self.request)
+        # The cached public images were dropped along with the change.
+        request = self.factory.get('/')
+        request.user = self.request.user
+        index = utils.get_image_index(request)
+        self.assertEqual(len(public_images), len(index.images))
+
 
 class SeleniumTests(test.SeleniumTestCase):
     @test.create_stubs({api.glance: ('image_list_detailed',)})
@@ -10,35 +10,109 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
+from glanceclient.v1 import images as glance_images
 
 from horizon import exceptions
 
 from openstack_dashboard.api import glance
 
 
-def get_available_images(request, project_id=None, images_cache=None):
-    """Returns a list of images that are public or owned by the given
-    project_id. If project_id is not specified, only public images
-    are returned.
+# Images in these formats are kernels and ramdisks, which can't be booted.
+NON_BOOTABLE_FORMATS = ('aki', 'ari')
+
+
+class ImageIndex(object):
+    """The images available to a project, indexed once.
+
+    Images are looked up by id or name, and the ones which can be launched
+    (and the snapshots among them) are sorted out up front, so that each
+    consumer doesn't scan the whole list again.
+    """
+
+    def __init__(self, images):
+        self.by_id = collections.OrderedDict()
+        for image in images:
+            self.by_id.setdefault(image.id, image)
+        self.images = list(self.by_id.values())
+        self.by_name = collections.defaultdict(list)
+        self.by_container_format = collections.defaultdict(list)
+        self.launchable = []
+        self.snapshots = []
+        for image in self.images:
+            self.by_name[image.name].append(image)
+            self.by_container_format[image.container_format].append(image)
+            if image.container_format not in NON_BOOTABLE_FORMATS:
+                self.launchable.append(image)
+                if image.properties.get("image_type", '') == "snapshot":
+                    self.snapshots.append(image)
+
+    def get(self, image_id):
+        return self.by_id.get(image_id)
+
+
+def _list_images(request, filters, *key_parts):
+    """Lists the images matching filters, or all the images visible to the
+    project when filters is None.
+
+    The list is shared with other requests for IMAGE_INDEX_TTL seconds.
+    """
+    ttl = getattr(settings, 'IMAGE_INDEX_TTL', 60)
+    key = glance.image_list_cache_key(request, *key_parts)
+    infos = cache.get(key) if ttl else None
+    if infos is not None:
+        manager = glance_images.ImageManager(None)
+        return [glance_images.Image(manager, info, loaded=True)
+                for info in infos]
+    if filters is None:
+        images, _more, _prev = glance.image_list_detailed(request)
+    else:
+        images, _more, _prev = glance.image_list_detailed(request,
+                                                          filters=filters)
+    if ttl:
+        cache.set(key, [image.to_dict() for image in images], ttl)
+    return images
+
+
+def _request_images_cache(request):
+    images_cache = getattr(request, '_images_cache', None)
+    if images_cache is None:
+        images_cache = request._images_cache = {}
+    return images_cache
+
+
+def get_image_index(request, project_id=None, images_cache=None):
+    """Returns the ImageIndex of the images that are public or owned by the
+    given project_id. If project_id is not specified, only public images
+    are indexed.
 
     :param images_cache: An optional dict-like object in which to
-     cache public and per-project id image metadata.
+     cache public and per-project id image metadata. By default, the
+     images are cached for the duration of the request.
 
     """
     if images_cache is None:
-        images_cache = {}
+        images_cache = _request_images_cache(request)
+    indexes = images_cache.setdefault('indexes', {})
+    if project_id in indexes:
+        return indexes[project_id]
+    complete = True
+
     public_images = images_cache.get('public_images', [])
     images_by_project = images_cache.get('images_by_project', {})
     if 'public_images' not in images_cache:
         public = {"is_public": True,
                   "status": "active"}
         try:
-            images, _more, _prev = glance.image_list_detailed(
-                request, filters=public)
-            [public_images.append(image) for image in images]
+            images = _list_images(request, public, 'public')
+            public_images.extend(images)
             images_cache['public_images'] = public_images
         except Exception:
+            complete = False
             exceptions.handle(request,
                               _("Unable to retrieve public images."))
 
@@ -50,11 +124,12 @@ def get_available_images(request, project_id=None, images_cache=None):
         owner = {"property-owner_id": project_id,
                  "status": "active"}
         try:
-            owned_images, _more, _prev = glance.image_list_detailed(
-                request, filters=owner)
+            owned_images = _list_images(request, owner, 'project',
+                                        project_id)
             images_by_project[project_id] = owned_images
         except Exception:
             owned_images = []
+            complete = False
             exceptions.handle(request,
                               _("Unable to retrieve images for "
                                 "the current project."))
@@ -64,14 +139,36 @@ def get_available_images(request, project_id=None, images_cache=None):
     if 'images_by_project' not in images_cache:
         images_cache['images_by_project'] = images_by_project
 
-    images = owned_images + public_images
-
-    # Remove duplicate images
-    image_ids = []
-    final_images = []
-    for image in images:
-        if image.id not in image_ids:
-            image_ids.append(image.id)
-            final_images.append(image)
-    return [image for image in final_images
-            if image.container_format not in ('aki', 'ari')]
+    index = ImageIndex(owned_images + public_images)
+    # Retry the lists which failed the next time.
+    if complete:
+        indexes[project_id] = index
+    return index
+
+
+def get_available_images(request, project_id=None, images_cache=None):
+    """Returns a list of images that are public or owned by the given
+    project_id. If project_id is not specified, only public images
+    are returned.
+
+    :param images_cache: An optional dict-like object in which to
+     cache public and per-project id image metadata.
+
+    """
+    return get_image_index(request, project_id, images_cache).launchable
+
+
+def get_image_map(request):
+    """Returns every image visible to the current project, by id.
+
+    Unlike get_image_index, this includes images shared with the project
+    and images which aren't active, so that the images of existing
+    instances can be named. It is built once per request.
+    """
+    images_cache = _request_images_cache(request)
+    if 'image_map' not in images_cache:
+        images = _list_images(request, None, 'visible',
+                              request.user.tenant_id)
+        images_cache['image_map'] = collections.OrderedDict(
+            (str(image.id), image) for image in images)
+    return images_cache['image_map']
@@ -11,8 +11,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
 import logging
 
+from django.core.cache import cache
 from django.utils.datastructures import SortedDict
 from django.utils.http import urlencode
 from django.utils.translation import ugettext_lazy as _
@@ -70,3 +72,70 @@ def get_console(request, console_type, instance):
         return (con_type, console_url)
 
     raise exceptions.NotAvailable(_('No available console found.'))
+
+
+# How long (in seconds) the console log fetched from Nova is reused, so that
+# users watching the log of the same instance share the calls.
+CONSOLE_LOG_CACHE_TIMEOUT = 5
+
+# The number of complete lines, before the offset of a log cursor, it
+# checks.
+CURSOR_LINES = 3
+
+
+def get_console_log(request, instance_id, tail_length=None):
+    """Returns the console log of the instance, briefly cached."""
+    key = 'openstack_dashboard:console_log:%s:%s:%s' % (
+        request.user.tenant_id, instance_id, tail_length or '')
+    data = cache.get(key)
+    if data is None:
+        data = api.nova.server_console_output(request, instance_id,
+                                              tail_length=tail_length)
+        cache.set(key, data, CONSOLE_LOG_CACHE_TIMEOUT)
+    return data
+
+
+def _hash_lines(lines):
+    text = u''.join(lines[-CURSOR_LINES:])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def _complete_lines(data):
+    """Splits data into its complete lines and the trailing partial line."""
+    lines = data.splitlines(True)
+    if lines and not lines[-1].endswith('\n'):
+        return lines[:-1], lines[-1]
+    return lines, ''
+
+
+def log_cursor(data):
+    """Returns a cursor identifying the end of the complete lines of data.
+
+    The cursor is the number of complete lines and a short hash of the
+    last few of them, which tells whether a later log still has those lines
+    at that offset.
+    """
+    lines = _complete_lines(data)[0]
+    return '%d.%s' % (len(lines), _hash_lines(lines))
+
+
+def log_since(data, cursor):
+    """Returns what was appended to the log since cursor.
+
+    The result is ``(text, append)``. When data has the lines the cursor
+    identifies at its offset, ``append`` is True and text starts right
+    after them; the client drops its own trailing partial line and appends
+    text. Otherwise ``append`` is False and text is the whole of data. This
+    is also the case once the oldest lines of a tail of the log scroll out
+    of it, since the offset of the cursor then moved by an unknown number
+    of lines.
+    """
+    lines, partial = _complete_lines(data)
+    try:
+        offset, digest = cursor.split('.', 1)
+        offset = int(offset)
+    except (AttributeError, ValueError):
+        return data, False
+    if 0 <= offset <= len(lines) and _hash_lines(lines[:offset]) == digest:
+        return ''.join(lines[offset:]) + partial, True
+    return data, False
@@ -46,14 +46,16 @@ class LogTab(tabs.Tab):
         instance = self.tab_group.kwargs['instance']
         log_length = utils.get_log_length(request)
         try:
-            data = api.nova.server_console_output(request,
-                                                  instance.id,
-                                                  tail_length=log_length)
+            data = console.get_console_log(request, instance.id,
+                                           tail_length=log_length)
+            cursor = console.log_cursor(data)
         except Exception:
             data = _('Unable to get log for instance "%s".') % instance.id
+            cursor = ''
             exceptions.handle(request, ignore=True)
         return {"instance": instance,
                 "console_log": data,
+                "console_log_cursor": cursor,
                 "log_length": log_length}
 
 
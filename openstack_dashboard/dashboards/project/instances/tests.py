@@ -1000,6 +1000,59 @@ class InstanceTests(helpers.TestCase):
 
             self.assertContains(res, "Unable to get log for")
 
+    @helpers.create_stubs({api.nova: ('server_console_output',)})
+    def test_instance_log_tail(self):
+        server = self.servers.first()
+        first = 'line 1\nline 2\nline 3\npartial'
+        second = 'line 2\nline 3\npartial line 4\nline 5\n'
+
+        api.nova.server_console_output(IsA(http.HttpRequest),
+                                       server.id, tail_length='4') \
+            .AndReturn(first)
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:project:instances:console_tail',
+                      args=[server.id])
+        res = self.client.get(url, {'length': '4'})
+        data = json.loads(res.content)
+        self.assertEqual({'text': first, 'append': False,
+                          'cursor': console.log_cursor(first)}, data)
+
+        # The log is cached briefly, so only the appended part is computed
+        # against the cached copy until it expires.
+        res = self.client.get(url, {'length': '4', 'cursor': data['cursor']})
+        self.assertEqual({'text': 'partial', 'append': True,
+                          'cursor': data['cursor']}, json.loads(res.content))
+
+        # Once the first line scrolled out of the tail, the whole tail is
+        # sent again.
+        self.assertEqual((second, False),
+                         console.log_since(second, data['cursor']))
+
+    def test_instance_log_since(self):
+        data = 'a\nb\na\nb\nc\n'
+        # Repeated lines don't make the cursor match too late.
+        self.assertEqual(('a\nb\nc\n', True),
+                         console.log_since(data, console.log_cursor('a\nb\n')))
+        self.assertEqual(('', True),
+                         console.log_since(data, console.log_cursor(data)))
+        self.assertEqual(('a\nb\na\nb\nc\n', True),
+                         console.log_since(data, console.log_cursor('a')))
+        # The log was replaced, e.g. the instance was rebuilt.
+        cursor = console.log_cursor('a\n')
+        self.assertEqual(('x\ny\n', False),
+                         console.log_since('x\ny\n', cursor))
+        self.assertEqual((data, False), console.log_since(data, '9.abc'))
+        self.assertEqual((data, False), console.log_since(data, 'x.y'))
+        self.assertEqual((data, False), console.log_since(data, ''))
+
+    def test_instance_log_tail_invalid_input(self):
+        server = self.servers.first()
+        url = reverse('horizon:project:instances:console_tail',
+                      args=[server.id])
+        res = self.client.get(url, {'length': '-5'})
+        self.assertEqual(400, res.status_code)
+
     def test_instance_vnc(self):
         server = self.servers.first()
         CONSOLE_OUTPUT = '/vncserver'
@@ -1394,14 +1447,17 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         if only_one_network:
             api.neutron.network_list(IsA(http.HttpRequest),
-                                     shared=True).AndReturn([])
+                                     shared=True,
+                                     expand_subnet=False).AndReturn([])
         else:
             api.neutron.network_list(IsA(http.HttpRequest),
-                                     shared=True) \
+                                     shared=True,
+                                     expand_subnet=False) \
                 .AndReturn(self.networks.list()[1:])
         if test_with_profile:
             policy_profiles = self.policy_profiles.list()
@@ -1607,14 +1663,17 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         if only_one_network:
             api.neutron.network_list(IsA(http.HttpRequest),
-                                     shared=True).AndReturn([])
+                                     shared=True,
+                                     expand_subnet=False).AndReturn([])
         else:
             api.neutron.network_list(IsA(http.HttpRequest),
-                                     shared=True) \
+                                     shared=True,
+                                     expand_subnet=False) \
                 .AndReturn(self.networks.list()[1:])
 
         if test_with_profile:
@@ -1716,10 +1775,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         if test_with_profile:
             policy_profiles = self.policy_profiles.list()
@@ -1864,10 +1925,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
 
         policy_profiles = self.policy_profiles.list()
@@ -2025,10 +2088,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
@@ -2161,10 +2226,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
@@ -2286,10 +2353,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
@@ -2386,10 +2455,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         api.nova.flavor_list(IsA(http.HttpRequest)) \
             .AndReturn(self.flavors.list())
@@ -2473,10 +2544,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         if test_with_profile:
             policy_profiles = self.policy_profiles.list()
@@ -2567,10 +2640,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         if test_with_profile:
             policy_profiles = self.policy_profiles.list()
@@ -2692,10 +2767,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         if test_with_profile:
             policy_profiles = self.policy_profiles.list()
@@ -2799,10 +2876,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         if test_with_profile:
             policy_profiles = self.policy_profiles.list()
@@ -2923,10 +3002,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         if test_with_profile:
             policy_profiles = self.policy_profiles.list()
@@ -3060,10 +3141,12 @@ class InstanceTests(helpers.TestCase):
         api.neutron.network_list(
             IsA(http.HttpRequest),
             tenant_id=self.tenant.id,
-            shared=False).AndReturn(self.networks.list()[:1])
+            shared=False,
+            expand_subnet=False).AndReturn(self.networks.list()[:1])
         api.neutron.network_list(
             IsA(http.HttpRequest),
-            shared=True).AndReturn(self.networks.list()[1:])
+            shared=True,
+            expand_subnet=False).AndReturn(self.networks.list()[1:])
         api.nova.extension_supported(
             'DiskConfig', IsA(http.HttpRequest)).AndReturn(True)
         api.nova.extension_supported(
@@ -3177,10 +3260,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         if test_with_profile:
             policy_profiles = self.policy_profiles.list()
@@ -3365,10 +3450,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         api.nova.extension_supported('DiskConfig',
                                      IsA(http.HttpRequest)) \
@@ -3497,10 +3584,12 @@ class InstanceTests(helpers.TestCase):
             .AndReturn([[], False, False])
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=self.tenant.id,
-                                 shared=False) \
+                                 shared=False,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[:1])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True) \
+                                 shared=True,
+                                 expand_subnet=False) \
             .AndReturn(self.networks.list()[1:])
         if test_with_profile:
             policy_profiles = self.policy_profiles.list()
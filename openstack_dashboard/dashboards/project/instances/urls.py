@@ -38,6 +38,7 @@ urlpatterns = patterns(
     url(INSTANCES % 'serial', views.SerialConsoleView.as_view(),
         name='serial'),
     url(INSTANCES % 'console', 'console', name='console'),
+    url(INSTANCES % 'console/tail', 'console_tail', name='console_tail'),
     url(INSTANCES % 'vnc', 'vnc', name='vnc'),
     url(INSTANCES % 'spice', 'spice', name='spice'),
     url(INSTANCES % 'rdp', 'rdp', name='rdp'),
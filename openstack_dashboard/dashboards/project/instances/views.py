@@ -19,12 +19,15 @@
 """
 Views for managing instances.
 """
+import json
+
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
 from django import http
 from django import shortcuts
 from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext_lazy as _
+from django.views.decorators import gzip
 from django.views import generic
 
 from horizon import exceptions
@@ -37,6 +40,8 @@ from horizon import workflows
 
 from openstack_dashboard import api
 
+from openstack_dashboard.dashboards.project.images \
+    import utils as image_utils
 from openstack_dashboard.dashboards.project.instances \
     import console as project_console
 from openstack_dashboard.dashboards.project.instances \
@@ -90,16 +95,13 @@ class IndexView(tables.DataTableView):
 
             try:
                 # TODO(gabriel): Handle pagination.
-                images, more, prev = api.glance.image_list_detailed(
-                    self.request)
+                image_map = image_utils.get_image_map(self.request)
             except Exception:
-                images = []
+                image_map = {}
                 exceptions.handle(self.request, ignore=True)
 
             full_flavors = SortedDict([(str(flavor.id), flavor)
                                        for flavor in flavors])
-            image_map = SortedDict([(str(image.id), image)
-                                    for image in images])
 
             # Loop through instances to get flavor info.
             for instance in instances:
@@ -144,6 +146,7 @@ class LaunchInstanceView(workflows.WorkflowView):
         return initial
 
 
+@gzip.gzip_page
 def console(request, instance_id):
     data = _('Unable to get log for instance "%s".') % instance_id
     tail = request.GET.get('length')
@@ -152,14 +155,44 @@ def console(request, instance_id):
         messages.warning(request, msg)
     else:
         try:
-            data = api.nova.server_console_output(request,
-                                                  instance_id,
-                                                  tail_length=tail)
+            data = project_console.get_console_log(request, instance_id,
+                                                   tail_length=tail)
         except Exception:
             exceptions.handle(request, ignore=True)
     return http.HttpResponse(data.encode('utf-8'), content_type='text/plain')
 
 
+@gzip.gzip_page
+def console_tail(request, instance_id):
+    """Returns the lines appended to the console log since a cursor.
+
+    The response is a JSON object with the ``text`` to show, whether the
+    client should ``append`` it to what it has (after dropping its trailing
+    partial line) or replace it, and the ``cursor`` to send next time.
+    """
+    tail = request.GET.get('length')
+    if tail and not tail.isdigit():
+        msg = _('Log length must be a nonnegative integer.')
+        return http.HttpResponseBadRequest(msg)
+    try:
+        data = project_console.get_console_log(request, instance_id,
+                                               tail_length=tail)
+    except Exception:
+        exceptions.handle(request, ignore=True)
+        body = {'text': _('Unable to get log for instance "%s".')
+                % instance_id,
+                'append': False,
+                'cursor': ''}
+    else:
+        text, append = project_console.log_since(data,
+                                                 request.GET.get('cursor'))
+        body = {'text': text,
+                'append': append,
+                'cursor': project_console.log_cursor(data)}
+    return http.HttpResponse(json.dumps(body),
+                             content_type='application/json')
+
+
 def vnc(request, instance_id):
     try:
         instance = api.nova.server_get(request, instance_id)
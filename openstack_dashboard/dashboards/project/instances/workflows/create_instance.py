@@ -186,17 +186,16 @@ class SetInstanceDetailsAction(workflows.Action):
 
     @memoized.memoized_method
     def _get_image(self, image_id):
-        try:
-            # We want to retrieve details for a given image,
-            # however get_available_images uses a cache of image list,
-            # so it is used instead of image_get to reduce the number
-            # of API calls.
-            images = image_utils.get_available_images(
-                self.request,
-                self.context.get('project_id'),
-                self._images_cache)
-            image = [x for x in images if x.id == image_id][0]
-        except IndexError:
+        # We want to retrieve details for a given image,
+        # however the image index uses a cache of image list,
+        # so it is used instead of image_get to reduce the number
+        # of API calls.
+        image = image_utils.get_image_index(
+            self.request,
+            self.context.get('project_id'),
+            self._images_cache).get(image_id)
+        if (image is not None and
+                image.container_format in image_utils.NON_BOOTABLE_FORMATS):
             image = None
         return image
 
@@ -441,12 +440,10 @@ class SetInstanceDetailsAction(workflows.Action):
         return choices
 
     def populate_instance_snapshot_id_choices(self, request, context):
-        images = image_utils.get_available_images(request,
-                                                  context.get('project_id'),
-                                                  self._images_cache)
-        choices = [(image.id, image.name)
-                   for image in images
-                   if image.properties.get("image_type", '') == "snapshot"]
+        index = image_utils.get_image_index(request,
+                                            context.get('project_id'),
+                                            self._images_cache)
+        choices = [(image.id, image.name) for image in index.snapshots]
         if choices:
             choices.sort(key=operator.itemgetter(1))
             choices.insert(0, ("", _("Select Instance Snapshot")))
@@ -732,7 +729,8 @@ class SetNetworkAction(workflows.Action):
         network_list = []
         try:
             tenant_id = self.request.user.tenant_id
-            networks = api.neutron.network_list_for_tenant(request, tenant_id)
+            networks = api.neutron.network_list_for_tenant(
+                request, tenant_id, expand_subnet=False)
             for n in networks:
                 network_list.append((n.id, n.name_or_id))
             sorted(network_list, key=lambda obj: obj[1])
@@ -76,7 +76,7 @@ class NetworkTopologyTests(test.TestCase):
 
         res = self.client.get(JSON_URL)
         self.assertEqual('text/json', res['Content-Type'])
-        data = json.loads(res.content)
+        data = json.loads(''.join(res.streaming_content))
 
         # servers
         # result_server_urls = [(server['id'], server['url'])
@@ -149,6 +149,47 @@ class NetworkTopologyTests(test.TestCase):
                  'fixed_ips': []})
         self.assertEqual(expect_port_urls, data['ports'])
 
+    @django.test.utils.override_settings(POLLING_SNAPSHOT_INTERVAL=0)
+    @test.create_stubs({api.nova: ('server_list',),
+                        api.neutron: ('network_list_for_tenant',
+                                      'network_list',
+                                      'router_list',
+                                      'port_list')})
+    def test_json_view_versions(self):
+        api.nova.server_list(IsA(http.HttpRequest)) \
+            .MultipleTimes().AndReturn([self.servers.list(), False])
+        api.neutron.network_list_for_tenant(IsA(http.HttpRequest),
+                                            self.tenant.id) \
+            .MultipleTimes().AndReturn(self.networks.list())
+        api.neutron.network_list(IsA(http.HttpRequest),
+                                 **{'router:external': True}) \
+            .MultipleTimes().AndReturn([])
+        api.neutron.router_list(IsA(http.HttpRequest),
+                                tenant_id=self.tenant.id) \
+            .MultipleTimes().AndReturn([])
+        ports = self.ports.list()
+        api.neutron.port_list(IsA(http.HttpRequest)).AndReturn(ports)
+        api.neutron.port_list(IsA(http.HttpRequest)) \
+            .MultipleTimes().AndReturn(ports[1:])
+        self.mox.ReplayAll()
+
+        res = self.client.get(JSON_URL)
+        data = json.loads(''.join(res.streaming_content))
+        self.assertEqual(len(ports), len(data['ports']))
+
+        # Only the changes since the version we have are returned.
+        res = self.client.get(JSON_URL, {'version': data['version']})
+        delta = json.loads(res.content)
+        self.assertTrue(delta['delta'])
+        self.assertNotEqual(data['version'], delta['version'])
+        self.assertEqual({'changed': [], 'removed': [ports[0].id]},
+                         delta['ports'])
+        self.assertEqual({'changed': [], 'removed': []}, delta['servers'])
+
+        res = self.client.get(JSON_URL, {'version': delta['version']})
+        self.assertEqual({'version': delta['version'], 'unchanged': True},
+                         json.loads(res.content))
+
 
 class NetworkTopologyCreateTests(test.TestCase):
 
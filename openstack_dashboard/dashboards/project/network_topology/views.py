@@ -16,20 +16,22 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import json
-
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
 from django.http import HttpResponse  # noqa
+from django.http import StreamingHttpResponse  # noqa
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import View  # noqa
+import six
 
 from horizon import exceptions
 from horizon import views
 
 from openstack_dashboard import api
 from openstack_dashboard.usage import quotas
+from openstack_dashboard.utils import serializers
+from openstack_dashboard.utils import snapshots
 
 from openstack_dashboard.dashboards.project.network_topology.instances \
     import tables as instances_tables
@@ -285,11 +287,45 @@ class JSONView(View):
                          'fixed_ips': []}
             ports.append(fake_port)
 
-    def get(self, request, *args, **kwargs):
+    def _get_topology(self, request):
         data = {'servers': self._get_servers(request),
                 'networks': self._get_networks(request),
                 'ports': self._get_ports(request),
                 'routers': self._get_routers(request)}
         self._prepare_gateway_ports(data['routers'], data['ports'])
-        json_string = json.dumps(data, ensure_ascii=False)
-        return HttpResponse(json_string, content_type='text/json')
+        return data
+
+    def get(self, request, *args, **kwargs):
+        """Returns the topology of the project.
+
+        The topology is shared by the users of the project polling it, see
+        :mod:`openstack_dashboard.utils.snapshots`. Given the version of the
+        topology the client has, the response is either ``unchanged`` or
+        only has the changes since then (``delta``); ``refresh=true`` gets
+        the current topology rather than a recent one.
+        """
+        snapshot = snapshots.get_snapshot(
+            'network_topology', request.user.tenant_id,
+            lambda: self._get_topology(request),
+            force=request.GET.get('refresh') == 'true')
+        since = request.GET.get('version')
+        if since:
+            if since == six.text_type(snapshot.version):
+                return self._response({'version': snapshot.version,
+                                       'unchanged': True})
+            previous = snapshots.get_version(
+                'network_topology', request.user.tenant_id, since)
+            if previous is not None:
+                data = snapshots.diff(previous, snapshot.data)
+                data.update(version=snapshot.version, delta=True)
+                return self._response(data)
+        data = dict(snapshot.data, version=snapshot.version)
+        # The topology of a large project is several MB of JSON; it is
+        # streamed rather than built as a whole.
+        return StreamingHttpResponse(
+            serializers.iterdumps(data, ensure_ascii=False),
+            content_type='text/json')
+
+    def _response(self, data):
+        return HttpResponse(serializers.dumps(data, ensure_ascii=False),
+                            content_type='text/json')
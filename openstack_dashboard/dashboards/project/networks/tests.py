@@ -107,10 +107,12 @@ class NetworkTests(test.TestCase):
         api.neutron.network_list(
             IsA(http.HttpRequest),
             tenant_id=self.tenant.id,
-            shared=False).AndReturn(self.networks.list())
+            shared=False,
+            expand_subnet=False).AndReturn(self.networks.list())
         api.neutron.network_list(
             IsA(http.HttpRequest),
-            shared=True).AndReturn([])
+            shared=True,
+            expand_subnet=False).AndReturn([])
         quotas.tenant_quota_usages(
             IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(quota_data)
@@ -120,7 +122,9 @@ class NetworkTests(test.TestCase):
         res = self.client.get(INDEX_URL)
         self.assertTemplateUsed(res, 'project/networks/index.html')
         networks = res.context['networks_table'].data
-        self.assertItemsEqual(networks, self.networks.list())
+        # The networks are copies, their subnets being expanded.
+        self.assertItemsEqual([n.id for n in networks],
+                              [n.id for n in self.networks.list()])
 
     @test.create_stubs({api.neutron: ('network_list',),
                         quotas: ('tenant_quota_usages',)})
@@ -131,7 +135,9 @@ class NetworkTests(test.TestCase):
         api.neutron.network_list(
             IsA(http.HttpRequest),
             tenant_id=self.tenant.id,
-            shared=False).MultipleTimes().AndRaise(self.exceptions.neutron)
+            shared=False,
+            expand_subnet=False) \
+            .MultipleTimes().AndRaise(self.exceptions.neutron)
         quotas.tenant_quota_usages(
             IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(quota_data)
@@ -758,10 +764,12 @@ class NetworkTests(test.TestCase):
             .AndReturn(network)
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=network.tenant_id,
-                                 shared=False)\
+                                 shared=False,
+                                 expand_subnet=False)\
             .AndReturn([network])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True)\
+                                 shared=True,
+                                 expand_subnet=False)\
             .AndReturn([])
         api.neutron.network_delete(IsA(http.HttpRequest), network.id)
 
@@ -785,9 +793,11 @@ class NetworkTests(test.TestCase):
             .AndReturn(network)
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=network.tenant_id,
-                                 shared=False)\
+                                 shared=False,
+                                 expand_subnet=False)\
             .AndReturn([network])
-        api.neutron.network_list(IsA(http.HttpRequest), shared=True)\
+        api.neutron.network_list(IsA(http.HttpRequest), shared=True,
+                                 expand_subnet=False)\
             .AndReturn([])
         api.neutron.subnet_delete(IsA(http.HttpRequest), subnet_id)
         api.neutron.network_delete(IsA(http.HttpRequest), network.id)
@@ -813,10 +823,12 @@ class NetworkTests(test.TestCase):
             .AndReturn(network)
         api.neutron.network_list(IsA(http.HttpRequest),
                                  tenant_id=network.tenant_id,
-                                 shared=False)\
+                                 shared=False,
+                                 expand_subnet=False)\
             .AndReturn([network])
         api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True)\
+                                 shared=True,
+                                 expand_subnet=False)\
             .AndReturn([])
         api.neutron.subnet_delete(IsA(http.HttpRequest), subnet_id)
         api.neutron.network_delete(IsA(http.HttpRequest), network.id)\
@@ -1805,10 +1817,12 @@ class NetworkViewTests(test.TestCase):
         api.neutron.network_list(
             IsA(http.HttpRequest),
             tenant_id=self.tenant.id,
-            shared=False).AndReturn(self.networks.list())
+            shared=False,
+            expand_subnet=False).AndReturn(self.networks.list())
         api.neutron.network_list(
             IsA(http.HttpRequest),
-            shared=True).AndReturn([])
+            shared=True,
+            expand_subnet=False).AndReturn([])
         quotas.tenant_quota_usages(
             IsA(http.HttpRequest)) \
             .MultipleTimes().AndReturn(quota_data)
@@ -1819,7 +1833,9 @@ class NetworkViewTests(test.TestCase):
         self.assertTemplateUsed(res, 'project/networks/index.html')
 
         networks = res.context['networks_table'].data
-        self.assertItemsEqual(networks, self.networks.list())
+        # The networks are copies, their subnets being expanded.
+        self.assertItemsEqual([n.id for n in networks],
+                              [n.id for n in self.networks.list()])
 
         self.assertContains(res, expected_string, html=True,
                             msg_prefix="The create button is not disabled")
@@ -160,7 +160,8 @@ class SetGatewayForm(forms.SelfHandlingForm):
     def populate_network_id_choices(self, request):
         search_opts = {'router:external': True}
         try:
-            networks = api.neutron.network_list(request, **search_opts)
+            networks = api.neutron.network_list(request, expand_subnet=False,
+                                                **search_opts)
         except Exception as e:
             msg = _('Failed to get network list %s') % e
             LOG.info(msg)
@@ -54,7 +54,7 @@ class RouterMixin(object):
                 ext_net.id += 'some extra garbage'
         api.neutron.network_list(
             IsA(http.HttpRequest),
-            **search_opts).AndReturn(ext_nets)
+            expand_subnet=False, **search_opts).AndReturn(ext_nets)
 
     def _mock_external_network_get(self, router):
         ext_net_id = router.external_gateway_info['network_id']
@@ -66,10 +66,12 @@ class RouterMixin(object):
         api.neutron.network_list(
             IsA(http.HttpRequest),
             shared=False,
-            tenant_id=tenant_id).AndReturn(self.networks.list())
+            tenant_id=tenant_id,
+            expand_subnet=False).AndReturn(self.networks.list())
         api.neutron.network_list(
             IsA(http.HttpRequest),
-            shared=True).AndReturn([])
+            shared=True,
+            expand_subnet=False).AndReturn([])
 
 
 class RouterTests(RouterMixin, test.TestCase):
@@ -615,7 +617,8 @@ class RouterActionTests(RouterMixin, test.TestCase):
             IsA(http.HttpRequest), router.id).AndReturn(router)
         search_opts = {'router:external': True}
         api.neutron.network_list(
-            IsA(http.HttpRequest), **search_opts).AndReturn([network])
+            IsA(http.HttpRequest), expand_subnet=False,
+            **search_opts).AndReturn([network])
         self.mox.ReplayAll()
 
         form_data = {'router_id': router.id,
@@ -643,7 +646,8 @@ class RouterActionTests(RouterMixin, test.TestCase):
             IsA(http.HttpRequest), router.id).AndReturn(router)
         search_opts = {'router:external': True}
         api.neutron.network_list(
-            IsA(http.HttpRequest), **search_opts).AndReturn([network])
+            IsA(http.HttpRequest), expand_subnet=False,
+            **search_opts).AndReturn([network])
         self.mox.ReplayAll()
 
         form_data = {'router_id': router.id,
@@ -679,10 +683,12 @@ class RouterRuleTests(RouterMixin, test.TestCase):
             api.neutron.network_list(
                 IsA(http.HttpRequest),
                 shared=False,
-                tenant_id=router['tenant_id']).AndReturn(self.networks.list())
+                tenant_id=router['tenant_id'],
+                expand_subnet=False).AndReturn(self.networks.list())
             api.neutron.network_list(
                 IsA(http.HttpRequest),
-                shared=True).AndReturn([])
+                shared=True,
+                expand_subnet=False).AndReturn([])
         res = self._get_detail(router)
 
         self.assertTemplateUsed(res, '%s/routers/detail.html' % self.DASHBOARD)
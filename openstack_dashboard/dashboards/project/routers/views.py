@@ -67,6 +67,7 @@ class IndexView(tables.DataTableView):
         try:
             search_opts = {'router:external': True}
             ext_nets = api.neutron.network_list(self.request,
+                                                expand_subnet=False,
                                                 **search_opts)
             ext_net_dict = SortedDict((n['id'], n.name_or_id)
                                       for n in ext_nets)
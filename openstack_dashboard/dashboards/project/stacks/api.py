@@ -10,34 +10,79 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import json
+from heatclient.v1 import resources as heat_resources
+from heatclient.v1 import stacks as heat_stacks
+import six
 
 from openstack_dashboard.api import heat
 
 from openstack_dashboard.dashboards.project.stacks import mappings
 from openstack_dashboard.dashboards.project.stacks import sro
+from openstack_dashboard.utils import serializers
+from openstack_dashboard.utils import snapshots
 
 
 class Stack(object):
     pass
 
 
-def d3_data(request, stack_id=''):
+def _get_state(request, stack_id):
+    """Returns the data of the stack and of its resources, or None as the
+    stack when it does not exist (anymore).
+    """
     try:
-        stack = heat.stack_get(request, stack_id)
+        stack = heat.stack_get(request, stack_id)._info
+        stack_name = stack['stack_name']
     except Exception:
+        stack = None
+        stack_name = request.session.get('stack_name', '')
+
+    try:
+        resources = [resource._info for resource
+                     in heat.resources_list(request, stack_name)]
+    except Exception:
+        resources = []
+    return {'stack': stack, 'resources': resources}
+
+
+def d3_data(request, stack_id='', since=None):
+    """Returns the JSON of the topology of the stack.
+
+    It has the stack's node, the nodes of its resources and the version of
+    the snapshot they come from. Given the version of a previous result as
+    since, only the nodes of the resources changed or added since then are
+    returned, with the names of those removed ("removed") and "delta" set;
+    when that version is no longer known, all nodes are returned.
+    """
+    # The users of the project watching the stack share the state fetched
+    # from Heat by the first of them.
+    scope = '%s:%s' % (request.user.tenant_id, stack_id)
+    snapshot = snapshots.get_snapshot(
+        'stack_topology', scope, lambda: _get_state(request, stack_id))
+    state = snapshot.data
+    previous = None
+    if since:
+        if since == six.text_type(snapshot.version):
+            previous = state
+        else:
+            previous = snapshots.get_version('stack_topology', scope, since)
+    if previous is not None:
+        previous = dict((info['resource_name'], info)
+                        for info in previous['resources'])
+    if state['stack'] is not None:
+        stack = heat_stacks.Stack(heat_stacks.StackManager(None),
+                                  state['stack'], loaded=True)
+    else:
         stack = Stack()
         stack.id = stack_id
         stack.stack_name = request.session.get('stack_name', '')
         stack.stack_status = 'DELETE_COMPLETE'
         stack.stack_status_reason = 'DELETE_COMPLETE'
+    resource_manager = heat_resources.ResourceManager(None)
+    resources = [heat_resources.Resource(resource_manager, info, loaded=True)
+                 for info in state['resources']]
 
-    try:
-        resources = heat.resources_list(request, stack.stack_name)
-    except Exception:
-        resources = []
-
-    d3_data = {"nodes": [], "stack": {}}
+    d3_data = {"nodes": [], "stack": {}, "version": snapshot.version}
     if stack:
         stack_image = mappings.get_resource_image(stack.stack_status, 'stack')
         stack_node = {
@@ -54,30 +99,37 @@ def d3_data(request, stack_id=''):
             'info_box': sro.stack_info(stack, stack_image)
         }
         d3_data['stack'] = stack_node
+    in_progress = bool(d3_data['stack'].get('in_progress'))
 
-    if resources:
-        for resource in resources:
-            resource_image = mappings.get_resource_image(
-                resource.resource_status,
-                resource.resource_type)
-            resource_status = mappings.get_resource_status(
-                resource.resource_status)
-            if resource_status in ('IN_PROGRESS', 'INIT'):
-                in_progress = True
-            else:
-                in_progress = False
-            resource_node = {
-                'name': resource.resource_name,
-                'status': resource.resource_status,
-                'image': resource_image,
-                'required_by': resource.required_by,
-                'image_size': 50,
-                'image_x': -25,
-                'image_y': -25,
-                'text_x': 35,
-                'text_y': ".35em",
-                'in_progress': in_progress,
-                'info_box': sro.resource_info(resource)
-            }
-            d3_data['nodes'].append(resource_node)
-    return json.dumps(d3_data)
+    if previous is not None:
+        d3_data['delta'] = True
+        d3_data['removed'] = sorted(
+            set(previous) - set(resource.resource_name
+                                for resource in resources))
+    for resource in resources:
+        resource_status = mappings.get_resource_status(
+            resource.resource_status)
+        resource_in_progress = resource_status in ('IN_PROGRESS', 'INIT')
+        in_progress = in_progress or resource_in_progress
+        if previous is not None and previous.get(
+                resource.resource_name) == resource._info:
+            continue
+        resource_image = mappings.get_resource_image(
+            resource.resource_status,
+            resource.resource_type)
+        resource_node = {
+            'name': resource.resource_name,
+            'status': resource.resource_status,
+            'image': resource_image,
+            'required_by': resource.required_by,
+            'image_size': 50,
+            'image_x': -25,
+            'image_y': -25,
+            'text_x': 35,
+            'text_y': ".35em",
+            'in_progress': resource_in_progress,
+            'info_box': sro.resource_info(resource)
+        }
+        d3_data['nodes'].append(resource_node)
+    d3_data['in_progress'] = in_progress
+    return serializers.dumps(d3_data)
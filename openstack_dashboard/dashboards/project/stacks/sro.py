@@ -10,12 +10,22 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import hashlib
+
+from django.core.cache import cache
 from django.template.defaultfilters import title  # noqa
 from django.template.loader import render_to_string
+from django.utils.encoding import force_bytes
+from django.utils import translation
+import six
 
 from horizon.utils import filters
 
 
+# How long (in seconds) the rendered info box of a resource is cached.
+RESOURCE_INFO_TIMEOUT = 3600
+
+
 def stack_info(stack, stack_image):
     stack.stack_status_desc = title(
         filters.replace_underscores(stack.stack_status))
@@ -30,7 +40,36 @@ def stack_info(stack, stack_image):
                             context)
 
 
+def _resource_info_key(resource):
+    # Everything the info box shows is part of the key, so it is shared by
+    # the requests for any of the resources of a stack in the same state.
+    values = (translation.get_language(),
+              resource.resource_name,
+              getattr(resource, 'physical_resource_id', None),
+              resource.resource_type,
+              resource.resource_status,
+              getattr(resource, 'resource_status_reason', None),
+              getattr(resource, 'updated_time', None))
+    digest = hashlib.sha1(force_bytes(u'\n'.join(
+        six.text_type(value) for value in values))).hexdigest()
+    return 'horizon:stacks:resource_info:%s' % digest
+
+
 def resource_info(resource):
+    """Returns the info box of the resource in the topology.
+
+    Info boxes are cached, as rendering one for each resource of a large
+    stack on every refresh of the topology takes a while.
+    """
+    key = _resource_info_key(resource)
+    info = cache.get(key)
+    if info is None:
+        info = _render_resource_info(resource)
+        cache.set(key, info, RESOURCE_INFO_TIMEOUT)
+    return info
+
+
+def _render_resource_info(resource):
     resource.resource_status_desc = title(
         filters.replace_underscores(resource.resource_status)
     )
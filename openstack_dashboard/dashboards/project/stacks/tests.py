@@ -21,6 +21,7 @@ from django import http
 from django.test.utils import override_settings  # noqa
 from django.utils import html
 
+from heatclient.v1 import resources
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
@@ -28,6 +29,7 @@ from openstack_dashboard.test import helpers as test
 
 from openstack_dashboard.dashboards.project.stacks import forms
 from openstack_dashboard.dashboards.project.stacks import mappings
+from openstack_dashboard.dashboards.project.stacks import sro
 from openstack_dashboard.dashboards.project.stacks import tables
 
 
@@ -707,6 +709,85 @@ class StackTests(test.TestCase):
     def test_resume_stack(self):
         self._test_stack_action('resume')
 
+    def _resources(self, **statuses):
+        return [resources.Resource(resources.ResourceManager(None), {
+            'resource_name': name,
+            'resource_type': 'OS::Nova::Server',
+            'resource_status': status,
+            'resource_status_reason': 'state changed',
+            'physical_resource_id': name,
+            'updated_time': '2015-01-01T00:00:00Z',
+            'required_by': []}) for name, status in sorted(statuses.items())]
+
+    @override_settings(POLLING_SNAPSHOT_INTERVAL=0)
+    @test.create_stubs({api.heat: ('stack_get', 'resources_list')})
+    def test_d3_data_delta(self):
+        stack = self.stacks.first()
+        url = reverse('horizon:project:stacks:d3_data', args=[stack.id])
+        api.heat.stack_get(IsA(http.HttpRequest), stack.id) \
+            .MultipleTimes().AndReturn(stack)
+        api.heat.resources_list(IsA(http.HttpRequest), stack.stack_name) \
+            .AndReturn(self._resources(a='CREATE_IN_PROGRESS',
+                                       b='CREATE_IN_PROGRESS',
+                                       c='CREATE_COMPLETE'))
+        api.heat.resources_list(IsA(http.HttpRequest), stack.stack_name) \
+            .AndReturn(self._resources(a='CREATE_COMPLETE',
+                                       b='CREATE_IN_PROGRESS'))
+        api.heat.resources_list(IsA(http.HttpRequest), stack.stack_name) \
+            .AndReturn(self._resources(a='CREATE_COMPLETE',
+                                       b='CREATE_IN_PROGRESS'))
+        self.mox.ReplayAll()
+
+        data = json.loads(self.client.get(url).content)
+        self.assertNotIn('delta', data)
+        self.assertEqual(['a', 'b', 'c'],
+                         [node['name'] for node in data['nodes']])
+        self.assertTrue(data['in_progress'])
+
+        # Only the changes since the version we got are returned.
+        delta = json.loads(self.client.get(
+            url, {'since': data['version']}).content)
+        self.assertTrue(delta['delta'])
+        self.assertEqual(['c'], delta['removed'])
+        self.assertEqual([('a', 'CREATE_COMPLETE')],
+                         [(node['name'], node['status'])
+                          for node in delta['nodes']])
+        self.assertIn('Create Complete', delta['nodes'][0]['info_box'])
+        self.assertTrue(delta['in_progress'])
+        self.assertEqual(stack.stack_name, delta['stack']['name'])
+
+        unchanged = json.loads(self.client.get(
+            url, {'since': delta['version']}).content)
+        self.assertEqual(delta['version'], unchanged['version'])
+        self.assertEqual([], unchanged['nodes'])
+        self.assertEqual([], unchanged['removed'])
+
+    @test.create_stubs({api.heat: ('stack_get', 'resources_list')})
+    def test_d3_data_shared(self):
+        stack = self.stacks.first()
+        url = reverse('horizon:project:stacks:d3_data', args=[stack.id])
+        api.heat.stack_get(IsA(http.HttpRequest), stack.id) \
+            .AndReturn(stack)
+        api.heat.resources_list(IsA(http.HttpRequest), stack.stack_name) \
+            .AndReturn(self._resources(a='CREATE_IN_PROGRESS'))
+        self.mox.ReplayAll()
+
+        # Heat is only asked once within the polling interval.
+        data = json.loads(self.client.get(url).content)
+        self.assertEqual(data, json.loads(self.client.get(url).content))
+        self.assertEqual(['a'], [node['name'] for node in data['nodes']])
+        self.assertEqual(stack.stack_name, data['stack']['name'])
+
+    def test_resource_info_cached(self):
+        resource = self._resources(a='CREATE_COMPLETE')[0]
+        info = sro.resource_info(resource)
+        self.assertIn('Create Complete', info)
+
+        self.mox.StubOutWithMock(sro, '_render_resource_info')
+        self.mox.ReplayAll()
+        self.assertEqual(info, sro.resource_info(
+            self._resources(a='CREATE_COMPLETE')[0]))
+
 
 class TemplateFormTests(test.TestCase):
 
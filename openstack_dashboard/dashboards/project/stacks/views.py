@@ -292,5 +292,6 @@ class ResourceView(tabs.TabView):
 
 class JSONView(django.views.generic.View):
     def get(self, request, stack_id=''):
-        return HttpResponse(project_api.d3_data(request, stack_id=stack_id),
-                            content_type="application/json")
+        return HttpResponse(project_api.d3_data(
+            request, stack_id=stack_id, since=request.GET.get('since')),
+            content_type="application/json")
@@ -29,10 +29,11 @@ from openstack_dashboard.dashboards.project.volumes.volumes \
 
 
 class VolumeTableMixIn(object):
-    def _get_volumes(self, search_opts=None):
+    def _get_volumes(self, search_opts=None, decorations=()):
         try:
             return api.cinder.volume_list(self.request,
-                                          search_opts=search_opts)
+                                          search_opts=search_opts,
+                                          decorations=decorations)
         except Exception:
             exceptions.handle(self.request,
                               _('Unable to retrieve volume list.'))
@@ -86,7 +87,8 @@ class VolumeTab(tabs.TableTab, VolumeTableMixIn):
     preload = False
 
     def get_volumes_data(self):
-        volumes = self._get_volumes()
+        # The transfers are needed by the "Cancel Transfer" row action.
+        volumes = self._get_volumes(decorations=('transfer',))
         instances = self._get_instances()
         volume_ids_with_snapshots = self._get_volumes_ids_with_snapshots()
         self._set_volume_attributes(
@@ -41,7 +41,8 @@ class VolumeAndSnapshotsTests(test.TestCase):
 
         api.cinder.volume_backup_supported(IsA(http.HttpRequest)).\
             MultipleTimes().AndReturn(backup_supported)
-        api.cinder.volume_list(IsA(http.HttpRequest), search_opts=None).\
+        api.cinder.volume_list(IsA(http.HttpRequest), search_opts=None,
+                               decorations=('transfer',)).\
             AndReturn(volumes)
         api.nova.server_list(IsA(http.HttpRequest), search_opts=None).\
             AndReturn([self.servers.list(), False])
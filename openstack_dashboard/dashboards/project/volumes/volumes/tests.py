@@ -816,12 +816,14 @@ class VolumeViewTests(test.TestCase):
 
         cinder.volume_backup_supported(IsA(http.HttpRequest)). \
             MultipleTimes().AndReturn(True)
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None).\
+        cinder.volume_list(IsA(http.HttpRequest), search_opts=None,
+                           decorations=('transfer',)).\
             AndReturn(volumes)
         cinder.volume_delete(IsA(http.HttpRequest), volume.id)
         api.nova.server_list(IsA(http.HttpRequest), search_opts=None).\
             AndReturn([self.servers.list(), False])
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None).\
+        cinder.volume_list(IsA(http.HttpRequest), search_opts=None,
+                           decorations=('transfer',)).\
             AndReturn(volumes)
         api.nova.server_list(IsA(http.HttpRequest), search_opts=None).\
             AndReturn([self.servers.list(), False])
@@ -1005,7 +1007,8 @@ class VolumeViewTests(test.TestCase):
 
         api.cinder.volume_backup_supported(IsA(http.HttpRequest)). \
             MultipleTimes().AndReturn(True)
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None)\
+        cinder.volume_list(IsA(http.HttpRequest), search_opts=None,
+                           decorations=('transfer',))\
             .AndReturn(volumes)
         api.nova.server_list(IsA(http.HttpRequest), search_opts=None)\
             .AndReturn([self.servers.list(), False])
@@ -1442,7 +1445,8 @@ class VolumeViewTests(test.TestCase):
 
         cinder.volume_backup_supported(IsA(http.HttpRequest))\
             .MultipleTimes('backup_supported').AndReturn(False)
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None)\
+        cinder.volume_list(IsA(http.HttpRequest), search_opts=None,
+                           decorations=('transfer',))\
             .AndReturn(self.volumes.list())
         api.nova.server_list(IsA(http.HttpRequest), search_opts=None)\
             .AndReturn([self.servers.list(), False])
@@ -1499,7 +1503,8 @@ class VolumeViewTests(test.TestCase):
 
         cinder.volume_backup_supported(IsA(http.HttpRequest))\
             .MultipleTimes().AndReturn(False)
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None)\
+        cinder.volume_list(IsA(http.HttpRequest), search_opts=None,
+                           decorations=('transfer',))\
             .AndReturn(self.volumes.list())
         api.nova.server_list(IsA(http.HttpRequest), search_opts=None)\
                 .AndReturn([self.servers.list(), False])
@@ -1558,7 +1563,8 @@ class VolumeViewTests(test.TestCase):
 
         cinder.volume_backup_supported(IsA(http.HttpRequest))\
             .MultipleTimes().AndReturn(False)
-        cinder.volume_list(IsA(http.HttpRequest), search_opts=None)\
+        cinder.volume_list(IsA(http.HttpRequest), search_opts=None,
+                           decorations=('transfer',))\
             .AndReturn(volumes)
         cinder.transfer_delete(IsA(http.HttpRequest), transfer.id)
         api.nova.server_list(IsA(http.HttpRequest), search_opts=None).\
@@ -15,11 +15,14 @@
 
 import logging
 import os.path
+import time
 
 from django.conf import settings
 from openstack_auth import utils as auth_utils
 from oslo_config import cfg
 
+from horizon.utils import profiler
+
 from openstack_dashboard.openstack.common import policy
 
 
@@ -96,7 +99,14 @@ def check(actions, request, target=None):
                       {'project_id': object.project_id}
     :returns: boolean if the user has permission or not for the actions.
     """
+    start = time.time()
+    result = _check(actions, request, target)
+    profiler.record_policy_check(actions, (time.time() - start) * 1000,
+                                 result)
+    return result
+
 
+def _check(actions, request, target=None):
     if target is None:
         target = {}
     user = auth_utils.get_user(request)
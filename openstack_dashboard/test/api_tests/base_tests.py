@@ -18,7 +18,10 @@
 
 from __future__ import absolute_import
 
+import threading
+
 from django.conf import settings
+from django import http
 
 from horizon import exceptions
 
@@ -84,6 +87,31 @@ class APIResourceWrapperTests(test.TestCase):
         self.assertIn('bar', resource_str)
         self.assertNotIn('baz', resource_str)
 
+    def test_instance_attribute_takes_precedence(self):
+        resource = APIResource.get_instance()
+        resource.foo = 'override'
+        self.assertEqual('override', resource.foo)
+        self.assertEqual('foo', resource._apiresource.foo)
+
+    def test_property_takes_precedence(self):
+        class PropertyResource(APIResource):
+            _attrs = ['foo', 'bar', 'baz', 'qux']
+
+            @property
+            def foo(self):
+                return 'property'
+
+            @property
+            def bar(self):
+                raise AttributeError('bar')
+
+        resource = PropertyResource(APIResource.get_instance()._apiresource)
+        self.assertEqual('property', resource.foo)
+        # A property raising AttributeError falls back to the resource.
+        self.assertEqual('bar', resource.bar)
+        with self.assertRaises(AttributeError):
+            resource.qux
+
 
 class APIDictWrapperTests(test.TestCase):
     # APIDict allows for both attribute access and dictionary style [element]
@@ -283,3 +311,108 @@ class QuotaSetTests(test.TestCase):
     def test_quotaset_add_with_wrong_type(self):
         quota_set = api_base.QuotaSet({'foo': 1, 'bar': 10})
         self.assertRaises(ValueError, quota_set.add, {'test': 7})
+
+
+class RequestCachedTests(test.TestCase):
+    def setUp(self):
+        super(RequestCachedTests, self).setUp()
+        self.calls = []
+
+        @api_base.request_cached
+        def resource_list(request, search_opts=None):
+            self.calls.append(search_opts)
+            return ['resource']
+
+        self.resource_list = resource_list
+        self.get_request = http.HttpRequest()
+        self.get_request.method = 'GET'
+
+    def test_identical_calls_are_shared(self):
+        first = self.resource_list(self.get_request,
+                                   search_opts={'a': [1, 2], 'b': 2})
+        second = self.resource_list(self.get_request,
+                                    search_opts={'b': 2, 'a': [1, 2]})
+        self.assertEqual(['resource'], first)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual({'hits': 1, 'misses': 1},
+                         api_base.get_request_cache_stats(self.get_request))
+
+    def test_dict_results_are_copied(self):
+        @api_base.request_cached
+        def limits_get(request):
+            self.calls.append(None)
+            return {'maxTotalCores': 20}
+
+        # Such as usage.base.ProjectUsage, adding the limits of other
+        # services to those of Nova.
+        first = limits_get(self.get_request)
+        first.update(maxTotalVolumes=10)
+        first['maxTotalCores'] = 40
+        second = limits_get(self.get_request)
+        second['maxTotalCores'] = 30
+        self.assertEqual({'maxTotalCores': 20}, limits_get(self.get_request))
+        self.assertEqual(1, len(self.calls))
+
+    def test_different_arguments_are_not_shared(self):
+        self.resource_list(self.get_request, search_opts={'a': 1})
+        self.resource_list(self.get_request, search_opts={'a': 2})
+        self.resource_list(self.get_request, search_opts=[('a', 1)])
+        self.assertEqual(3, len(self.calls))
+
+    def test_not_shared_across_requests(self):
+        other_request = http.HttpRequest()
+        other_request.method = 'GET'
+        self.resource_list(self.get_request)
+        self.resource_list(other_request)
+        self.assertEqual(2, len(self.calls))
+
+    def test_only_safe_methods_are_cached(self):
+        post_request = http.HttpRequest()
+        post_request.method = 'POST'
+        self.resource_list(post_request)
+        self.resource_list(post_request)
+        self.assertEqual(2, len(self.calls))
+
+    def test_invalidate(self):
+        self.resource_list(self.get_request)
+        api_base.invalidate_request_cache(self.get_request)
+        self.resource_list(self.get_request)
+        self.assertEqual(2, len(self.calls))
+
+    def test_failures_are_not_cached(self):
+        @api_base.request_cached
+        def failing_get(request):
+            self.calls.append(None)
+            raise exceptions.NotFound()
+
+        for i in range(2):
+            with self.assertRaises(exceptions.NotFound):
+                failing_get(self.get_request)
+        self.assertEqual(2, len(self.calls))
+
+    def test_concurrent_calls_wait_for_the_first(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        @api_base.request_cached
+        def slow_get(request):
+            self.calls.append(None)
+            started.set()
+            release.wait()
+            return 'resource'
+
+        results = []
+        first = threading.Thread(
+            target=lambda: results.append(slow_get(self.get_request)))
+        first.start()
+        started.wait()
+        second = threading.Thread(
+            target=lambda: results.append(slow_get(self.get_request)))
+        second.start()
+        release.set()
+        first.join()
+        second.join()
+        self.assertEqual(['resource', 'resource'], results)
+        self.assertEqual(1, len(self.calls))
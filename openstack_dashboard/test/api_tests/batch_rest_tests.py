@@ -0,0 +1,129 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+
+import mock
+import unittest2
+
+from django.test import client
+from django.test.utils import override_settings
+
+from openstack_dashboard.api.rest import batch
+from openstack_dashboard.api.rest import nova
+
+from rest_test_utils import mock_obj_to_dict   # noqa
+
+
+class BatchRestTestCase(unittest2.TestCase):
+    def assertStatusCode(self, response, expected_code):
+        if response.status_code == expected_code:
+            return
+        self.fail('status code %r != %r: %s' % (response.status_code,
+                                                expected_code,
+                                                response.content))
+
+    def _post(self, data):
+        request = client.RequestFactory().post(
+            '/api/batch/', json.dumps(data),
+            content_type='application/json',
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        request.user = mock.Mock(**{'is_authenticated.return_value': True})
+        response = batch.Batch.as_view()(request)
+        return request, response
+
+    def _responses(self, response):
+        self.assertStatusCode(response, 200)
+        return json.loads(response.content)['responses']
+
+    @mock.patch.object(nova.api, 'nova')
+    def test_batch(self, nc):
+        nc.keypair_list.return_value = [mock_obj_to_dict({'id': 'one'})]
+        nc.availability_zone_list.return_value = [
+            mock_obj_to_dict({'name': 'nova'})]
+        nc.tenant_absolute_limits.return_value = {'maxTotalCores': 10}
+        request, response = self._post({'requests': [
+            {'path': 'nova/keypairs/'},
+            {'method': 'GET', 'path': 'nova/availzones/',
+             'params': {'detailed': True}},
+            {'path': '/nova/limits/?reserved=true'},
+        ]})
+        responses = self._responses(response)
+        self.assertEqual([200, 200, 200],
+                         [item['status'] for item in responses])
+        self.assertEqual({'items': [{'id': 'one'}]}, responses[0]['data'])
+        self.assertEqual({'items': [{'name': 'nova'}]}, responses[1]['data'])
+        self.assertEqual({'maxTotalCores': 10}, responses[2]['data'])
+        self.assertIn('etag', responses[0])
+
+        # The calls are made for the same user, with their own parameters.
+        sub_request = nc.keypair_list.call_args[0][0]
+        self.assertIsNot(request, sub_request)
+        self.assertIs(request.user, sub_request.user)
+        self.assertEqual('GET', sub_request.method)
+        self.assertEqual('/api/nova/keypairs/', sub_request.path)
+        nc.availability_zone_list.assert_called_once_with(mock.ANY, True)
+        nc.tenant_absolute_limits.assert_called_once_with(mock.ANY, True)
+
+    @mock.patch.object(nova.api, 'nova')
+    def test_batch_etag(self, nc):
+        nc.keypair_list.return_value = [mock_obj_to_dict({'id': 'one'})]
+        request, response = self._post({'requests': [
+            {'path': 'nova/keypairs/'}]})
+        etag = self._responses(response)[0]['etag']
+
+        request, response = self._post({'requests': [
+            {'path': 'nova/keypairs/', 'etag': etag}]})
+        self.assertEqual([{'status': 304, 'etag': etag}],
+                         self._responses(response))
+
+    @mock.patch.object(nova.api, 'nova')
+    def test_batch_post(self, nc):
+        new = nc.keypair_create.return_value
+        new.to_dict.return_value = {'name': 'Ni!'}
+        new.name = 'Ni!'
+        request, response = self._post({'requests': [
+            {'method': 'POST', 'path': 'nova/keypairs/',
+             'data': {'name': 'Ni!'}}]})
+        self.assertEqual([{'status': 201, 'data': {'name': 'Ni!'},
+                           'location': '/api/nova/keypairs/Ni%21'}],
+                         self._responses(response))
+        nc.keypair_create.assert_called_once_with(mock.ANY, 'Ni!')
+
+    @mock.patch.object(nova.api, 'nova')
+    def test_batch_errors(self, nc):
+        nc.keypair_list.side_effect = Exception('b0rk')
+        request, response = self._post({'requests': [
+            {'path': 'nova/keypairs/'},
+            {'path': 'spam/'},
+            {'path': 'batch/'},
+            {'method': 'TRACE', 'path': 'nova/keypairs/'},
+            {'method': 'GET'},
+        ]})
+        self.assertEqual([
+            {'status': 500, 'data': 'b0rk'},
+            {'status': 404, 'data': 'no API at spam/'},
+            {'status': 400, 'data': 'batch requests cannot be nested'},
+            {'status': 405, 'data': 'method TRACE not allowed'},
+            {'status': 400, 'data': 'each request requires a path'},
+        ], self._responses(response))
+
+    def test_batch_invalid(self):
+        request, response = self._post({'requests': 'nova/keypairs/'})
+        self.assertStatusCode(response, 400)
+
+    @override_settings(REST_API_BATCH_MAX_REQUESTS=1)
+    def test_batch_too_many(self):
+        request, response = self._post({'requests': [
+            {'path': 'nova/keypairs/'}, {'path': 'nova/limits/'}]})
+        self.assertStatusCode(response, 400)
+        self.assertEqual('"at most 1 requests may be batched"',
+                         response.content)
@@ -14,6 +14,7 @@
 
 from django import http
 
+from keystoneclient import exceptions as keystone_exceptions
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
@@ -160,8 +161,8 @@ class CeilometerApiTests(test.APITestCase):
 
     # TODO(lsmola) Test resource aggregates.
 
-    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
-                                                         "get_tenant")})
+    @test.create_stubs({api.ceilometer.CeilometerUsage: (
+        "get_user", "get_tenant", "prefetch_users_and_tenants")})
     def test_global_data_get(self):
         class TempUsage(api.base.APIResourceWrapper):
             _attrs = ["id", "tenant", "user", "resource", "get_meter"]
@@ -181,6 +182,8 @@ class CeilometerApiTests(test.APITestCase):
         ceilometerclient.resources = self.mox.CreateMockAnything()
         # I am returning only 1 resource
         ceilometerclient.resources.list(q=IsA(list)).AndReturn(resources[:1])
+        api.ceilometer.CeilometerUsage\
+            .prefetch_users_and_tenants(resources[:1])
 
         ceilometerclient.statistics = self.mox.CreateMockAnything()
         # check that list is called twice for one resource and 2 meters
@@ -216,8 +219,8 @@ class CeilometerApiTests(test.APITestCase):
         # check that only one resource is returned
         self.assertEqual(1, len(data))
 
-    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
-                                                         "get_tenant")})
+    @test.create_stubs({api.ceilometer.CeilometerUsage: (
+        "get_user", "get_tenant", "prefetch_users_and_tenants")})
     def test_global_data_get_without_statistic_data(self):
         class TempUsage(api.base.APIResourceWrapper):
             _attrs = ["id", "tenant", "user", "resource", "fake_meter_1",
@@ -236,6 +239,8 @@ class CeilometerApiTests(test.APITestCase):
         ceilometerclient = self.stub_ceilometerclient()
         ceilometerclient.resources = self.mox.CreateMockAnything()
         ceilometerclient.resources.list(q=IsA(list)).AndReturn(resources)
+        api.ceilometer.CeilometerUsage\
+            .prefetch_users_and_tenants(resources)
 
         api.ceilometer.CeilometerUsage\
             .get_user(IsA(str)).MultipleTimes().AndReturn(user)
@@ -262,8 +267,8 @@ class CeilometerApiTests(test.APITestCase):
 
         self.assertEqual(len(resources), len(data))
 
-    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
-                                                         "get_tenant")})
+    @test.create_stubs({api.ceilometer.CeilometerUsage: (
+        "get_user", "get_tenant", "prefetch_users_and_tenants")})
     def test_global_data_get_all_statistic_data(self):
         class TempUsage(api.base.APIResourceWrapper):
             _attrs = ["id", "tenant", "user", "resource", "get_meter", ]
@@ -283,6 +288,8 @@ class CeilometerApiTests(test.APITestCase):
         ceilometerclient = self.stub_ceilometerclient()
         ceilometerclient.resources = self.mox.CreateMockAnything()
         ceilometerclient.resources.list(q=IsA(list)).AndReturn(resources)
+        api.ceilometer.CeilometerUsage\
+            .prefetch_users_and_tenants(resources)
 
         ceilometerclient.statistics = self.mox.CreateMockAnything()
         ceilometerclient.statistics.list(meter_name=IsA(str),
@@ -318,3 +325,59 @@ class CeilometerApiTests(test.APITestCase):
                          vars(statistic_obj))
 
         self.assertEqual(len(resources), len(data))
+
+    @test.create_stubs({api.keystone: ('user_get', 'tenant_get')})
+    def test_identity_resolver(self):
+        user = self.ceilometer_users.first()
+        api.keystone.user_get(self.request, user.id).AndReturn(user)
+        api.keystone.user_get(self.request, 'deleted') \
+            .AndRaise(keystone_exceptions.NotFound())
+        self.mox.ReplayAll()
+
+        resolver = api.ceilometer.IdentityResolver(self.request, 'user')
+        resolver.prefetch([user.id, 'deleted', None])
+        self.assertEqual(user.name, resolver.get(user.id).name)
+        self.assertIsNone(resolver.get('deleted'))
+
+        # Both the user and the deleted user are cached for other requests.
+        resolver = api.ceilometer.IdentityResolver(self.request, 'user')
+        self.assertEqual(user.name, resolver.get(user.id).name)
+        self.assertIsNone(resolver.get('deleted'))
+
+    @test.create_stubs({api.keystone: ('user_get',)})
+    def test_identity_resolver_scoped_to_user(self):
+        user = self.ceilometer_users.first()
+        api.keystone.user_get(self.request, user.id).AndReturn(user)
+        api.keystone.user_get(self.request, user.id).AndReturn(user)
+        self.mox.ReplayAll()
+
+        resolver = api.ceilometer.IdentityResolver(self.request, 'user')
+        self.assertEqual(user.name, resolver.get(user.id).name)
+
+        # The entry isn't shared with the requests of another project.
+        self.request.user.project_id = 'another-project'
+        resolver = api.ceilometer.IdentityResolver(self.request, 'user')
+        self.assertEqual(user.name, resolver.get(user.id).name)
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_identity_resolver_many_ids(self):
+        tenants = self.ceilometer_tenants.list()
+        ids = [tenant.id for tenant in tenants]
+        ids += ['deleted-%d' % i
+                for i in range(api.ceilometer.IDENTITY_LIST_THRESHOLD + 1)]
+        api.keystone.tenant_list(self.request).AndReturn([tenants, False])
+        api.keystone.tenant_list(self.request).AndReturn([tenants, False])
+        self.mox.ReplayAll()
+
+        resolver = api.ceilometer.IdentityResolver(self.request, 'project')
+        resolver.prefetch(ids)
+        for tenant in tenants:
+            self.assertEqual(tenant.name, resolver.get(tenant.id).name)
+        self.assertIsNone(resolver.get('deleted-0'))
+
+        # Ids absent from the listing aren't remembered for other requests.
+        resolver = api.ceilometer.IdentityResolver(self.request, 'project')
+        resolver.prefetch(ids)
+        for tenant in tenants:
+            self.assertEqual(tenant.name, resolver.get(tenant.id).name)
+        self.assertIsNone(resolver.get('deleted-0'))
@@ -37,8 +37,73 @@ class CinderApiTests(test.APITestCase):
             search_opts=search_opts,).AndReturn(volume_transfers)
         self.mox.ReplayAll()
 
-        # No assertions are necessary. Verification is handled by mox.
-        api.cinder.volume_list(self.request, search_opts=search_opts)
+        volumes[0]._apiresource.status = 'awaiting-transfer'
+        ret_val = api.cinder.volume_list(self.request,
+                                         search_opts=search_opts,
+                                         decorations=('transfer',))
+        self.assertEqual(volume_transfers[0].id, ret_val[0].transfer.id)
+        for volume in ret_val[1:]:
+            self.assertIsNone(volume.transfer)
+
+    def test_volume_list_without_transfers(self):
+        volumes = self.cinder_volumes.list()
+        cinderclient = self.stub_cinderclient()
+        cinderclient.volumes = self.mox.CreateMockAnything()
+        cinderclient.volumes.list(search_opts=None).AndReturn(volumes)
+        cinderclient.volumes.list(search_opts=None).AndReturn(volumes)
+        self.mox.ReplayAll()
+
+        # The transfers aren't listed when they aren't requested, nor when
+        # no volume is being transferred.
+        api.cinder.volume_list(self.request)
+        ret_val = api.cinder.volume_list(self.request,
+                                         decorations=('transfer',))
+        for volume in ret_val:
+            self.assertIsNone(volume.transfer)
+
+    def test_volume_list_unknown_decoration(self):
+        cinderclient = self.stub_cinderclient()
+        cinderclient.volumes = self.mox.CreateMockAnything()
+        cinderclient.volumes.list(search_opts=None).AndReturn([])
+        self.mox.ReplayAll()
+
+        self.assertRaises(ValueError, api.cinder.volume_list, self.request,
+                          decorations=('snapshots',))
+
+    @override_settings(API_RESULT_PAGE_SIZE=2)
+    def test_volume_list_paged(self):
+        volumes = self.cinder_volumes.list()[:3]
+        cinderclient = self.stub_cinderclient()
+        cinderclient.volumes = self.mox.CreateMockAnything()
+        cinderclient.volumes.list(search_opts=None, marker='1', limit=3,
+                                  sort_key='created_at', sort_dir='desc') \
+            .AndReturn(volumes)
+        self.mox.ReplayAll()
+
+        ret_val, has_more, has_prev = api.cinder.volume_list_paged(
+            self.request, marker='1', paginate=True)
+        self.assertEqual([v.id for v in volumes[:2]],
+                         [v.id for v in ret_val])
+        self.assertTrue(has_more)
+        self.assertTrue(has_prev)
+
+    @override_settings(API_RESULT_PAGE_SIZE=2)
+    def test_volume_list_paged_prev(self):
+        volumes = self.cinder_volumes.list()[:2]
+        cinderclient = self.stub_cinderclient()
+        cinderclient.volumes = self.mox.CreateMockAnything()
+        cinderclient.volumes.list(search_opts=None, marker='1', limit=3,
+                                  sort_key='created_at', sort_dir='asc') \
+            .AndReturn(volumes)
+        self.mox.ReplayAll()
+
+        ret_val, has_more, has_prev = api.cinder.volume_list_paged(
+            self.request, marker='1', paginate=True, sort_dir='asc')
+        # Walking back reaches the first page, in the usual order.
+        self.assertEqual([v.id for v in reversed(volumes)],
+                         [v.id for v in ret_val])
+        self.assertTrue(has_more)
+        self.assertFalse(has_prev)
 
     def test_volume_snapshot_list(self):
         search_opts = {'all_tenants': 1}
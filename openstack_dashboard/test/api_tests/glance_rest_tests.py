@@ -12,6 +12,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import json
+
 import mock
 
 from openstack_dashboard.api.rest import glance
@@ -36,6 +38,39 @@ class ImagesRestTestCase(test.APITestCase):
         self.assertStatusCode(response, 200)
         gc.image_get.assert_called_once_with(request, "1")
 
+    @mock.patch.object(glance.api, 'glance')
+    def test_image_upload_get(self, gc):
+        request = rest_test_utils.construct_request()
+        gc.image_upload_get.return_value = {
+            'id': 'job', 'status': 'running', 'progress': 50,
+            'bytes_done': 5, 'bytes_total': 10, 'error': None,
+            'cancel_requested': False, 'user_id': '1'}
+
+        response = glance.ImageUpload().get(request, '1')
+        self.assertStatusCode(response, 200)
+        self.assertEqual({'status': 'running', 'progress': 50,
+                          'bytes_done': 5, 'bytes_total': 10,
+                          'error': None, 'cancel_requested': False},
+                         json.loads(response.content))
+        gc.image_upload_get.assert_called_once_with(request, '1')
+
+        gc.image_upload_get.return_value = None
+        response = glance.ImageUpload().get(request, '1')
+        self.assertStatusCode(response, 404)
+
+    @mock.patch.object(glance.api, 'glance')
+    def test_image_upload_cancel(self, gc):
+        request = rest_test_utils.construct_request()
+        gc.image_upload_cancel.return_value = True
+
+        response = glance.ImageUpload().delete(request, '1')
+        self.assertStatusCode(response, 204)
+        gc.image_upload_cancel.assert_called_once_with(request, '1')
+
+        gc.image_upload_cancel.return_value = False
+        response = glance.ImageUpload().delete(request, '1')
+        self.assertStatusCode(response, 409)
+
     @mock.patch.object(glance.api, 'glance')
     def test_image_get_list_detailed(self, gc):
         kwargs = {
@@ -19,6 +19,8 @@
 from django.conf import settings
 from django.test.utils import override_settings
 
+from horizon.utils import jobs
+
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
 
@@ -247,3 +249,26 @@ class GlanceApiTests(test.APITestCase):
         self.mox.ReplayAll()
         image = api.glance.image_get(self.request, 'empty')
         self.assertIsNone(image.name)
+
+    def test_image_create_copy_from(self):
+        image = self.images.first()
+        glanceclient = self.stub_glanceclient()
+        glanceclient.images = self.mox.CreateMockAnything()
+        glanceclient.images.create(name='test').AndReturn(image)
+        glanceclient.images.update(image.id, copy_from='http://example.com',
+                                   purge_props=False)
+        self.mox.ReplayAll()
+
+        created = api.glance.image_create(self.request, name='test',
+                                          copy_from='http://example.com')
+        jobs._pool.join()
+        self.assertEqual(image, created)
+        upload = jobs.get_job_for_resource(image.id)
+        self.assertEqual(jobs.SUCCEEDED, upload['status'])
+
+        # The upload is only reported to the project which started it.
+        self.assertEqual(upload, api.glance.image_upload_get(self.request,
+                                                             image.id))
+        self.request.user.tenant_id = 'other'
+        self.assertIsNone(api.glance.image_upload_get(self.request,
+                                                      image.id))
@@ -18,7 +18,13 @@
 
 from __future__ import absolute_import
 
+import copy
+
+from django import http
+from django.test.utils import override_settings
 from keystoneclient.v2_0 import client as keystone_client
+import mock
+from mox import IsA  # noqa
 
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
@@ -82,6 +88,138 @@ class RoleAPITests(test.APITestCase):
         # (it would show up in mox as an unexpected method call)
         role = api.keystone.get_default_role(self.request)
 
+    @test.create_stubs({api.keystone: ('add_tenant_user_role',
+                                       'remove_tenant_user_role')})
+    def test_update_project_roles(self):
+        tenant = self.tenants.first()
+        current = {'1': ['1', '2'], '2': ['1'], '3': ['2']}
+        wanted = {'1': ['1', '2'], '2': ['2'], '4': ['1']}
+
+        # Only the differences are applied, by user then role.
+        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
+                                             project=tenant.id,
+                                             user='2', role='1')
+        api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
+                                          project=tenant.id,
+                                          user='2', role='2') \
+            .AndRaise(self.exceptions.keystone)
+        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
+                                             project=tenant.id,
+                                             user='3', role='2')
+        api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
+                                          project=tenant.id,
+                                          user='4', role='1')
+        self.mox.ReplayAll()
+
+        failures = api.keystone.update_project_roles(self.request, tenant.id,
+                                                     current, wanted)
+        self.assertEqual([('2', '2', self.exceptions.keystone)], failures)
+
+    @override_settings(OPENSTACK_KEYSTONE_ROLE_UPDATE_WORKERS=4)
+    def test_update_project_roles_concurrently(self):
+        tenant = self.tenants.first()
+        current = {'1': ['1'], '2': ['1'], '3': ['1']}
+        wanted = {'1': ['2'], '2': ['2'], '3': ['2']}
+
+        def add_role(request, project, user, role):
+            if user == '2':
+                raise self.exceptions.keystone
+
+        with mock.patch.object(api.keystone, 'add_tenant_user_role',
+                               side_effect=add_role) as add, \
+                mock.patch.object(api.keystone,
+                                  'remove_tenant_user_role') as remove:
+            failures = api.keystone.update_project_roles(
+                self.request, tenant.id, current, wanted)
+
+        # The roles are changed in any order, the failures all reported.
+        add.assert_has_calls([mock.call(self.request, project=tenant.id,
+                                        user=user_id, role='2')
+                              for user_id in ('1', '2', '3')],
+                             any_order=True)
+        remove.assert_has_calls([mock.call(self.request, project=tenant.id,
+                                           user=user_id, role='1')
+                                 for user_id in ('1', '2', '3')],
+                                any_order=True)
+        self.assertEqual([('2', '2', self.exceptions.keystone)], failures)
+
+    @override_settings(OPENSTACK_KEYSTONE_ROLE_UPDATE_WORKERS=4)
+    def test_get_project_users_roles_v2_error(self):
+        tenant = self.tenants.first()
+        users = self.users.list()[:3]
+
+        def roles_for_user(request, user_id, project):
+            if user_id == users[1].id:
+                raise self.exceptions.keystone
+            return [self.role]
+
+        # The API v2 lists the roles of each user in a thread; a user left
+        # out would lose the roles removed from it.
+        with mock.patch.object(api.keystone.VERSIONS, '_active', 2), \
+                mock.patch.object(api.keystone, 'user_list',
+                                  return_value=users), \
+                mock.patch.object(api.keystone, 'roles_for_user',
+                                  side_effect=roles_for_user):
+            self.assertRaises(type(self.exceptions.keystone),
+                              api.keystone.get_project_users_roles,
+                              self.request, tenant.id)
+
+
+class ProjectAPITests(test.APITestCase):
+    def test_tenant_list_shared_within_request(self):
+        tenants = self.tenants.list()
+        keystoneclient = self.stub_keystoneclient()
+        if api.keystone.VERSIONS.active < 3:
+            keystoneclient.tenants = self.mox.CreateMockAnything()
+            keystoneclient.tenants.list(None, None).AndReturn(tenants)
+        else:
+            keystoneclient.projects = self.mox.CreateMockAnything()
+            keystoneclient.projects.list(domain=None, user=None) \
+                .AndReturn(tenants)
+        self.mox.ReplayAll()
+
+        # The second call is answered without reaching Keystone.
+        self.request.method = 'GET'
+        first = api.keystone.tenant_list(self.request)
+        second = api.keystone.tenant_list(self.request)
+        self.assertEqual((tenants, False), first)
+        self.assertEqual(first, second)
+
+
+class UserAPITests(test.APITestCase):
+    def test_user_list_filters(self):
+        users = self.users.list()
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.users = self.mox.CreateMockAnything()
+        if api.keystone.VERSIONS.active < 3:
+            keystoneclient.users.list(tenant_id=None).AndReturn(users)
+        else:
+            keystoneclient.users.list(project=None, domain=None, group=None,
+                                      name=users[1].name) \
+                .AndReturn(users[1:2])
+        self.mox.ReplayAll()
+
+        self.assertEqual([users[1]], api.keystone.user_list(
+            self.request, filters={'name': users[1].name}))
+
+    def test_get_page(self):
+        users = self.users.list()
+        by_name = sorted(users, key=lambda user: user.name.lower())
+        with self.settings(API_RESULT_PAGE_SIZE=2):
+            page, more, prev = api.keystone.get_page(self.request, users)
+            self.assertEqual(by_name[:2], page)
+            self.assertEqual((True, False), (more, prev))
+
+            page, more, prev = api.keystone.get_page(
+                self.request, users, marker=by_name[1].id)
+            self.assertEqual(by_name[2:4], page)
+            self.assertEqual((len(users) > 4, True), (more, prev))
+
+            page, more, prev = api.keystone.get_page(
+                self.request, users, prev_marker=by_name[2].id)
+            self.assertEqual(by_name[:2], page)
+            self.assertEqual((True, False), (more, prev))
+
 
 class ServiceAPITests(test.APITestCase):
     def test_service_wrapper(self):
@@ -113,3 +251,113 @@ class ServiceAPITests(test.APITestCase):
         self.assertEqual("http://public.nova2.example.com:8774/v2",
                          service.public_url)
         self.assertEqual("int.nova2.example.com", service.host)
+
+
+@override_settings(PROJECT_DIRECTORY_TTL=300)
+class ProjectDirectoryTests(test.TestCase):
+    def _new_request(self, user=None):
+        request = http.HttpRequest()
+        request.user = user or self.request.user
+        return request
+
+    def _resource(self, tenant_id):
+        resource = FakeConnection()
+        resource.tenant_id = tenant_id
+        return resource
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_join_shared_between_requests(self):
+        tenants = self.tenants.list()
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([tenants, False])
+        self.mox.ReplayAll()
+
+        resources = [self._resource(t.id) for t in tenants]
+        resources.append(self._resource(None))
+        api.keystone.project_directory(self.request).join(resources)
+        self.assertEqual([t.name for t in tenants] + [None],
+                         [r.tenant_name for r in resources])
+
+        # Another request uses the cached project list.
+        projects = api.keystone.project_directory(self._new_request())
+        self.assertEqual(tenants[0].name, projects.name(tenants[0].id))
+        self.assertEqual([tenants[1].id],
+                         projects.ids_for_name(tenants[1].name))
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_not_shared_between_users(self):
+        tenants = self.tenants.list()
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([tenants, False])
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([tenants[:1], False])
+        self.mox.ReplayAll()
+
+        projects = api.keystone.project_directory(self.request)
+        self.assertEqual(tenants[1].name, projects.name(tenants[1].id))
+
+        # The list of another user, or of another scope of the same user,
+        # is fetched for them.
+        other_user = copy.copy(self.user)
+        other_user.id = 'other'
+        projects = api.keystone.project_directory(
+            self._new_request(other_user))
+        self.assertEqual(tenants[0].name, projects.name(tenants[0].id))
+        self.assertIsNone(projects.get(tenants[1].id))
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_missing_project_refreshes_once(self):
+        tenants = self.tenants.list()
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([tenants[:1], False])
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([tenants[:2], False])
+        self.mox.ReplayAll()
+
+        projects = api.keystone.project_directory(self.request)
+        self.assertEqual(tenants[0].name, projects.name(tenants[0].id))
+
+        # The cached list doesn't know the new project, so it is fetched
+        # again, only once, and the deleted project is remembered.
+        projects = api.keystone.project_directory(self._new_request())
+        self.assertEqual(tenants[1].name, projects.name(tenants[1].id))
+        self.assertIsNone(projects.get('deleted'))
+        projects.save()
+        projects = api.keystone.project_directory(self._new_request())
+        self.assertIsNone(projects.get('deleted'))
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_project_update_makes_list_stale(self):
+        tenants = self.tenants.list()
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([tenants, False])
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([tenants, False])
+        self.mox.ReplayAll()
+
+        projects = api.keystone.project_directory(self.request)
+        self.assertEqual(tenants[0].name, projects.name(tenants[0].id))
+
+        # The list cached before the update isn't used any more.
+        with mock.patch.object(api.keystone, 'keystoneclient'):
+            api.keystone.tenant_update(self._new_request(), tenants[0].id,
+                                       name='renamed')
+        projects = api.keystone.project_directory(self._new_request())
+        self.assertEqual(tenants[0].name, projects.name(tenants[0].id))
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_load_failure(self):
+        tenants = self.tenants.list()
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndRaise(self.exceptions.keystone)
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([tenants, False])
+        self.mox.ReplayAll()
+
+        projects = api.keystone.project_directory(self.request)
+        self.assertRaises(self.exceptions.keystone.__class__, projects.load)
+        self.assertIsNone(projects.get(tenants[0].id))
+
+        # Nothing was cached, the next request tries again.
+        projects = api.keystone.project_directory(self._new_request())
+        self.assertEqual(tenants[0].name, projects.name(tenants[0].id))
@@ -288,8 +288,6 @@ class NetworkApiNeutronTests(NetworkApiNeutronTestBase):
                 .AndReturn({'ports': self.api_ports.list()})
         self.qclient.list_networks(id=set(server_network_ids)) \
             .AndReturn({'networks': server_networks})
-        self.qclient.list_subnets() \
-            .AndReturn({'subnets': self.api_subnets.list()})
         self.mox.ReplayAll()
 
         api.network.servers_update_addresses(self.request, servers)
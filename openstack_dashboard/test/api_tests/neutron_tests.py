@@ -17,6 +17,7 @@ import uuid
 from django.test.utils import override_settings
 
 from neutronclient.common import exceptions as neutron_exc
+import six
 
 from openstack_dashboard import api
 from openstack_dashboard import policy
@@ -27,15 +28,86 @@ class NeutronApiTests(test.APITestCase):
     def test_network_list(self):
         networks = {'networks': self.api_networks.list()}
         subnets = {'subnets': self.api_subnets.list()}
+        subnet_ids = sorted(set(sid for n in self.api_networks.list()
+                                for sid in n['subnets']))
 
         neutronclient = self.stub_neutronclient()
         neutronclient.list_networks().AndReturn(networks)
-        neutronclient.list_subnets().AndReturn(subnets)
+        neutronclient.list_subnets(id=subnet_ids).AndReturn(subnets)
         self.mox.ReplayAll()
 
         ret_val = api.neutron.network_list(self.request)
         for n in ret_val:
             self.assertIsInstance(n, api.neutron.Network)
+            for subnet in n.subnets:
+                self.assertIsInstance(subnet, api.neutron.Subnet)
+
+    def test_network_list_without_subnets(self):
+        networks = {'networks': self.api_networks.list()}
+        subnet_ids = [sid for n in self.api_networks.list()
+                      for sid in n['subnets']]
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_networks().AndReturn(networks)
+        self.mox.ReplayAll()
+
+        ret_val = api.neutron.network_list(self.request, expand_subnet=False)
+        self.assertEqual(subnet_ids,
+                         [sid for n in ret_val for sid in n.subnets])
+
+    def test_network_list_for_tenant(self):
+        tenant_id = self.request.user.tenant_id
+        owned = [n for n in self.api_networks.list() if not n['shared']]
+        shared = [n for n in self.api_networks.list() if n['shared']]
+        subnet_ids = sorted(set(sid for n in self.api_networks.list()
+                                for sid in n['subnets']))
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_networks(tenant_id=tenant_id, shared=False) \
+            .AndReturn({'networks': owned})
+        neutronclient.list_networks(shared=True) \
+            .AndReturn({'networks': shared})
+        # The subnets of both sets of networks are retrieved in one call.
+        neutronclient.list_subnets(id=subnet_ids) \
+            .AndReturn({'subnets': self.api_subnets.list()})
+        self.mox.ReplayAll()
+
+        ret_val = api.neutron.network_list_for_tenant(self.request, tenant_id)
+        self.assertEqual(len(self.api_networks.list()), len(ret_val))
+        for n in ret_val:
+            for subnet in n.subnets:
+                self.assertIsInstance(subnet, api.neutron.Subnet)
+
+    def test_network_list_for_tenant_expanded_then_not(self):
+        tenant_id = self.request.user.tenant_id
+        owned = [n for n in self.api_networks.list() if not n['shared']]
+        shared = [n for n in self.api_networks.list() if n['shared']]
+        subnet_ids = sorted(set(sid for n in self.api_networks.list()
+                                for sid in n['subnets']))
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_networks(tenant_id=tenant_id, shared=False) \
+            .AndReturn({'networks': owned})
+        neutronclient.list_networks(shared=True) \
+            .AndReturn({'networks': shared})
+        neutronclient.list_subnets(id=subnet_ids) \
+            .AndReturn({'subnets': self.api_subnets.list()})
+        self.mox.ReplayAll()
+
+        # Both calls share the networks listed, through the request cache.
+        self.request.method = 'GET'
+        expanded = api.neutron.network_list_for_tenant(self.request,
+                                                       tenant_id)
+        ret_val = api.neutron.network_list_for_tenant(self.request, tenant_id,
+                                                      expand_subnet=False)
+        self.assertEqual(len(expanded), len(ret_val))
+        for n in expanded:
+            for subnet in n.subnets:
+                self.assertIsInstance(subnet, api.neutron.Subnet)
+        # The subnets are left as ids by the second call.
+        for n in ret_val:
+            for subnet in n.subnets:
+                self.assertIsInstance(subnet, six.string_types)
 
     def test_network_get(self):
         network = {'network': self.api_networks.first()}
@@ -278,6 +350,26 @@ class NeutronApiTests(test.APITestCase):
         api.neutron.router_remove_interface(
             self.request, router_id, port_id=fake_port)
 
+    def test_dhcp_agent_network_counts(self):
+        agents = self.api_agents.list()
+        network_ids = [n['id'] for n in self.api_networks.list()]
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_agents(agent_type='DHCP agent') \
+            .AndReturn({'agents': agents})
+        neutronclient.list_networks_on_dhcp_agent(agents[0]['id'],
+                                                  fields='id') \
+            .AndReturn({'networks': [{'id': nid} for nid in network_ids]})
+        neutronclient.list_networks_on_dhcp_agent(agents[1]['id'],
+                                                  fields='id') \
+            .AndReturn({'networks': [{'id': network_ids[0]}]})
+        self.mox.ReplayAll()
+
+        counts = api.neutron.dhcp_agent_network_counts(self.request)
+        self.assertEqual(2, counts[network_ids[0]])
+        for network_id in network_ids[1:]:
+            self.assertEqual(1, counts[network_id])
+
     def test_is_extension_supported(self):
         neutronclient = self.stub_neutronclient()
         neutronclient.list_extensions().MultipleTimes() \
@@ -19,12 +19,15 @@
 
 from __future__ import absolute_import
 
+import datetime
+
 from django.conf import settings
 from django import http
 from django.test.utils import override_settings
 
 from mox import IsA  # noqa
 from novaclient.v1_1 import servers
+from novaclient.v1_1 import usage as nova_usage
 import six
 
 from openstack_dashboard import api
@@ -74,6 +77,24 @@ class ComputeApiTests(test.APITestCase):
         ret_val = api.nova.server_reboot(self.request, server.id, HARDNESS)
         self.assertIsNone(ret_val)
 
+    def test_snapshot_create_changes_image_list(self):
+        server = self.servers.first()
+        snapshot = self.snapshots.first()
+
+        novaclient = self.stub_novaclient()
+        novaclient.servers = self.mox.CreateMockAnything()
+        novaclient.servers.create_image(server.id, snapshot.name) \
+            .AndReturn(snapshot.id)
+        self.mox.ReplayAll()
+
+        # The cached image lists don't outlive the new snapshot.
+        key = api.glance.image_list_cache_key(self.request, 'images')
+        ret_val = api.nova.snapshot_create(self.request, server.id,
+                                           snapshot.name)
+        self.assertEqual(snapshot.id, ret_val)
+        self.assertNotEqual(
+            key, api.glance.image_list_cache_key(self.request, 'images'))
+
     def test_server_vnc_console(self):
         server = self.servers.first()
         console = self.servers.vnc_console_data
@@ -200,6 +221,72 @@ class ComputeApiTests(test.APITestCase):
         for usage in ret_val:
             self.assertIsInstance(usage, api.nova.NovaUsage)
 
+    def test_usage_windows(self):
+        start = datetime.datetime(2012, 1, 15)
+        end = datetime.datetime(2012, 3, 10, 23, 59, 59)
+        closed, tail = api.nova._usage_windows(start, end)
+        self.assertEqual([(start, datetime.datetime(2012, 2, 1)),
+                          (datetime.datetime(2012, 2, 1),
+                           datetime.datetime(2012, 3, 1)),
+                          (datetime.datetime(2012, 3, 1), end)], closed)
+        self.assertIsNone(tail)
+
+    def _usage(self, hours, **server):
+        server.update({'instance_id': '1', 'hours': hours, 'vcpus': 1,
+                       'local_gb': 1, 'memory_mb': 512})
+        server.setdefault('ended_at', None)
+        return nova_usage.Usage(nova_usage.UsageManager(None), {
+            'tenant_id': self.tenant.id, 'total_hours': hours,
+            'total_vcpus_usage': hours, 'total_local_gb_usage': hours,
+            'total_memory_mb_usage': 512 * hours,
+            'server_usages': [server]})
+
+    def test_usage_get_caches_closed_windows(self):
+        today = datetime.datetime.utcnow().replace(hour=0, minute=0,
+                                                   second=0, microsecond=0)
+        start = today - datetime.timedelta(days=1)
+        end = today.replace(hour=23, minute=59, second=59)
+        novaclient = self.stub_novaclient()
+        novaclient.usage = self.mox.CreateMockAnything()
+        novaclient.usage.get(self.tenant.id, start, today) \
+            .AndReturn(self._usage(24, state='active'))
+        novaclient.usage.get(self.tenant.id, today, end) \
+            .AndReturn(self._usage(2, state='active'))
+        novaclient.usage.get(self.tenant.id, today, end) \
+            .AndReturn(self._usage(3, state='stopped',
+                                   ended_at='2015-01-01 03:00:00'))
+        self.mox.ReplayAll()
+
+        usage = api.nova.usage_get(self.request, self.tenant.id, start, end)
+        self.assertIsInstance(usage, api.nova.NovaUsage)
+        self.assertEqual(26, usage.vcpu_hours)
+        self.assertEqual(1, usage.total_active_instances)
+        self.assertEqual(1, len(usage.server_usages))
+        self.assertEqual(26, usage.server_usages[0]['hours'])
+
+        usage = api.nova.usage_get(self.request, self.tenant.id, start, end)
+        self.assertEqual(27, usage.vcpu_hours)
+        self.assertEqual(0, usage.total_active_instances)
+        self.assertEqual('stopped', usage.server_usages[0]['state'])
+
+    def test_usage_list_merges_windows(self):
+        today = datetime.datetime.utcnow().replace(hour=0, minute=0,
+                                                   second=0, microsecond=0)
+        start = today - datetime.timedelta(days=1)
+        end = today.replace(hour=23, minute=59, second=59)
+        novaclient = self.stub_novaclient()
+        novaclient.usage = self.mox.CreateMockAnything()
+        novaclient.usage.list(start, today, True) \
+            .AndReturn([self._usage(24)])
+        novaclient.usage.list(today, end, True).AndReturn([self._usage(2)])
+        self.mox.ReplayAll()
+
+        usages = api.nova.usage_list(self.request, start, end)
+        self.assertEqual(1, len(usages))
+        self.assertEqual(self.tenant.id, usages[0].tenant_id)
+        self.assertEqual(26, usages[0].vcpu_hours)
+        self.assertEqual(1, usages[0].vcpus)
+
     def test_server_get(self):
         server = self.servers.first()
 
@@ -11,11 +11,18 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import gzip
+import json
+import StringIO
+
 import mock
 import unittest2
 
 from openstack_dashboard.api.rest import utils
 
+# The ETag of '"ok"'.
+OK_ETAG = '"72054d9a6fbdcc7df012e19f32345b65"'
+
 
 class RestUtilsTestCase(unittest2.TestCase):
     def assertStatusCode(self, response, expected_code):
@@ -145,3 +152,141 @@ class RestUtilsTestCase(unittest2.TestCase):
         self.assertStatusCode(response, 201)
         self.assertEqual(response['location'], '/api/spam/spam123')
         self.assertEqual(response.content, '"spam!"')
+
+    def test_api_get_etag(self):
+        @utils.ajax()
+        def f(self, request):
+            return 'ok'
+        request = self._construct_request(method='GET', META={})
+        response = f(None, request)
+        self.assertStatusCode(response, 200)
+        self.assertEqual(response['etag'], OK_ETAG)
+
+    def test_api_get_if_none_match(self):
+        @utils.ajax()
+        def f(self, request):
+            return 'ok'
+        request = self._construct_request(method='GET', META={
+            'HTTP_IF_NONE_MATCH': OK_ETAG
+        })
+        response = f(None, request)
+        self.assertStatusCode(response, 304)
+        self.assertEqual(response['etag'], OK_ETAG)
+        self.assertEqual(response.content, '')
+
+    def test_api_get_if_none_match_changed(self):
+        @utils.ajax()
+        def f(self, request):
+            return 'ok'
+        request = self._construct_request(method='GET', META={
+            'HTTP_IF_NONE_MATCH': '"spam"'
+        })
+        response = f(None, request)
+        self.assertStatusCode(response, 200)
+        self.assertEqual(response.content, '"ok"')
+
+    def test_api_post_no_etag(self):
+        @utils.ajax()
+        def f(self, request):
+            return 'ok'
+        request = self._construct_request(method='POST', META={})
+        response = f(None, request)
+        self.assertStatusCode(response, 200)
+        self.assertFalse(response.has_header('etag'))
+
+    def test_api_get_cache_control(self):
+        @utils.ajax()
+        def f(self, request):
+            return 'ok'
+        request = self._construct_request(method='GET', META={})
+        response = f(None, request)
+        self.assertEqual(set(response['cache-control'].split(', ')),
+                         {'private', 'no-cache'})
+
+        @utils.ajax(cache_policy=utils.CachePolicy('test', max_age=30))
+        def f(self, request):
+            return 'ok'
+        response = f(None, request)
+        self.assertEqual(set(response['cache-control'].split(', ')),
+                         {'private', 'max-age=30'})
+
+    def _cached_request(self, user_id='user', project_id='project',
+                        method='GET'):
+        return self._construct_request(**{
+            'method': method,
+            'META': {},
+            'get_full_path.return_value': '/api/spam/',
+            'user.id': user_id,
+            'user.project_id': project_id,
+        })
+
+    def test_api_cache_policy(self):
+        policy = utils.CachePolicy('test.%s' % id(self), timeout=60)
+        calls = []
+
+        @utils.ajax(cache_policy=policy)
+        def f(self, request):
+            calls.append(request)
+            return {'spam': len(calls)}
+
+        response = f(None, self._cached_request())
+        self.assertEqual(response.content, '{"spam": 1}')
+        response = f(None, self._cached_request())
+        self.assertStatusCode(response, 200)
+        self.assertEqual(response.content, '{"spam": 1}')
+        self.assertEqual(len(calls), 1)
+
+        # The cache is per user and project.
+        response = f(None, self._cached_request(project_id='other'))
+        self.assertEqual(response.content, '{"spam": 2}')
+        response = f(None, self._cached_request(user_id='other'))
+        self.assertEqual(response.content, '{"spam": 3}')
+
+        # Other successful methods sharing the policy drop its results.
+        f(None, self._cached_request(method='POST'))
+        response = f(None, self._cached_request())
+        self.assertEqual(response.content, '{"spam": 5}')
+
+    def test_api_cache_policy_errors(self):
+        policy = utils.CachePolicy('test.%s' % id(self), timeout=60)
+        calls = []
+
+        @utils.ajax(cache_policy=policy)
+        def f(self, request):
+            calls.append(request)
+            raise utils.AjaxError(404, 'b0rk')
+
+        f(None, self._cached_request())
+        response = f(None, self._cached_request())
+        self.assertStatusCode(response, 404)
+        self.assertEqual(len(calls), 2)
+
+    def test_api_gzip(self):
+        @utils.ajax()
+        def f(self, request):
+            return ['spam'] * 500
+        request = self._construct_request(method='GET', META={
+            'HTTP_ACCEPT_ENCODING': 'gzip, deflate'
+        })
+        response = f(None, request)
+        self.assertStatusCode(response, 200)
+        self.assertEqual(response['content-encoding'], 'gzip')
+        self.assertEqual(response['vary'], 'Accept-Encoding')
+        self.assertTrue(response['etag'].startswith('W/"'))
+        self.assertEqual(json.loads(gzip.GzipFile(
+            fileobj=StringIO.StringIO(response.content)).read()),
+            ['spam'] * 500)
+
+        # The ETag still matches when sent back.
+        request.META['HTTP_IF_NONE_MATCH'] = response['etag']
+        response = f(None, request)
+        self.assertStatusCode(response, 304)
+
+    def test_api_gzip_not_accepted(self):
+        @utils.ajax()
+        def f(self, request):
+            return ['spam'] * 500
+        request = self._construct_request(method='GET', META={})
+        response = f(None, request)
+        self.assertFalse(response.has_header('content-encoding'))
+        self.assertEqual(json.loads(response.content), ['spam'] * 500)
@@ -25,6 +25,7 @@ from ceilometerclient.v2 import client as ceilometer_client
 from cinderclient import client as cinder_client
 from django.conf import settings
 from django.contrib.messages.storage import default_storage  # noqa
+from django.core import cache
 from django.core.handlers import wsgi
 from django.core import urlresolvers
 from django.test.client import RequestFactory  # noqa
@@ -162,6 +163,9 @@ class TestCase(horizon_helpers.TestCase):
         self.patchers = {}
         self.add_panel_mocks()
 
+        # Don't let data cached across requests leak between tests.
+        cache.cache.clear()
+
         super(TestCase, self).setUp()
 
     def _setup_test_data(self):
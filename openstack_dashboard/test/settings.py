@@ -90,6 +90,12 @@ OPENSTACK_KEYSTONE_DEFAULT_ROLE = "_member_"
 
 OPENSTACK_KEYSTONE_MULTIDOMAIN_SUPPORT = True
 OPENSTACK_KEYSTONE_DEFAULT_DOMAIN = 'test_domain'
+# The mox expectations of the role changes are recorded in order.
+OPENSTACK_KEYSTONE_ROLE_UPDATE_WORKERS = 1
+
+# Each request fetches the project names its mox expectations record. The
+# admin view tests turn the cache back on.
+PROJECT_DIRECTORY_TTL = 0
 
 OPENSTACK_KEYSTONE_BACKEND = {
     'name': 'native',
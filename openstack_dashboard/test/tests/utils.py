@@ -13,10 +13,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+import json
 import uuid
 
+from django.utils import timezone
+import mock
+import six
+
+from openstack_dashboard.api import base as api_base
 from openstack_dashboard.test import helpers as test
 from openstack_dashboard.utils import filters
+from openstack_dashboard.utils import metering
+from openstack_dashboard.utils import serializers
+from openstack_dashboard.utils import snapshots
 
 
 class UtilsFilterTests(test.TestCase):
@@ -38,3 +48,181 @@ class UtilsFilterTests(test.TestCase):
     def test_reject_random_string(self):
         val = '55WbJTpJDf'
         self.assertRaises(ValueError, filters.get_int_or_uuid, val)
+
+
+class UtilsMeteringTests(test.TestCase):
+    def _series(self, unit, *values):
+        return [{'unit': unit, 'name': 'test', 'meter': 'test',
+                 'data': [{'x': '2015-01-01T00:00:00', 'y': value}
+                          for value in values]}]
+
+    def test_normalize_series_by_unit(self):
+        series = metering.normalize_series_by_unit(
+            self._series('B', 512.0, 3 * 1024 * 1024.0))
+        self.assertEqual('MB', series[0]['unit'])
+        self.assertEqual([0.0, 3], [d['y'] for d in series[0]['data']])
+
+    def test_normalize_series_by_unit_unchanged(self):
+        series = metering.normalize_series_by_unit(
+            self._series('B', 1.0, 512.0))
+        self.assertEqual('B', series[0]['unit'])
+        self.assertEqual([1.0, 512.0], [d['y'] for d in series[0]['data']])
+
+    def test_normalize_series_by_unit_without_points(self):
+        series = self._series('B')
+        self.assertEqual(series, metering.normalize_series_by_unit(series))
+
+    def test_series_cache_timeout(self):
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        # The last N days end now, even though date_to is in the past by
+        # the time the series are cached.
+        self.assertEqual(metering.SERIES_CACHE_TIMEOUT,
+                         metering.series_cache_timeout(yesterday, False))
+        self.assertEqual(metering.CLOSED_SERIES_CACHE_TIMEOUT,
+                         metering.series_cache_timeout(yesterday, True))
+        end_of_today = metering.calc_date_args(
+            None, timezone.now().strftime('%Y-%m-%d'), 'other')[1]
+        self.assertEqual(metering.SERIES_CACHE_TIMEOUT,
+                         metering.series_cache_timeout(end_of_today, True))
+
+
+class UtilsSerializersTests(test.TestCase):
+    def tearDown(self):
+        super(UtilsSerializersTests, self).tearDown()
+        serializers._backend = None
+
+    def test_dumps_api_objects(self):
+        class Wrapper(api_base.APIResourceWrapper):
+            _attrs = ['id', 'name']
+
+        apiresource = mock.Mock(spec=['id', 'name'], id='1')
+        apiresource.name = 'spam'
+        resource = Wrapper(apiresource)
+        info = mock.Mock(spec=['_info', 'to_dict'], _info={'id': '2'})
+        data = {'resource': resource,
+                'dict': api_base.APIDictWrapper({'id': '3'}),
+                'info': info,
+                'when': datetime.datetime(2015, 1, 2, 3, 4, 5)}
+        self.assertEqual({'resource': {'id': '1', 'name': 'spam'},
+                          'dict': {'id': '3'},
+                          'info': {'id': '2'},
+                          'when': '2015-01-02T03:04:05.000000'},
+                         json.loads(serializers.dumps(data)))
+        self.assertFalse(info.to_dict.called)
+
+    def test_dumps_backend(self):
+        serializers._backend = None
+        with self.settings(JSON_ENCODER_MODULES=('nonexistent', 'json')):
+            self.assertEqual((json, {}), serializers.get_backend())
+            self.assertEqual('{"a": [1, 2]}',
+                             serializers.dumps({'a': (1, 2)}))
+
+    def test_iterdumps(self):
+        data = {'servers': [{'id': str(i)} for i in range(100)],
+                'name': u'\u2603'}
+        chunks = list(serializers.iterdumps(data, chunk_size=256,
+                                            ensure_ascii=False))
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(data, json.loads(u''.join(chunks)))
+        self.assertEqual(json.dumps(data, sort_keys=True),
+                         u''.join(serializers.iterdumps(data,
+                                                        sort_keys=True)))
+
+
+class UtilsSnapshotsTests(test.TestCase):
+    def test_get_snapshot(self):
+        build = mock.Mock(return_value={'items': [{'id': '1'}]})
+        snapshot = snapshots.get_snapshot('spam', 'project', build)
+        self.assertEqual({'items': [{'id': '1'}]}, snapshot.data)
+
+        # The data is only built again once the interval passed.
+        again = snapshots.get_snapshot('spam', 'project', build)
+        self.assertEqual(snapshot.version, again.version)
+        self.assertEqual(1, build.call_count)
+        # Or when asked, keeping its version when it didn't change.
+        again = snapshots.get_snapshot('spam', 'project', build, force=True)
+        self.assertEqual(snapshot.version, again.version)
+        self.assertEqual(2, build.call_count)
+
+        build.return_value = {'items': [{'id': '2'}]}
+        with self.settings(POLLING_SNAPSHOT_INTERVAL=0):
+            changed = snapshots.get_snapshot('spam', 'project', build)
+        self.assertEqual(snapshot.version + 1, changed.version)
+        self.assertEqual({'items': [{'id': '2'}]}, changed.data)
+        self.assertEqual(snapshot.data, snapshots.get_version(
+            'spam', 'project', str(snapshot.version)))
+        self.assertIsNone(snapshots.get_version('spam', 'other',
+                                                snapshot.version))
+        self.assertIsNone(snapshots.get_version('spam', 'project', 'eggs'))
+
+    def test_get_snapshot_interval(self):
+        build = mock.Mock(return_value={'name': 'spam'})
+        snapshots.get_snapshot('spam', 'project', build, interval=0)
+        snapshots.get_snapshot('spam', 'project', build, interval=0)
+        self.assertEqual(2, build.call_count)
+        snapshots.get_snapshot('spam', 'project', build, interval=60)
+        self.assertEqual(2, build.call_count)
+        snapshots.invalidate('spam', 'project')
+        snapshots.get_snapshot('spam', 'project', build, interval=60)
+        self.assertEqual(3, build.call_count)
+
+    def test_get_snapshot_building(self):
+        build = mock.Mock(return_value={'name': 'old'})
+        snapshot = snapshots.get_snapshot('spam', 'project', build)
+        build.return_value = {'name': 'new'}
+
+        # While another process builds the data, the previous one is used.
+        with mock.patch.object(snapshots.cache, 'add', return_value=False):
+            again = snapshots.get_snapshot('spam', 'project', build,
+                                           force=True)
+        self.assertEqual({'name': 'old'}, again.data)
+        self.assertEqual(1, build.call_count)
+        self.assertEqual(snapshot.version, again.version)
+
+    @mock.patch.object(snapshots, 'CHUNK_SIZE', 10)
+    def test_get_snapshot_chunks(self):
+        data = {'items': [{'id': str(i)} for i in range(10)]}
+        with mock.patch.object(snapshots.cache, 'set_many',
+                               wraps=snapshots.cache.set_many) as set_many:
+            snapshot = snapshots.get_snapshot('spam', 'project',
+                                              lambda: data)
+        # The data is stored in pieces, each below the size limit.
+        chunks = [value for value in set_many.call_args[0][0].values()
+                  if isinstance(value, six.string_types)]
+        self.assertTrue(len(chunks) > 1)
+        self.assertTrue(all(len(chunk) <= 10 for chunk in chunks))
+        build = mock.Mock(return_value={})
+        again = snapshots.get_snapshot('spam', 'project', build)
+        self.assertEqual(data, again.data)
+        self.assertFalse(build.called)
+        self.assertEqual(data, snapshots.get_version('spam', 'project',
+                                                     snapshot.version))
+
+    @mock.patch.object(snapshots, 'LOG')
+    def test_get_snapshot_dropped(self, log):
+        build = mock.Mock(return_value={'name': 'spam'})
+        # The cache drops the items it can't store, such as memcached
+        # those larger than its item size limit.
+        with mock.patch.object(snapshots.cache, 'set_many'):
+            snapshot = snapshots.get_snapshot('spam', 'project', build)
+        self.assertEqual({'name': 'spam'}, snapshot.data)
+        self.assertEqual(1, log.warning.call_count)
+        self.assertIsNone(snapshots.get_version('spam', 'project',
+                                                snapshot.version))
+        # The data is built again, keeping its version.
+        again = snapshots.get_snapshot('spam', 'project', build)
+        self.assertEqual(2, build.call_count)
+        self.assertEqual(snapshot.version, again.version)
+        self.assertEqual({'name': 'spam'}, snapshots.get_version(
+            'spam', 'project', snapshot.version))
+
+    def test_diff(self):
+        old = {'name': 'a', 'size': 1,
+               'items': [{'id': '1', 'x': 1}, {'id': '2', 'x': 2}]}
+        new = {'name': 'a', 'size': 2,
+               'items': [{'id': '2', 'x': 3}, {'id': '3', 'x': 3}]}
+        self.assertEqual({'size': 2,
+                          'items': {'changed': [{'id': '2', 'x': 3},
+                                                {'id': '3', 'x': 3}],
+                                    'removed': ['1']}},
+                         snapshots.diff(old, new))
@@ -300,7 +300,8 @@ def _get_tenant_network_usages(request, usages, disabled_quotas, tenant_id):
 
     if 'network' not in disabled_quotas:
         networks = []
-        networks = neutron.network_list(request, shared=False)
+        networks = neutron.network_list(request, shared=False,
+                                        expand_subnet=False)
         if tenant_id:
             networks = filter(lambda net: net.tenant_id == tenant_id, networks)
         usages.tally('networks', len(networks))
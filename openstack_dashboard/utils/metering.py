@@ -11,12 +11,15 @@
 # under the License.
 
 import datetime
+import hashlib
 import logging
 
+from django.core.cache import cache
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 import pytz
 
+from horizon.utils import functions
 from horizon.utils import units
 
 from openstack_dashboard import api
@@ -37,6 +40,14 @@ METER_API_MAPPINGS = {
     "image_size": 'glance'
 }
 
+# How long (in seconds) the units of the meters are cached.
+METER_UNITS_CACHE_TIMEOUT = 3600
+# How long (in seconds) the series of a chart are cached. Statistics of a
+# period which ended before today can't change any more, so they are kept
+# longer.
+SERIES_CACHE_TIMEOUT = 300
+CLOSED_SERIES_CACHE_TIMEOUT = 24 * 3600
+
 
 def calc_period(date_from, date_to, number_of_samples=400):
     if date_from and date_to:
@@ -110,25 +121,23 @@ def series_for_meter(request, aggregates, group_by, meter_id,
                      meter_name, stats_name, unit, label=None):
     """Construct datapoint series for a meter from resource aggregates."""
     series = []
+    resource_name = 'id' if group_by == "project" else 'resource_id'
     for resource in aggregates:
-        if resource.get_meter(meter_name):
-            if label:
-                name = label
-            else:
-                resource_name = ('id' if group_by == "project"
-                                 else 'resource_id')
-                resource_id = getattr(resource, resource_name)
-                name = get_resource_name(request, resource_id,
-                                         resource_name, meter_name)
-            point = {'unit': unit,
-                     'name': name,
-                     'meter': meter_id,
-                     'data': []}
-            for statistic in resource.get_meter(meter_name):
-                date = statistic.duration_end[:19]
-                value = float(getattr(statistic, stats_name))
-                point['data'].append({'x': date, 'y': value})
-            series.append(point)
+        statistics = resource.get_meter(meter_name)
+        if not statistics:
+            continue
+        if label:
+            name = label
+        else:
+            name = get_resource_name(request,
+                                     getattr(resource, resource_name),
+                                     resource_name, meter_name)
+        series.append({'unit': unit,
+                       'name': name,
+                       'meter': meter_id,
+                       'data': [{'x': statistic.duration_end[:19],
+                                 'y': float(getattr(statistic, stats_name))}
+                                for statistic in statistics]})
     return series
 
 
@@ -137,6 +146,10 @@ def normalize_series_by_unit(series):
     1) Determine the data point with the maximum value
     2) Decide the unit appropriate for this value (normalize it)
     3) Convert other values to this new unit, if necessary
+
+    Every point has the same source unit, so the conversion factor is only
+    computed once rather than converting each point through the unit
+    registry.
     """
     if not series:
         return series
@@ -148,26 +161,76 @@ def normalize_series_by_unit(series):
 
     # Find the data point with the largest value and normalize it to
     # determine its unit - that will be the new unit
-    maximum = max([d['y'] for point in series for d in point['data']])
-    unit = units.normalize(maximum, source_unit)[1]
+    values = [d['y'] for point in series for d in point['data']]
+    if not values:
+        return series
+    unit = units.normalize(max(values), source_unit)[1]
 
     # If unit needs to be changed, set the new unit for all data points
     # and convert all values to that unit
     if units.is_larger(unit, target_unit):
         target_unit = unit
-        for i, point in enumerate(series[:]):
+        factor = units.convert(1, source_unit, target_unit)[0]
+        for point in series:
             if point['unit'] != target_unit:
-                series[i]['unit'] = target_unit
-                for j, d in enumerate(point['data'][:]):
-                    series[i]['data'][j]['y'] = units.convert(
-                        d['y'], source_unit, target_unit, fmt=True)[0]
+                point['unit'] = target_unit
+                for d in point['data']:
+                    d['y'] = functions.format_value(d['y'] * factor)
 
     return series
 
 
+def _scope_key(request):
+    """Identifies the Ceilometer endpoint and project of the request."""
+    scope = '%s|%s' % (api.base.url_for(request, 'metering'),
+                       request.user.tenant_id)
+    return hashlib.md5(scope.encode('utf-8')).hexdigest()
+
+
+def meter_unit(request, meter):
+    """Returns the unit of a meter, or an empty string if it is unknown.
+
+    The units of all the meters are cached for METER_UNITS_CACHE_TIMEOUT,
+    so that drawing a chart doesn't list the meters every time.
+    """
+    key = 'openstack_dashboard:meter_units:%s' % _scope_key(request)
+    meter_units = cache.get(key)
+    if meter_units is None:
+        meter_units = {}
+        for m in api.ceilometer.meter_list(request):
+            meter_units.setdefault(m.name, m.unit)
+        cache.set(key, meter_units, METER_UNITS_CACHE_TIMEOUT)
+    return meter_units.get(meter, "")
+
+
+def series_cache_key(request, *args):
+    """Returns the key under which the series of a chart are cached.
+
+    ``args`` are the parameters of the chart (meter, grouping, dates...).
+    """
+    query = hashlib.md5(repr(args).encode('utf-8')).hexdigest()
+    return 'openstack_dashboard:meter_series:%s:%s' % (
+        _scope_key(request), query)
+
+
+def series_cache_timeout(date_to, explicit_date_to):
+    """Returns how long the series of a chart ending at date_to are kept.
+
+    Only the series ending at an end date the user chose (explicit_date_to),
+    before today (UTC), are complete. Relative ranges such as the last 7
+    days end now and move on with every request.
+    """
+    if explicit_date_to and date_to:
+        today = timezone.now().astimezone(pytz.utc).date()
+        if date_to.astimezone(pytz.utc).date() < today:
+            return CLOSED_SERIES_CACHE_TIMEOUT
+    return SERIES_CACHE_TIMEOUT
+
+
 class ProjectAggregatesQuery(object):
     def __init__(self, request, date_from, date_to,
-                 period=None, additional_query=[]):
+                 period=None, additional_query=None):
+        additional_query = list(additional_query or [])
         if not period:
             period = calc_period(date_from, date_to)
         if date_from:
@@ -196,11 +259,7 @@ class ProjectAggregatesQuery(object):
             self.queries[tenant.name] = tenant_query
 
     def query(self, meter):
-        meter_list = [m for m in api.ceilometer.meter_list(self.request)
-                      if m.name == meter]
-        unit = ""
-        if len(meter_list) > 0:
-            unit = meter_list[0].unit
+        unit = meter_unit(self.request, meter)
         ceilometer_usage = api.ceilometer.CeilometerUsage(self.request)
         resources = ceilometer_usage.resource_aggregates_with_statistics(
             self.queries, [meter], period=self.period,
@@ -231,12 +290,7 @@ class MeterQuery(ProjectAggregatesQuery):
                     return True
             return False
 
-        meter_list = [m for m in api.ceilometer.meter_list(self.request)
-                      if m.name == meter]
-
-        unit = ""
-        if len(meter_list) > 0:
-            unit = meter_list[0].unit
+        unit = meter_unit(self.request, meter)
 
         ceilometer_usage = api.ceilometer.CeilometerUsage(self.request)
         resources = ceilometer_usage.resources_with_statistics(
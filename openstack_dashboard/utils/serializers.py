@@ -0,0 +1,147 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+JSON serialization of the data returned by the dashboard's JSON views.
+
+The encoding itself is done by the first module of the
+``JSON_ENCODER_MODULES`` setting which can be imported, such as simplejson,
+whose C encoder is faster than the one of the standard library. API
+objects are encoded straight from the data they wrap, without building a
+(deep) copy of it first with ``to_dict()``.
+"""
+
+import importlib
+import json
+import logging
+
+from django.conf import settings
+from oslo_serialization import jsonutils
+import six
+
+from openstack_dashboard.api import base
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_MODULES = ('simplejson', 'json')
+
+# The size (in characters) of the chunks yielded by iterdumps().
+CHUNK_SIZE = 64 * 1024
+
+# Options of some modules making them encode like the json module.
+_MODULE_OPTIONS = {
+    'simplejson': {'namedtuple_as_object': False, 'use_decimal': False},
+}
+
+_backend = None
+
+
+def get_backend():
+    """Returns the module used to encode JSON."""
+    global _backend
+    if _backend is None:
+        names = getattr(settings, 'JSON_ENCODER_MODULES', DEFAULT_MODULES)
+        for name in names:
+            try:
+                module = importlib.import_module(name)
+            except ImportError:
+                continue
+            _backend = (module, _MODULE_OPTIONS.get(name, {}))
+            break
+        else:
+            LOG.warning('None of the JSON_ENCODER_MODULES %s could be '
+                        'imported, using json.', names)
+            _backend = (json, {})
+    return _backend
+
+
+def to_primitive(obj):
+    """Returns the data of an object the JSON encoder doesn't know about."""
+    if isinstance(obj, base.APIDictWrapper):
+        return obj._apidict
+    if isinstance(obj, base.APIResourceWrapper):
+        if getattr(obj, 'to_dict', None) is not None:
+            return obj.to_dict()
+        return dict((attr, getattr(obj, attr)) for attr in obj._attrs
+                    if hasattr(obj, attr))
+    # The resources of the clients keep what the API returned in _info,
+    # which their to_dict() copies.
+    info = getattr(obj, '_info', None)
+    if isinstance(info, dict):
+        return info
+    to_dict = getattr(obj, 'to_dict', None)
+    if callable(to_dict):
+        return to_dict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return jsonutils.to_primitive(obj)
+
+
+def dumps(obj, **kwargs):
+    """Returns obj as JSON.
+
+    The keyword arguments of :func:`json.dumps` (such as ``sort_keys`` or
+    ``ensure_ascii``) are accepted.
+    """
+    module, options = get_backend()
+    kwargs.setdefault('default', to_primitive)
+    for option, value in options.items():
+        kwargs.setdefault(option, value)
+    return module.dumps(obj, **kwargs)
+
+
+def iterdumps(obj, chunk_size=CHUNK_SIZE, **kwargs):
+    """Yields obj as JSON, in chunks of about chunk_size characters.
+
+    The items of the lists at the top level of obj, or held by a dict at
+    the top level, are encoded one at a time, so that the JSON of a large
+    list is streamed without being built in memory as a whole.
+    """
+    chunk = []
+    size = 0
+    for piece in _iterencode(obj, kwargs, 0):
+        if isinstance(piece, six.binary_type):
+            piece = piece.decode('utf-8')
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield u''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield u''.join(chunk)
+
+
+def _iterencode(obj, kwargs, depth):
+    if isinstance(obj, dict) and depth == 0:
+        items = obj.items()
+        if kwargs.get('sort_keys'):
+            items = sorted(items)
+        yield u'{'
+        for i, (key, value) in enumerate(items):
+            if i:
+                yield u', '
+            yield dumps(six.text_type(key), **kwargs)
+            yield u': '
+            for piece in _iterencode(value, kwargs, depth + 1):
+                yield piece
+        yield u'}'
+    elif isinstance(obj, (list, tuple)) and depth <= 1:
+        yield u'['
+        for i, item in enumerate(obj):
+            if i:
+                yield u', '
+            yield dumps(item, **kwargs)
+        yield u']'
+    else:
+        yield dumps(obj, **kwargs)
@@ -0,0 +1,221 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Snapshots of API data shared by the pages polling it.
+
+Pages such as the network topology refresh their data every few seconds,
+for every user and every browser tab showing them. Their data is instead
+built at most once per ``POLLING_SNAPSHOT_INTERVAL`` for each scope (such
+as a project) and kept in the Django cache, along with a version number
+increased whenever the data changes. Clients send back the version they
+have to learn that nothing changed, or to get only the changes.
+
+The data is stored as JSON split in pieces of ``CHUNK_SIZE`` characters,
+since memcached refuses items larger than 1 MB by default (see its ``-I``
+option) and the data of a large project is larger than that. The pieces
+which could not be stored are logged.
+"""
+
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.encoding import force_bytes
+import six
+
+from openstack_dashboard.utils import serializers
+
+
+LOG = logging.getLogger(__name__)
+
+# How long (in seconds) a snapshot is used before being built again.
+DEFAULT_INTERVAL = 5
+
+# How long (in seconds) past versions are kept to compute the changes since
+# them.
+HISTORY_TIMEOUT = 300
+
+# The size (in characters) of the pieces the data is stored in, well below
+# the default item size limit of memcached.
+CHUNK_SIZE = 512 * 1024
+
+
+class Snapshot(object):
+    """A version of the data of a snapshot."""
+
+    def __init__(self, version, data, timestamp, digest):
+        self.version = version
+        self.data = data
+        self.timestamp = timestamp
+        self.digest = digest
+
+
+def get_interval():
+    return getattr(settings, 'POLLING_SNAPSHOT_INTERVAL', DEFAULT_INTERVAL)
+
+
+def _key(name, scope):
+    return 'horizon:snapshot:%s:%s' % (name, scope)
+
+
+def get_snapshot(name, scope, build, force=False, interval=None):
+    """Returns the current :class:`Snapshot` of some data.
+
+    :param name: identifies the data, e.g. ``'network_topology'``
+    :param scope: identifies who the data is for, e.g. a project id
+    :param build: returns the data (plain dicts and lists) when the snapshot
+        is missing or older than the interval
+    :param force: build the data again even if the snapshot is recent, e.g.
+        after the user changed something
+    :param interval: how long (in seconds) the snapshot is used, the
+        ``POLLING_SNAPSHOT_INTERVAL`` setting by default
+
+    While a process is building the data, requests for it in the others are
+    answered with the previous snapshot.
+    """
+    key = _key(name, scope)
+    state, current = _get_current(key)
+    now = time.time()
+    if interval is None:
+        interval = get_interval()
+    if current is not None and not force and \
+            now - current.timestamp < interval:
+        return current
+
+    lock_key = key + ':lock'
+    locked = cache.add(lock_key, True, max(interval, 1) * 6)
+    if current is not None and not locked:
+        return current
+    try:
+        data = build()
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+    text = serializers.dumps(data, sort_keys=True)
+    digest = hashlib.sha1(force_bytes(text)).hexdigest()
+    if state is None:
+        # Counting from the time rather than from 1 keeps the versions
+        # seen by clients before the snapshot expired from being reused.
+        version = int(now * 1000)
+    elif state[2] == digest:
+        version = state[0]
+    else:
+        version = state[0] + 1
+    # The data is given as read back from the cache, whether it was just
+    # built or not.
+    snapshot = Snapshot(version, json.loads(text), now, digest)
+    chunks = [text[start:start + CHUNK_SIZE]
+              for start in range(0, len(text), CHUNK_SIZE)]
+    if current is None or version != current.version:
+        _store(key, version, chunks)
+    cache.set(key, (version, now, digest, len(chunks)), HISTORY_TIMEOUT)
+    return snapshot
+
+
+def _get_current(key):
+    """Returns the state of a snapshot and its current :class:`Snapshot`.
+
+    The state is the version, timestamp, digest and number of pieces of the
+    data. Either may be None.
+    """
+    state = cache.get(key)
+    if state is None:
+        return None, None
+    data = _load(key, state[0], state[3])
+    if data is None:
+        return state, None
+    return state, Snapshot(state[0], data, state[1], state[2])
+
+
+def get_current(name, scope):
+    """Returns the current :class:`Snapshot` of some data, however old,
+    without building it. Returns None if there is none.
+    """
+    return _get_current(_key(name, scope))[1]
+
+
+def _store(key, version, chunks):
+    """Stores the pieces of a version of the data, and their number."""
+    version_key = '%s:%s' % (key, version)
+    items = dict(('%s:%s' % (version_key, i), chunk)
+                 for i, chunk in enumerate(chunks))
+    items[version_key] = len(chunks)
+    cache.set_many(items, HISTORY_TIMEOUT)
+    # Caches such as memcached drop the items they can't store without
+    # telling, the snapshot is then built again at each request.
+    missing = len(items) - len(cache.get_many(list(items)))
+    if missing:
+        LOG.warning('%d of the %d items of the snapshot %s could not be '
+                    'cached, check the item size limit of the cache.',
+                    missing, len(items), key)
+
+
+def _load(key, version, count):
+    """Returns a version of the data, or None if any piece is missing."""
+    keys = ['%s:%s:%d' % (key, version, i) for i in range(count)]
+    chunks = cache.get_many(keys)
+    if len(chunks) < count:
+        return None
+    return json.loads(u''.join(chunks[chunk_key] for chunk_key in keys))
+
+
+def invalidate(name, scope):
+    """Makes the next :func:`get_snapshot` build the data again."""
+    cache.delete(_key(name, scope))
+
+
+def get_version(name, scope, version):
+    """Returns the data of a past version of a snapshot, or None if it is
+    no longer known.
+    """
+    try:
+        version = int(version)
+    except (TypeError, ValueError):
+        return None
+    key = _key(name, scope)
+    count = cache.get('%s:%s' % (key, version))
+    if count is None:
+        return None
+    return _load(key, version, count)
+
+
+def diff(old, new):
+    """Returns the changes from the data old to the data new.
+
+    For each list of dicts with an ``id`` in new, the changes are a dict
+    with the items added or modified (``changed``) and the ids of those
+    removed (``removed``). Other values are only given if they changed.
+    """
+    changes = {}
+    for key, value in six.iteritems(new):
+        old_value = old.get(key)
+        if _is_collection(value) and _is_collection(old_value):
+            old_items = dict((item['id'], item) for item in old_value)
+            ids = set(item['id'] for item in value)
+            changes[key] = {
+                'changed': [item for item in value
+                            if old_items.get(item['id']) != item],
+                'removed': [item['id'] for item in old_value
+                            if item['id'] not in ids]}
+        elif value != old_value:
+            changes[key] = value
+    return changes
+
+
+def _is_collection(value):
+    return isinstance(value, list) and all(
+        isinstance(item, dict) and 'id' in item for item in value)
@@ -0,0 +1,161 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compares the cost of the API wrapper classes with their former version.
+
+The former ``APIResourceWrapper`` and ``APIDictWrapper`` intercepted every
+attribute access in ``__getattribute__``. This script rebuilds that version
+of ``nova.Server``, ``neutron.Port`` and ``cinder.Volume`` and measures
+attribute access time (what rendering a table cell costs) and the memory
+used by each wrapper object.
+
+Usage: python tools/benchmark_api_wrappers.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                      'openstack_dashboard.test.settings')
+
+from openstack_dashboard.api import base  # noqa
+from openstack_dashboard.api import cinder  # noqa
+from openstack_dashboard.api import neutron  # noqa
+from openstack_dashboard.api import nova  # noqa
+
+
+class LegacyAPIResourceWrapper(object):
+    _attrs = []
+    _apiresource = None
+
+    def __getattribute__(self, attr):
+        try:
+            return object.__getattribute__(self, attr)
+        except AttributeError:
+            if attr not in self._attrs:
+                raise
+            return getattr(self._apiresource, attr)
+
+
+class LegacyAPIDictWrapper(object):
+    _apidict = {}
+
+    def __getattribute__(self, attr):
+        try:
+            return object.__getattribute__(self, attr)
+        except AttributeError:
+            if attr not in self._apidict:
+                raise
+            return self._apidict[attr]
+
+
+def legacy_class(cls, legacy_base):
+    """Flattens cls into a subclass of legacy_base without generated
+    attribute descriptors.
+    """
+    namespace = {}
+    for klass in reversed(cls.__mro__):
+        if klass in (object, base.APIResourceWrapper, base.APIDictWrapper):
+            continue
+        for name, value in klass.__dict__.items():
+            if name in ('__dict__', '__weakref__', '__init__'):
+                continue
+            if isinstance(value, base._WrappedAttribute):
+                continue
+            namespace[name] = value
+    return type('Legacy' + cls.__name__, (legacy_base,), namespace)
+
+
+def legacy_copy(wrapper, legacy_cls):
+    legacy = legacy_cls.__new__(legacy_cls)
+    legacy.__dict__.update(wrapper.__dict__)
+    return legacy
+
+
+class FakeResource(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def make_server():
+    return nova.Server(FakeResource(
+        id='8b2f5a9e-4b5e-4c3a-8f0e-0d7c1b9c2f11', name='server-1',
+        status='ACTIVE', addresses={'private': [{'addr': '10.0.0.3'}]},
+        image={'id': '1', 'name': 'cirros'}, flavor={'id': '1'},
+        key_name='key', tenant_id='1', user_id='1',
+        created='2015-01-01T00:00:00Z',
+        **{'OS-EXT-STS:power_state': 1, 'OS-EXT-STS:task_state': None,
+           'OS-EXT-AZ:availability_zone': 'nova'}), None)
+
+
+def make_port():
+    return neutron.Port({
+        'id': '0c3e5e68-8e0a-4f6b-9e0e-3e0c4b5e2a11', 'name': 'port-1',
+        'network_id': '1', 'tenant_id': '1', 'device_id': '1',
+        'device_owner': 'compute:nova', 'admin_state_up': True,
+        'status': 'ACTIVE', 'mac_address': 'fa:16:3e:00:00:01',
+        'fixed_ips': [{'ip_address': '10.0.0.3', 'subnet_id': '1'}]})
+
+
+def make_volume():
+    return cinder.Volume(FakeResource(
+        id='6f0a9d4c-3d1b-4a7e-9b3c-1e2f3a4b5c6d', display_name='volume-1',
+        size=1, status='available', created_at='2015-01-01T00:00:00Z',
+        volume_type='lvm', availability_zone='nova', bootable='false',
+        attachments=[], metadata={}, encrypted=False))
+
+
+CASES = (
+    ('nova.Server', make_server, LegacyAPIResourceWrapper,
+     ('id', 'name', 'status', 'addresses', 'image_name',
+      'availability_zone', 'OS-EXT-STS:power_state', 'missing')),
+    ('neutron.Port', make_port, LegacyAPIDictWrapper,
+     ('id', 'name', 'network_id', 'status', 'admin_state', 'fixed_ips',
+      'name_or_id', 'missing')),
+    ('cinder.Volume', make_volume, LegacyAPIResourceWrapper,
+     ('id', 'name', 'size', 'status', 'volume_type', 'attachments',
+      'is_bootable', 'missing')),
+)
+
+
+def access_all(obj, attrs):
+    for attr in attrs:
+        getattr(obj, attr, None)
+
+
+def size_of(obj):
+    return sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+
+
+def main(iterations=20000):
+    print('%-14s %14s %14s %8s %12s' % ('wrapper', 'legacy (us)',
+                                        'current (us)', 'speedup',
+                                        'size (bytes)'))
+    for name, factory, legacy_base, attrs in CASES:
+        wrapper = factory()
+        legacy = legacy_copy(wrapper,
+                             legacy_class(type(wrapper), legacy_base))
+        timings = []
+        for obj in (legacy, wrapper):
+            timer = timeit.Timer(lambda: access_all(obj, attrs))
+            best = min(timer.repeat(3, iterations))
+            timings.append(best / iterations / len(attrs) * 1e6)
+        print('%-14s %14.3f %14.3f %7.1fx %12d' % (
+            name, timings[0], timings[1], timings[0] / timings[1],
+            size_of(wrapper)))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])